@@ -3,105 +3,43 @@ GitHub 仓库智能管理器 - 专业版
 自动依赖检测与安装 | 智能Git操作 | 企业级架构
 Author: Professional Developer
 Version: 2.0
+
+命令行模式 (不加载 Qt, 适用于服务器 / cron / CI):
+    python "GitHub 仓库管理_Claude_V2.py" --cli status --path /srv/repo
+    python "GitHub 仓库管理_Claude_V2.py" --cli sync --all --jobs 16
+    python "GitHub 仓库管理_Claude_V2.py" --cli tune --all
+    python "GitHub 仓库管理_Claude_V2.py" --cli download --path ~/new --depth 50 --sparse src
+    python "GitHub 仓库管理_Claude_V2.py" --cli bench --scale 0.2 --compare baseline.json
+
+本文件只包含图形界面, Git 操作等核心功能位于 github_manager_core.py (不依赖 Qt)
 """
 
+import time
+
+# 启动计时起点 (用于统计启动到可交互的耗时)
+STARTUP_T0 = time.perf_counter()
+
 import sys
 import os
 import json
 import subprocess
-import importlib
-import shutil
+import sqlite3
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 
-
-# ================================
-# 依赖管理系统
-# ================================
-class DependencyManager:
-    """智能依赖管理器"""
-    
-    REQUIRED_PACKAGES = {
-        'PyQt6': 'PyQt6',
-        'PyQt6.QtWidgets': 'PyQt6',
-        'PyQt6.QtCore': 'PyQt6',
-        'PyQt6.QtGui': 'PyQt6'
-    }
-    
-    @staticmethod
-    def check_and_install():
-        """检查并安装所有依赖"""
-        print("=" * 60)
-        print("🔍 GitHub 仓库管理器 - 依赖检查系统")
-        print("=" * 60)
-        
-        missing_packages = []
-        installed_packages = set()
-        
-        # 检查依赖
-        for module_name, package_name in DependencyManager.REQUIRED_PACKAGES.items():
-            if package_name in installed_packages:
-                continue
-                
-            try:
-                importlib.import_module(module_name)
-                print(f"✓ {package_name:20} - 已安装")
-                installed_packages.add(package_name)
-            except ImportError:
-                if package_name not in missing_packages:
-                    print(f"✗ {package_name:20} - 未安装")
-                    missing_packages.append(package_name)
-        
-        # 安装缺失的包
-        if missing_packages:
-            print("\n" + "=" * 60)
-            print(f"📦 发现 {len(missing_packages)} 个缺失的依赖包")
-            print("=" * 60)
-            
-            for package in missing_packages:
-                DependencyManager._install_package(package)
-            
-            print("\n" + "=" * 60)
-            print("✓ 所有依赖已成功安装!")
-            print("=" * 60)
-            print("🚀 正在启动应用程序...\n")
-        else:
-            print("\n✓ 所有依赖已就绪!")
-            print("🚀 正在启动应用程序...\n")
-        
-        return True
-    
-    @staticmethod
-    def _install_package(package_name):
-        """安装单个包"""
-        print(f"\n📥 正在安装 {package_name}...")
-        try:
-            subprocess.check_call(
-                [sys.executable, "-m", "pip", "install", package_name, "-q"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            print(f"✓ {package_name} 安装成功!")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ {package_name} 安装失败!")
-            print(f"错误信息: {e}")
-            print(f"请手动执行: pip install {package_name}")
-            sys.exit(1)
-    
-    @staticmethod
-    def check_git():
-        """检查Git是否安装"""
-        try:
-            subprocess.run(["git", "--version"], 
-                         capture_output=True, 
-                         check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+# Qt 无关的核心功能 (命令行模式与其他脚本可单独导入, 不加载 PyQt6)
+from github_manager_core import (
+    DependencyManager, GitRunner, StatusTracker, WorkTreeWatcher, BackupStore,
+    OperationJournal, OperationTrace, GitOperations, AutoSyncPolicy,
+    CONFIG_FILE, read_config_file, build_worker_config, cli_main
+)
 
 
-# 启动时检查依赖
+# 启动时检查依赖 (命令行模式不需要 Qt, 直接执行后退出)
 if __name__ == '__main__':
+    if sys.argv[1:2] == ["--cli"]:
+        sys.exit(cli_main(sys.argv[2:]))
     DependencyManager.check_and_install()
 
 
@@ -111,325 +49,839 @@ if __name__ == '__main__':
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QTextEdit, QGroupBox,
-    QGridLayout, QMessageBox, QFileDialog, QProgressBar, QSplashScreen
+    QGridLayout, QMessageBox, QFileDialog, QProgressBar, QSplashScreen,
+    QDialog, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+    QSpinBox, QComboBox, QListView, QCheckBox
+)
+from PyQt6.QtCore import (
+    Qt, QObject, QThread, pyqtSignal, QTimer, QSize, QAbstractListModel, QModelIndex
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
 from PyQt6.QtGui import QFont, QPalette, QColor, QPixmap, QPainter
 
 
+# ================================
+# 共用样式
+# ================================
+def table_stylesheet(header_padding=4):
+    """深色表格样式 - 主窗口任务队列与各对话框的表格共用"""
+    return f"""
+        QTableWidget {{
+            background-color: #0f172a;
+            color: #e2e8f0;
+            gridline-color: #1e293b;
+            border: 2px solid #1e293b;
+            border-radius: 8px;
+        }}
+        QHeaderView::section {{
+            background-color: #1e293b;
+            color: #cbd5e1;
+            padding: {header_padding}px;
+            border: none;
+        }}
+    """
+
+
 # ================================
 # Git操作工作线程
 # ================================
 class GitWorker(QThread):
     """Git 操作工作线程 - 非阻塞式执行"""
     progress = pyqtSignal(str, str)  # (消息, 类型)
+    transfer_progress = pyqtSignal(int, str)  # (百分比, 描述)
     finished = pyqtSignal(bool, str)
     execute_script = pyqtSignal(str)  # 执行脚本信号
+    trace_ready = pyqtSignal(object)  # OperationTrace
     
     def __init__(self, operation, local_path, remote_url, config):
         super().__init__()
         self.operation = operation
         self.local_path = local_path
-        self.remote_url = remote_url
-        self.config = config
-        self.backup_path = None
+        self.ops = GitOperations(operation, local_path, remote_url, config)
+        
+        # 操作对象直接通过本线程的 Qt 信号发出进度
+        self.ops.progress = self.progress
+        self.ops.transfer_progress = self.transfer_progress
+        self.ops.finished = self.finished
+        self.ops.execute_script = self.execute_script
+        self.ops.trace_ready = self.trace_ready
     
     def run(self):
         """执行Git操作"""
-        try:
-            # 切换到仓库目录
-            if not os.path.exists(self.local_path):
-                os.makedirs(self.local_path, exist_ok=True)
-            
-            os.chdir(self.local_path)
-            
-            # 配置Git用户信息
-            if self.config.get('username') and self.config.get('email'):
-                self._run_cmd(
-                    f'git config user.name "{self.config["username"]}"',
-                    "配置用户名", silent=True
-                )
-                self._run_cmd(
-                    f'git config user.email "{self.config["email"]}"',
-                    "配置邮箱", silent=True
-                )
-            
-            # 执行相应操作
-            operations = {
-                "upload": self._smart_upload,
-                "download": self._smart_download,
-                "sync": self._smart_sync,
-                "overwrite": self._smart_overwrite,
-                "delete": self._smart_delete,
-                "init": self._init_repo,
-                "status": self._check_status
-            }
-            
-            if self.operation in operations:
-                operations[self.operation]()
-            else:
-                raise Exception(f"未知操作: {self.operation}")
-                
-        except Exception as e:
-            self.finished.emit(False, f"操作失败: {str(e)}")
-    
-    def _run_cmd(self, cmd, description, silent=False):
-        """执行命令并发送进度"""
-        if not silent:
-            self.progress.emit(f"▶ {description}", "info")
-        
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
-            capture_output=True, 
-            text=True, 
-            encoding='utf-8',
-            errors='ignore'
-        )
-        
-        if result.returncode != 0 and not silent:
-            error_msg = result.stderr.strip() or result.stdout.strip()
-            if error_msg:
-                raise Exception(f"{description} 失败: {error_msg}")
-        
-        return result.stdout.strip()
+        self.ops.run()
     
-    def _init_repo(self):
-        """初始化仓库"""
-        self.progress.emit("🔧 正在初始化Git仓库...", "info")
+    def cancel(self):
+        """取消操作"""
+        self.ops.cancel()
+
+
+# ================================
+# 任务队列
+# ================================
+class RepoActivity(QObject):
+    """仓库占用登记 - 任务队列、批量执行器与自动同步共用, 同一仓库同一时刻只运行一个操作
+    
+    只在主线程使用; 仓库释放时发出 released, 等待该仓库的组件据此重新调度。
+    """
+    released = pyqtSignal(str)  # 仓库路径 (规范化)
+    
+    _shared = None
+    
+    @classmethod
+    def shared(cls):
+        """进程内共用的登记表"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._owners = {}  # 规范化路径 -> 占用方
+    
+    @staticmethod
+    def key(local_path):
+        return os.path.abspath(local_path)
+    
+    def is_running(self, local_path):
+        """仓库是否正被某个组件的操作占用"""
+        return self.key(local_path) in self._owners
+    
+    def owner(self, local_path):
+        """占用方 (未占用时为 None)"""
+        return self._owners.get(self.key(local_path))
+    
+    def acquire(self, local_path, owner):
+        """登记占用, 已被占用时返回 False"""
+        key = self.key(local_path)
+        if key in self._owners:
+            return False
+        self._owners[key] = owner
+        return True
+    
+    def release(self, local_path, owner):
+        """解除占用 (只解除自己的登记)"""
+        key = self.key(local_path)
+        if self._owners.get(key) is owner:
+            del self._owners[key]
+            self.released.emit(key)
+
+
+class Job:
+    """队列中的一个操作任务"""
+    
+    QUEUED, RUNNING, DONE, FAILED, CANCELLED = "排队中", "执行中", "成功", "失败", "已取消"
+    
+    def __init__(self, job_id, operation, local_path, remote_url, config, priority=0):
+        self.id = job_id
+        self.operation = operation
+        self.local_path = local_path
+        self.remote_url = remote_url
+        self.config = config
+        self.priority = priority
+        self.state = self.QUEUED
+        self.message = ""
+        self.worker = None
+        self.cancel_requested = False
+    
+    @property
+    def repo_key(self):
+        return os.path.abspath(self.local_path)
+    
+    @property
+    def is_active(self):
+        return self.state in (self.QUEUED, self.RUNNING)
+
+
+class JobQueue(QObject):
+    """操作任务队列 - 按优先级调度, 同一仓库串行、全局有并发上限, 可取消正在执行的任务"""
+    changed = pyqtSignal()
+    job_started = pyqtSignal(object)  # Job
+    job_progress = pyqtSignal(object, str, str)  # (Job, 消息, 类型)
+    job_transfer = pyqtSignal(object, int, str)  # (Job, 百分比, 描述)
+    job_finished = pyqtSignal(object, bool, str)  # (Job, 成功, 消息)
+    job_trace = pyqtSignal(object, object)  # (Job, OperationTrace)
+    job_script = pyqtSignal(object, str)  # (Job, 脚本路径)
+    
+    DEFAULT_MAX_CONCURRENT = 2
+    MAX_FINISHED = 100  # 保留的已结束任务数
+    
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, parent=None):
+        super().__init__(parent)
+        self.max_concurrent = max(1, max_concurrent)
+        self.jobs = []
+        self.activity = RepoActivity.shared()
+        self.activity.released.connect(self._on_released)
+        self._next_id = 1
+        self._done_workers = []
+    
+    def submit(self, operation, local_path, remote_url, config, priority=0):
+        """加入队列并尝试立即执行"""
+        job = Job(self._next_id, operation, local_path, remote_url, config, priority)
+        self._next_id += 1
+        self.jobs.append(job)
+        self.changed.emit()
+        self.dispatch()
+        return job
+    
+    def find(self, job_id):
+        return next((job for job in self.jobs if job.id == job_id), None)
+    
+    def ordered(self):
+        """显示顺序: 执行中, 排队中 (优先级高、提交早的在前), 已结束 (最近的在前)"""
+        running = [job for job in self.jobs if job.state == Job.RUNNING]
+        queued = sorted((job for job in self.jobs if job.state == Job.QUEUED), key=lambda j: (-j.priority, j.id))
+        finished = sorted((job for job in self.jobs if not job.is_active), key=lambda j: -j.id)
+        return running + queued + finished
+    
+    @property
+    def active(self):
+        """正在执行的任务数"""
+        return sum(1 for job in self.jobs if job.state == Job.RUNNING)
+    
+    def pending(self):
+        """未结束的任务数"""
+        return sum(1 for job in self.jobs if job.is_active)
+    
+    def is_busy(self, local_path):
+        """仓库是否有排队或执行中的任务"""
+        key = os.path.abspath(local_path)
+        return any(job.is_active and job.repo_key == key for job in self.jobs)
+    
+    def set_priority(self, job_id, delta):
+        """调整排队任务的优先级"""
+        job = self.find(job_id)
+        if job and job.state == Job.QUEUED:
+            job.priority += delta
+            self.changed.emit()
+    
+    def cancel(self, job_id):
+        """取消任务: 排队中直接移出, 执行中终止其 git 子进程"""
+        job = self.find(job_id)
+        if job is None or not job.is_active:
+            return
+        if job.state == Job.QUEUED:
+            job.state = Job.CANCELLED
+            job.message = "⏹ 已取消"
+            self.job_finished.emit(job, False, job.message)
+            self.changed.emit()
+            self.dispatch()
+        elif not job.cancel_requested:
+            job.cancel_requested = True
+            job.message = "正在取消..."
+            job.worker.cancel()
+            self.changed.emit()
+    
+    def cancel_all(self):
+        """取消全部未结束的任务"""
+        for job in list(self.jobs):
+            self.cancel(job.id)
+    
+    def clear_finished(self):
+        """移除已结束的任务"""
+        self.jobs = [job for job in self.jobs if job.is_active]
+        self.changed.emit()
+    
+    def wait(self):
+        """等待所有工作线程退出"""
+        for job in self.jobs:
+            if job.worker is not None:
+                job.worker.wait()
+        for worker in self._done_workers:
+            worker.wait()
+    
+    def _on_released(self, key):
+        """某个仓库被其他组件释放, 等待它的任务可以开始"""
+        self.dispatch()
+    
+    def dispatch(self):
+        """按优先级启动可执行的任务"""
+        running = {job.repo_key for job in self.jobs if job.state == Job.RUNNING}
+        for job in self.ordered():
+            if self.active >= self.max_concurrent:
+                break
+            if job.state != Job.QUEUED or job.repo_key in running or self.activity.is_running(job.local_path):
+                continue
+            running.add(job.repo_key)
+            self._start(job)
+    
+    def _start(self, job):
+        """为任务创建工作线程"""
+        worker = GitWorker(job.operation, job.local_path, job.remote_url, job.config)
+        worker.progress.connect(lambda message, msg_type, j=job: self.job_progress.emit(j, message, msg_type))
+        worker.transfer_progress.connect(lambda percent, text, j=job: self.job_transfer.emit(j, percent, text))
+        worker.finished.connect(lambda success, message, j=job: self._on_finished(j, success, message))
+        worker.trace_ready.connect(lambda trace, j=job: self.job_trace.emit(j, trace))
+        worker.execute_script.connect(lambda path, j=job: self.job_script.emit(j, path))
+        job.worker = worker
+        job.state = Job.RUNNING
+        job.message = ""
+        self.activity.acquire(job.local_path, job)
+        self.job_started.emit(job)
+        self.changed.emit()
+        worker.start()
+    
+    def _on_finished(self, job, success, message):
+        """任务完成 (部分操作可能多次发出完成信号, 只处理第一次)"""
+        if job.state != Job.RUNNING:
+            return
+        job.state = Job.DONE if success else (Job.CANCELLED if job.cancel_requested else Job.FAILED)
+        job.message = message
+        # 完成信号发出时线程可能尚未退出, 保留引用直到线程结束
+        self._done_workers = [w for w in self._done_workers if w.isRunning()] + [job.worker]
+        job.worker = None
+        
+        finished = [j for j in self.jobs if not j.is_active]
+        if len(finished) > self.MAX_FINISHED:
+            drop = {j.id for j in sorted(finished, key=lambda j: j.id)[:len(finished) - self.MAX_FINISHED]}
+            self.jobs = [j for j in self.jobs if j.id not in drop]
+        
+        self.job_finished.emit(job, success, message)
+        self.changed.emit()
+        # 释放时通过 released 信号重新调度
+        self.activity.release(job.local_path, job)
+        self.dispatch()
+
+
+# ================================
+# 批量仓库执行器
+# ================================
+class FleetRunner(QObject):
+    """批量仓库执行器 - 以有界并发在多个仓库上运行 GitWorker
+    
+    与任务队列、自动同步共用 RepoActivity: 正被占用的仓库推后执行, 释放后再启动。
+    """
+    repo_started = pyqtSignal(int)  # 仓库索引
+    repo_progress = pyqtSignal(int, str, str)  # (仓库索引, 消息, 类型)
+    repo_finished = pyqtSignal(int, bool, str, float)  # (仓库索引, 成功, 消息, 耗时秒)
+    repo_traced = pyqtSignal(int, object)  # (仓库索引, OperationTrace)
+    all_finished = pyqtSignal(int, int, float)  # (成功数, 失败数, 总耗时秒)
+    
+    FLEET_OPERATIONS = ("upload", "download", "sync", "status", "tune")
+    
+    def __init__(self, operation, repos, config, max_workers=4, parent=None):
+        super().__init__(parent)
+        if operation not in self.FLEET_OPERATIONS:
+            raise ValueError(f"批量模式不支持操作: {operation}")
+        self.operation = operation
+        self.repos = list(repos)
+        self.config = config
+        self.max_workers = max(1, int(max_workers))
+        self._pending = []
+        self._running = {}
+        self._workers = []
+        self._started_at = {}
+        self.traces = {}  # 仓库索引 -> OperationTrace
+        self._start_time = 0.0
+        self._succeeded = 0
+        self._failed = 0
+        self._cancelled = False
+        self.activity = RepoActivity.shared()
+        self.activity.released.connect(self._on_released)
+    
+    @property
+    def succeeded(self):
+        """成功的仓库数"""
+        return self._succeeded
+    
+    @property
+    def failed(self):
+        """失败或被取消的仓库数"""
+        return self._failed
+    
+    @property
+    def active(self):
+        """正在执行的仓库数"""
+        return len(self._running)
+    
+    @property
+    def completed(self):
+        """已完成的仓库数"""
+        return self._succeeded + self._failed
+    
+    @property
+    def elapsed(self):
+        """本次批量运行已耗时(秒)"""
+        return time.monotonic() - self._start_time if self._start_time else 0.0
+    
+    def throughput(self):
+        """聚合吞吐量(仓库/分钟)"""
+        elapsed = self.elapsed
+        return self.completed * 60.0 / elapsed if elapsed > 0 else 0.0
+    
+    def is_running(self):
+        """是否仍有仓库在执行或排队"""
+        return bool(self._running or self._pending)
+    
+    def start(self):
+        """开始批量执行"""
+        self._pending = list(range(len(self.repos)))
+        self._running.clear()
+        self._workers.clear()
+        self.traces.clear()
+        self._succeeded = 0
+        self._failed = 0
+        self._cancelled = False
+        self._start_time = time.monotonic()
+        
+        if not self._pending:
+            self.all_finished.emit(0, 0, 0.0)
+            return
         
-        if not os.path.exists('.git'):
-            self._run_cmd("git init", "初始化Git仓库")
-            self._run_cmd(f'git remote add origin "{self.remote_url}"', "添加远程仓库")
-            self._run_cmd("git branch -M main", "创建main分支")
-            self.progress.emit("✓ 仓库初始化完成", "success")
-        else:
-            # 检查远程仓库
-            try:
-                current_remote = self._run_cmd("git remote get-url origin", "获取远程URL", silent=True)
-                if current_remote != self.remote_url:
-                    self._run_cmd(f'git remote set-url origin "{self.remote_url}"', "更新远程仓库URL")
-                    self.progress.emit("✓ 远程仓库已更新", "success")
-                else:
-                    self.progress.emit("✓ 仓库已存在且配置正确", "success")
-            except:
-                self._run_cmd(f'git remote add origin "{self.remote_url}"', "添加远程仓库")
+        self._fill()
+    
+    def _on_released(self, key):
+        """某个仓库被释放, 推后的仓库可能可以开始"""
+        if self._pending:
+            self._fill()
+    
+    def _fill(self):
+        """在并发上限内启动可以执行的仓库"""
+        while len(self._running) < self.max_workers and self._launch_next():
+            pass
+    
+    def cancel(self):
+        """取消批量执行: 排队中的仓库直接记为已取消, 执行中的仓库终止其 git 子进程
         
-        self.finished.emit(True, "✓ 仓库初始化完成")
+        执行中的仓库在工作线程结束时经 _on_worker_finished 记录并释放占用登记。
+        """
+        self._cancelled = True
+        skipped = self._pending
+        self._pending = []
+        for index in skipped:
+            self._record(index, False, "已取消", 0.0)
+        for worker in list(self._running.values()):
+            worker.cancel()
+        self._check_all_finished()
     
-    def _create_backup(self):
-        """创建备份"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = Path(self.local_path).parent / "backups"
-        backup_dir.mkdir(exist_ok=True)
+    def wait(self):
+        """等待所有工作线程退出"""
+        for worker in self._workers:
+            worker.wait()
+    
+    def _launch_next(self):
+        """启动下一个未被占用的排队仓库, 没有可启动的仓库时返回 False"""
+        if self._cancelled:
+            return False
+        index = next(
+            (i for i in self._pending if not self.activity.is_running(self.repos[i]['local_path'])), None
+        )
+        if index is None:
+            return False
         
-        self.backup_path = backup_dir / f"backup_{timestamp}"
+        self._pending.remove(index)
+        repo = self.repos[index]
         
-        self.progress.emit(f"📦 正在创建备份到: {self.backup_path.name}", "info")
+        worker = GitWorker(self.operation, repo['local_path'], repo.get('remote_url', ''), self.config)
+        worker.progress.connect(
+            lambda message, msg_type, i=index: self.repo_progress.emit(i, message, msg_type)
+        )
+        worker.finished.connect(
+            lambda success, message, i=index: self._on_worker_finished(i, success, message)
+        )
+        worker.trace_ready.connect(lambda trace, i=index: self._on_trace(i, trace))
+        
+        self._running[index] = worker
+        self._workers.append(worker)
+        self._started_at[index] = time.monotonic()
+        self.activity.acquire(repo['local_path'], worker)
+        self.repo_started.emit(index)
+        worker.start()
+        return True
+    
+    def _on_worker_finished(self, index, success, message):
+        """单个仓库完成回调"""
+        # 部分操作可能多次发出完成信号(例如上传前自动初始化), 只记录第一次
+        if index not in self._running:
+            return
         
-        # 复制整个目录
-        shutil.copytree(self.local_path, self.backup_path, dirs_exist_ok=True)
+        worker = self._running.pop(index)
+        elapsed = time.monotonic() - self._started_at.pop(index, time.monotonic())
+        self._record(index, success, message, elapsed)
         
-        self.progress.emit(f"✓ 备份完成: {self.backup_path}", "success")
-        return self.backup_path
+        # 释放时通过 released 信号启动后续仓库
+        self.activity.release(self.repos[index]['local_path'], worker)
+        self._fill()
+        self._check_all_finished()
     
-    def _find_main_script(self):
-        """查找主程序脚本"""
-        # 查找可能的主程序文件
-        possible_names = ['main.py', 'app.py', 'run.py', 'start.py', '__main__.py']
-        
-        for name in possible_names:
-            script_path = Path(self.local_path) / name
-            if script_path.exists():
-                return str(script_path)
+    def _on_trace(self, index, trace):
+        """保存单个仓库的耗时追踪"""
+        self.traces[index] = trace
+        self.repo_traced.emit(index, trace)
+    
+    def _record(self, index, success, message, elapsed):
+        """记录单个仓库结果"""
+        if success:
+            self._succeeded += 1
+        else:
+            self._failed += 1
+        self.repo_finished.emit(index, success, message, elapsed)
+    
+    def _check_all_finished(self):
+        """所有仓库完成时发出汇总信号"""
+        if not self._running and not self._pending:
+            self.all_finished.emit(self._succeeded, self._failed, self.elapsed)
+
+
+# ================================
+# 异步状态服务
+# ================================
+class StatusProbe(QThread):
+    """状态探测线程 - 在后台执行一次 git status"""
+    result = pyqtSignal(int, object, str, str)  # (请求代次, RepoStatus或None, 状态说明, 错误信息)
+    
+    def __init__(self, generation, local_path, tracker=None, paths=None):
+        super().__init__()
+        self.generation = generation
+        self.local_path = local_path
+        self.tracker = tracker
+        self.paths = paths
+    
+    def run(self):
+        """探测仓库状态"""
+        if not self.local_path or not os.path.exists(self.local_path):
+            self.result.emit(self.generation, None, "未配置", "")
+            return
         
-        # 如果没有找到,查找第一个.py文件
-        for file in Path(self.local_path).glob("*.py"):
-            if file.name != "__init__.py":
-                return str(file)
+        git = GitRunner(self.local_path)
+        if not git.is_repo():
+            self.result.emit(self.generation, None, "未初始化", "")
+            return
         
-        return None
-
-    def _check_status(self):
-        """检查仓库状态"""
         try:
-            # 检查是否是Git仓库
-            if not os.path.exists('.git'):
-                self.finished.emit(False, "当前目录不是Git仓库")
-                return
-            
-            # 获取分支
-            branch = self._run_cmd("git branch --show-current", "获取当前分支", silent=True)
-            self.progress.emit(f"当前分支: {branch or 'main'}", "info")
-            
-            # 检查状态
-            status = self._run_cmd("git status --porcelain", "检查文件状态", silent=True)
-            if status:
-                changes = len(status.split('\n'))
-                self.progress.emit(f"未提交更改: {changes} 个文件", "warning")
+            if self.tracker is None:
+                status = git.status()
+            elif self.paths is None:
+                status = self.tracker.full_refresh()
             else:
-                self.progress.emit("工作区干净", "success")
-            
-            self.finished.emit(True, "状态检查完成")
+                # 文件监视模式: 只重新检查变化的路径
+                status = self.tracker.refresh_paths(self.paths)
+            self.result.emit(self.generation, status, "", "")
         except Exception as e:
-            self.finished.emit(False, f"状态检查失败: {str(e)}")
-    
-    def _smart_upload(self):
-        """智能上传 - 检测更改并推送"""
-        self.progress.emit("📊 正在分析本地文件变化...", "info")
-        
-        # 确保仓库已初始化
-        if not os.path.exists('.git'):
-            self._init_repo()
-        
-        # 检查是否有变化
-        status = subprocess.run(
-            "git status --porcelain", 
-            shell=True, 
-            capture_output=True, 
-            text=True
-        ).stdout.strip()
-        
-        if not status:
-            self.finished.emit(True, "✓ 工作区干净,没有需要上传的更改")
+            self.result.emit(self.generation, None, "检查失败", str(e))
+
+
+class StatusService(QObject):
+    """异步状态服务 - 后台刷新、请求防抖、丢弃过期结果, 文件监视驱动增量刷新"""
+    status_ready = pyqtSignal(object)  # RepoStatus
+    status_unavailable = pyqtSignal(str, str)  # (状态说明, 错误信息)
+    watching = pyqtSignal(str, str)  # (仓库路径, 监视后端)
+    _changes = pyqtSignal(object, bool)  # 监视线程 -> 主线程: (变化路径, 是否全量)
+    
+    DEBOUNCE_MS = 300
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._local_path = ""
+        self._generation = 0
+        self._probe = None
+        self._rerun = False
+        
+        # 文件监视与增量状态
+        self._watcher = None
+        self._tracker = None
+        self._watched_path = None
+        self._pending_paths = set()
+        self._pending_full = True
+        self._changes.connect(self._on_changes)
+        
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self._start_probe)
+    
+    def request(self, local_path, delay=None):
+        """请求全量刷新, 短时间内的多次请求合并为一次"""
+        if local_path != self._watched_path:
+            self._watch(local_path)
+        self._local_path = local_path
+        self._pending_full = True
+        self._generation += 1
+        self._debounce.start(self.DEBOUNCE_MS if delay is None else delay)
+    
+    def shutdown(self):
+        """停止服务并等待进行中的探测结束"""
+        self._debounce.stop()
+        self._rerun = False
+        self._generation += 1
+        self._stop_watcher()
+        if self._probe is not None:
+            self._probe.wait()
+    
+    def _watch(self, local_path):
+        """切换监视的仓库"""
+        self._stop_watcher()
+        if not local_path or not GitRunner(local_path).is_repo():
             return
         
-        # 显示变化统计
-        changes = status.split('\n')
-        self.progress.emit(f"检测到 {len(changes)} 个文件变化", "info")
-        
-        # 添加所有文件
-        self._run_cmd("git add .", "添加文件到暂存区")
-        
-        # 提交更改
-        from datetime import datetime
-        commit_msg = f"Auto sync: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        self._run_cmd(f'git commit -m "{commit_msg}"', "提交更改")
-        
-        # 推送到远程
-        try:
-            self._run_cmd("git push origin main", "推送到远程仓库")
-        except:
-            # 如果是第一次推送
-            self._run_cmd("git push -u origin main", "首次推送到远程仓库")
+        self._tracker = StatusTracker(GitRunner(local_path))
+        self._watched_path = local_path
+        self._watcher = WorkTreeWatcher(
+            local_path,
+            lambda paths, full: self._changes.emit(paths, full),
+            lambda backend: self.watching.emit(local_path, backend)
+        )
+        self._watcher.start()
+    
+    def _stop_watcher(self):
+        """停止当前文件监视"""
+        if self._watcher is not None:
+            self._watcher.stop()
+        self._watcher = None
+        self._tracker = None
+        self._watched_path = None
+        self._pending_paths = set()
+    
+    def _on_changes(self, paths, full):
+        """文件监视批次回调 (主线程)"""
+        if full:
+            self._pending_full = True
+        else:
+            self._pending_paths |= paths
+        self._generation += 1
+        self._debounce.start(self.DEBOUNCE_MS)
+    
+    def _start_probe(self):
+        """启动探测线程, 同一时刻最多一个"""
+        if self._probe is not None and self._probe.isRunning():
+            # 当前探测结束后再以最新请求重新执行
+            self._rerun = True
+            return
         
-        self.finished.emit(True, f"✓ 上传成功! {len(changes)} 个文件已同步到远程仓库")
+        # 监视模式下未要求全量时只检查变化的路径
+        paths = None
+        if self._tracker is not None and not self._pending_full:
+            paths = self._pending_paths
+        self._pending_paths = set()
+        self._pending_full = False
+        
+        probe = StatusProbe(self._generation, self._local_path, self._tracker, paths)
+        probe.result.connect(self._on_result)
+        probe.finished.connect(self._on_probe_finished)
+        self._probe = probe
+        probe.start()
     
-    def _smart_download(self):
-        """智能下载 - 拉取远程更新"""
-        self.progress.emit("🔍 正在检查远程仓库更新...", "info")
+    def _on_result(self, generation, status, state, error):
+        """探测结果回调, 丢弃过期请求的结果"""
+        if status is None:
+            # 增量状态可能已不完整, 下次全量刷新
+            self._pending_full = True
         
-        if not os.path.exists('.git'):
-            self.finished.emit(False, "本地仓库未初始化,请先初始化仓库")
+        if generation != self._generation:
             return
         
-        # 获取远程更新
-        self._run_cmd("git fetch origin", "获取远程更新信息")
+        if status is not None:
+            self.status_ready.emit(status)
+        else:
+            self.status_unavailable.emit(state, error)
+    
+    def _on_probe_finished(self):
+        """探测线程退出后处理排队的刷新"""
+        if self._rerun:
+            self._rerun = False
+            self._start_probe()
+
+
+# ================================
+# 自动同步服务
+# ================================
+class AutoSyncService(QObject):
+    """后台自动同步 - 按 AutoSyncPolicy 调度, 全局并发上限, 本地改动由文件监视触发"""
+    repo_started = pyqtSignal(str, str)  # (仓库路径, 操作)
+    repo_finished = pyqtSignal(str, bool, str, float)  # (仓库路径, 成功, 消息, 重试等待秒数)
+    _changes = pyqtSignal(str)  # 监视线程 -> 主线程: 仓库路径
+    
+    DEFAULT_MAX_CONCURRENT = 4
+    MAX_WATCHED_REPOS = 50  # 超过该数量时只按时间间隔调度, 不再逐个监视文件
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.policy = AutoSyncPolicy()
+        self.config = {}
+        self.max_concurrent = self.DEFAULT_MAX_CONCURRENT
+        self.is_busy = lambda local_path: False  # 由主窗口提供: 仓库是否有排队中的手动任务
+        self.activity = RepoActivity.shared()
+        self._workers = {}  # 仓库路径 -> GitWorker
+        self._done_workers = []
+        self._watchers = {}
+        self._changes.connect(self._on_changed)
+        
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._dispatch)
+    
+    @property
+    def active(self):
+        """正在执行的仓库数"""
+        return len(self._workers)
+    
+    def is_running(self, local_path):
+        """自动同步是否正在该仓库上执行"""
+        owner = self.activity.owner(local_path)
+        return owner is not None and any(worker is owner for worker in self._workers.values())
+    
+    def configure(self, repos, config, max_concurrent=None):
+        """设置调度的仓库与操作配置, 空列表表示停止调度"""
+        self.config = config
+        if max_concurrent:
+            self.max_concurrent = max(1, int(max_concurrent))
+        self.policy.configure(repos, time.monotonic())
+        
+        # 文件监视: 仓库不多时逐个监视, 改动静默后触发
+        wanted = set(self.policy.repos) if len(self.policy.repos) <= self.MAX_WATCHED_REPOS else set()
+        for path in list(self._watchers):
+            if path not in wanted:
+                self._watchers.pop(path).stop()
+        for path in wanted - set(self._watchers):
+            if GitRunner(path).is_repo():
+                watcher = WorkTreeWatcher(
+                    path, lambda paths, full, p=path: paths and self._changes.emit(p)
+                )
+                watcher.start()
+                self._watchers[path] = watcher
         
-        # 检查是否有远程更新
-        try:
-            behind = self._run_cmd(
-                "git rev-list HEAD..origin/main --count",
-                "检查远程更新",
-                silent=True
-            )
+        self._schedule()
+    
+    def shutdown(self):
+        """停止调度与监视, 等待执行中的操作结束"""
+        self._timer.stop()
+        self.policy.configure([], time.monotonic())
+        for watcher in self._watchers.values():
+            watcher.stop()
+        self._watchers.clear()
+        for worker in list(self._workers.values()) + self._done_workers:
+            worker.wait()
+    
+    def _on_changed(self, local_path):
+        """仓库工作区有文件变化 (忽略只涉及 .git 的变化)"""
+        self.policy.mark_changed(local_path, time.monotonic())
+        self._schedule()
+    
+    def _schedule(self):
+        """定时到下一个仓库到期的时刻"""
+        wait = self.policy.next_wakeup(time.monotonic())
+        if wait is None:
+            self._timer.stop()
+            return
+        # 至少间隔 1 秒, 同一时刻到期的仓库合并处理
+        self._timer.start(max(1000, int(wait * 1000)))
+    
+    def _dispatch(self):
+        """启动到期的仓库, 不超过全局并发上限"""
+        now = time.monotonic()
+        for state in self.policy.due(now, self.max_concurrent - self.active):
+            path = state['local_path']
+            if self.is_busy(path) or self.activity.is_running(path):
+                # 手动任务或批量操作进行中, 稍后再试
+                self.policy.defer(path, now, AutoSyncPolicy.SETTLE_SECONDS)
+                continue
             
-            if behind and behind != "0":
-                self.progress.emit(f"发现 {behind} 个远程提交", "info")
-                self._run_cmd("git pull origin main", "拉取远程更新")
-                self.finished.emit(True, f"✓ 下载成功! 已更新 {behind} 个提交")
-            else:
-                self.finished.emit(True, "✓ 本地已是最新版本")
-        except Exception as e:
-            # 如果分支不存在,尝试直接拉取
-            try:
-                self._run_cmd("git pull origin main", "拉取远程更新")
-                self.finished.emit(True, "✓ 下载成功! 本地仓库已更新")
-            except:
-                self.finished.emit(False, f"下载失败: {str(e)}")
+            worker = GitWorker(state['operation'], path, state['remote_url'], self.config)
+            worker.finished.connect(
+                lambda success, message, p=path: self._on_finished(p, success, message)
+            )
+            self._workers[path] = worker
+            self.activity.acquire(path, worker)
+            self.repo_started.emit(path, state['operation'])
+            worker.start()
+        self._schedule()
     
-    def _smart_sync(self):
-        """智能同步 - 双向同步"""
-        self.progress.emit("🔄 正在执行双向智能同步...", "info")
-        
-        if not os.path.exists('.git'):
-            self.finished.emit(False, "本地仓库未初始化,请先初始化仓库")
+    def _on_finished(self, local_path, success, message):
+        """单个仓库完成 (部分操作可能多次发出完成信号, 只处理第一次)"""
+        worker = self._workers.pop(local_path, None)
+        if worker is None:
             return
-        
-        # 1. 保存本地更改
-        status = subprocess.run(
-            "git status --porcelain",
-            shell=True,
-            capture_output=True,
-            text=True
-        ).stdout.strip()
-        
-        has_local_changes = bool(status)
-        
-        if has_local_changes:
-            self.progress.emit("保存本地更改...", "info")
-            self._run_cmd("git add .", "添加本地更改")
-            from datetime import datetime
-            commit_msg = f"Sync: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            self._run_cmd(f'git commit -m "{commit_msg}"', "提交本地更改")
-        
-        # 2. 拉取远程更新
-        self.progress.emit("拉取远程更新...", "info")
-        try:
-            self._run_cmd("git fetch origin", "获取远程信息")
-            self._run_cmd("git pull origin main --rebase", "合并远程更改")
-        except:
-            # 如果有冲突,尝试使用merge
-            try:
-                self._run_cmd("git pull origin main", "合并远程更改")
-            except:
-                pass
-        
-        # 3. 推送到远程
-        self.progress.emit("推送到远程仓库...", "info")
-        try:
-            self._run_cmd("git push origin main", "推送更新")
-        except:
-            self._run_cmd("git push -u origin main", "推送更新")
-        
-        self.finished.emit(True, "✓ 同步完成! 本地与远程已保持一致")
+        self.activity.release(local_path, worker)
+        # 完成信号发出时线程可能尚未退出, 保留引用直到线程结束
+        self._done_workers = [w for w in self._done_workers if w.isRunning()] + [worker]
+        retry = self.policy.finished(local_path, success, time.monotonic())
+        self.repo_finished.emit(local_path, success, message, retry)
+        self._schedule()
+
+
+# ================================
+# 操作日志模型
+# ================================
+class LogModel(QAbstractListModel):
+    """环形缓冲日志模型 - 超过上限时丢弃最早的行, 新日志按帧合并后批量插入"""
     
-    def _smart_overwrite(self):
-        """强制覆盖远程"""
-        self.progress.emit("⚠ 正在强制覆盖远程仓库...", "warning")
-        
-        if not os.path.exists('.git'):
-            self._init_repo()
-        
-        # 添加并提交所有文件
-        self._run_cmd("git add .", "添加所有文件")
-        from datetime import datetime
-        commit_msg = f"Force overwrite: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        
-        try:
-            self._run_cmd(f'git commit -m "{commit_msg}"', "提交更改")
-        except:
-            pass  # 可能没有更改
-        
-        # 强制推送
-        self._run_cmd("git push -f origin main", "强制推送")
-        
-        self.finished.emit(True, "✓ 覆盖完成! 远程仓库已被本地版本替换")
+    DEFAULT_MAX_LINES = 5000
+    FLUSH_INTERVAL_MS = 16  # 约一帧
     
-    def _smart_delete(self):
-        """删除远程所有文件"""
-        self.progress.emit("🗑 正在清理远程仓库...", "warning")
-        
-        if not os.path.exists('.git'):
-            self.finished.emit(False, "本地仓库未初始化")
+    COLORS = {
+        "info": QColor("#3b82f6"),
+        "success": QColor("#10b981"),
+        "warning": QColor("#f59e0b"),
+        "error": QColor("#ef4444")
+    }
+    DEFAULT_COLOR = QColor("#cbd5e1")
+    
+    flushed = pyqtSignal()
+    
+    def __init__(self, max_lines=DEFAULT_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.max_lines = max(1, max_lines)
+        self._lines = deque(maxlen=self.max_lines)  # (显示文本, 类型)
+        self._pending = []
+        
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lines)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._lines):
+            return None
+        text, msg_type = self._lines[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return text
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.COLORS.get(msg_type, self.DEFAULT_COLOR)
+        return None
+    
+    def append(self, message, msg_type="info"):
+        """加入待显示队列, 同一帧内的日志合并为一次插入"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self._pending.append((f"[{timestamp}] {message}", msg_type))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def flush(self):
+        """把待显示队列批量写入模型"""
+        self._flush_timer.stop()
+        pending, self._pending = self._pending[-self.max_lines:], []
+        if not pending:
             return
         
-        # 删除所有文件并提交
-        self._run_cmd("git rm -rf .", "删除所有文件")
-        self._run_cmd('git commit -m "Clean repository"', "提交删除")
-        self._run_cmd("git push origin main", "推送删除")
-        
-        self.finished.emit(True, "✓ 删除完成! 远程文件已清理")
+        overflow = len(self._lines) + len(pending) - self.max_lines
+        if overflow >= len(self._lines) and self._lines:
+            # 整个缓冲区都被替换, 直接重置比逐行删除便宜
+            self.beginResetModel()
+            self._lines.clear()
+            self._lines.extend(pending)
+            self.endResetModel()
+        else:
+            if overflow > 0:
+                self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+                for _ in range(overflow):
+                    self._lines.popleft()
+                self.endRemoveRows()
+            start = len(self._lines)
+            self.beginInsertRows(QModelIndex(), start, start + len(pending) - 1)
+            self._lines.extend(pending)
+            self.endInsertRows()
+        self.flushed.emit()
+    
+    def clear(self):
+        """清空日志"""
+        self._pending = []
+        self.beginResetModel()
+        self._lines.clear()
+        self.endResetModel()
+    
+    def text(self):
+        """全部日志的纯文本"""
+        return "\n".join(text for text, _ in self._lines)
 
 
 # ================================
@@ -440,8 +892,38 @@ class GitHubManager(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.config_file = Path.home() / ".github_manager_config.json"
-        self.worker = None
+        self.config_file = CONFIG_FILE
+        self.last_trace = None
+        self._progress_job = None  # 进度条显示的任务 (最近开始的)
+        self._batch_results = []  # 队列清空前完成的任务结果
+        
+        # 操作任务队列
+        self.job_queue = JobQueue(
+            self._read_config_file().get('queue_max_concurrent', JobQueue.DEFAULT_MAX_CONCURRENT), self
+        )
+        self.job_queue.changed.connect(self.refresh_queue_view)
+        self.job_queue.job_started.connect(self.on_job_started)
+        self.job_queue.job_progress.connect(self.on_progress)
+        self.job_queue.job_transfer.connect(self.on_transfer_progress)
+        self.job_queue.job_finished.connect(self.on_operation_finished)
+        self.job_queue.job_trace.connect(lambda job, trace: self.on_trace_ready(trace))
+        self.job_queue.job_script.connect(lambda job, path: self.execute_downloaded_script(path))
+        
+        # 后台状态刷新
+        self.status_service = StatusService(self)
+        self.status_service.status_ready.connect(self.on_status_ready)
+        self.status_service.status_unavailable.connect(self.on_status_unavailable)
+        self.status_service.watching.connect(
+            lambda path, backend: self.log(f"👁 正在监视 {Path(path).name} 的文件变化 ({backend})", "info")
+        )
+        
+        # 后台自动同步
+        self.auto_sync = AutoSyncService(self)
+        self.auto_sync.is_busy = self._is_repo_busy
+        self.auto_sync.repo_started.connect(
+            lambda path, operation: self.log(f"⏰ 自动{operation}: {Path(path).name}", "info")
+        )
+        self.auto_sync.repo_finished.connect(self.on_auto_sync_finished)
         
         # 检查Git
         if not DependencyManager.check_git():
@@ -454,12 +936,13 @@ class GitHubManager(QMainWindow):
         
         self.init_ui()
         self.load_config()
-        QTimer.singleShot(500, self.auto_check_status)
+        # 状态检查在后台线程执行, 事件循环启动后立即发起
+        QTimer.singleShot(0, self.auto_check_status)
     
     def init_ui(self):
         """初始化用户界面"""
         self.setWindowTitle("GitHub 仓库智能管理器 v2.0 Professional")
-        self.setGeometry(100, 100, 1100, 750)
+        self.setGeometry(100, 100, 1100, 860)
         self.setStyleSheet(self._get_stylesheet())
         
         # 主窗口部件
@@ -485,6 +968,10 @@ class GitHubManager(QMainWindow):
         operations_group = self._create_operations_group()
         layout.addWidget(operations_group)
         
+        # 任务队列区域
+        queue_group = self._create_queue_group()
+        layout.addWidget(queue_group)
+        
         # 日志区域
         log_group = self._create_log_group()
         layout.addWidget(log_group)
@@ -620,18 +1107,121 @@ class GitHubManager(QMainWindow):
         refresh_btn.clicked.connect(self.auto_check_status)
         button_layout.addWidget(refresh_btn)
         
-        layout.addLayout(button_layout, 4, 0, 1, 3)
+        fleet_btn = QPushButton("🛰 批量管理")
+        fleet_btn.setToolTip("在多个仓库上并发执行操作")
+        fleet_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #8b5cf6, stop:1 #7c3aed);
+                color: white;
+                font-weight: bold;
+                padding: 8px 15px;
+                border-radius: 6px;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #7c3aed, stop:1 #6d28d9);
+            }
+        """)
+        fleet_btn.clicked.connect(self.open_fleet_dialog)
+        button_layout.addWidget(fleet_btn)
         
-        group.setLayout(layout)
-        return group
-    
-    def _create_status_group(self):
-        """创建状态组"""
-        group = QGroupBox("📊 仓库状态")
-        group.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        layout = QGridLayout()
-        layout.setSpacing(6)
-        layout.setContentsMargins(8, 12, 8, 8)
+        backup_btn = QPushButton("🗂 备份管理")
+        backup_btn.setToolTip("列出、比较和恢复本地备份快照")
+        backup_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #06b6d4, stop:1 #0891b2);
+                color: white;
+                font-weight: bold;
+                padding: 8px 15px;
+                border-radius: 6px;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #0891b2, stop:1 #0e7490);
+            }
+        """)
+        backup_btn.clicked.connect(self.open_backup_dialog)
+        button_layout.addWidget(backup_btn)
+        
+        history_btn = QPushButton("📜 操作历史")
+        history_btn.setToolTip("按仓库、时间和结果查询历次操作及其执行的命令")
+        history_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #64748b, stop:1 #475569);
+                color: white;
+                font-weight: bold;
+                padding: 8px 15px;
+                border-radius: 6px;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #475569, stop:1 #334155);
+            }
+        """)
+        history_btn.clicked.connect(self.open_journal_dialog)
+        button_layout.addWidget(history_btn)
+        
+        tune_btn = QPushButton("🚀 性能调优")
+        tune_btn.setToolTip("为大仓库启用 fsmonitor、untracked cache、commit-graph 等特性并登记后台维护")
+        tune_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #ec4899, stop:1 #db2777);
+                color: white;
+                font-weight: bold;
+                padding: 8px 15px;
+                border-radius: 6px;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #db2777, stop:1 #be185d);
+            }
+        """)
+        tune_btn.clicked.connect(self.tune_repo)
+        button_layout.addWidget(tune_btn)
+        
+        self.auto_sync_btn = QPushButton("⏰ 自动同步")
+        self.auto_sync_btn.setCheckable(True)
+        self.auto_sync_btn.setToolTip(
+            "按间隔或在本地改动静默后自动同步当前仓库和批量列表中设置了自动间隔的仓库\n"
+            "失败时指数退避重试, 同时执行的仓库数受并发上限限制"
+        )
+        self.auto_sync_btn.setStyleSheet("""
+            QPushButton {
+                background: #334155;
+                color: white;
+                font-weight: bold;
+                padding: 8px 15px;
+                border-radius: 6px;
+                font-size: 13px;
+            }
+            QPushButton:checked {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #10b981, stop:1 #059669);
+            }
+        """)
+        self.auto_sync_btn.toggled.connect(self.toggle_auto_sync)
+        button_layout.addWidget(self.auto_sync_btn)
+        
+        layout.addLayout(button_layout, 4, 0, 1, 3)
+        
+        group.setLayout(layout)
+        return group
+    
+    def _create_status_group(self):
+        """创建状态组"""
+        group = QGroupBox("📊 仓库状态")
+        group.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        layout = QGridLayout()
+        layout.setSpacing(6)
+        layout.setContentsMargins(8, 12, 8, 8)
         
         # 创建状态标签
         self.branch_label = self._create_status_label("🌿 分支", "--", "#10b981")
@@ -732,6 +1322,99 @@ class GitHubManager(QMainWindow):
         btn.clicked.connect(callback)
         return btn
     
+    QUEUE_COLUMNS = ["#", "仓库", "操作", "优先级", "状态", "消息"]
+    QUEUE_STATE_COLORS = {
+        Job.QUEUED: "#9ca3af",
+        Job.RUNNING: "#3b82f6",
+        Job.DONE: "#10b981",
+        Job.FAILED: "#ef4444",
+        Job.CANCELLED: "#f59e0b",
+    }
+    
+    def _create_queue_group(self):
+        """创建任务队列组"""
+        group = QGroupBox("🗃 任务队列")
+        group.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        layout = QHBoxLayout()
+        layout.setContentsMargins(8, 12, 8, 8)
+        
+        self.queue_table = QTableWidget(0, len(self.QUEUE_COLUMNS))
+        self.queue_table.setHorizontalHeaderLabels(self.QUEUE_COLUMNS)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.queue_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.queue_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.queue_table.verticalHeader().setVisible(False)
+        self.queue_table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        self.queue_table.setMaximumHeight(120)
+        self.queue_table.setFont(QFont("Consolas", 9))
+        self.queue_table.setStyleSheet(table_stylesheet(header_padding=2))
+        layout.addWidget(self.queue_table)
+        
+        button_layout = QVBoxLayout()
+        for text, tooltip, callback in (
+            ("⬆ 提前", "提高所选排队任务的优先级", lambda: self._queue_action("up")),
+            ("⬇ 延后", "降低所选排队任务的优先级", lambda: self._queue_action("down")),
+            ("⏹ 取消", "取消所选任务, 执行中的任务会终止其 git 进程", lambda: self._queue_action("cancel")),
+            ("🧹 清除已完成", "移除已结束的任务", self.job_queue.clear_finished),
+        ):
+            btn = QPushButton(text)
+            btn.setToolTip(tooltip)
+            btn.clicked.connect(callback)
+            button_layout.addWidget(btn)
+        layout.addLayout(button_layout)
+        
+        group.setLayout(layout)
+        return group
+    
+    def _queue_action(self, action):
+        """对所选任务执行操作"""
+        rows = {index.row() for index in self.queue_table.selectedIndexes()}
+        if not rows:
+            return
+        job_id = int(self.queue_table.item(rows.pop(), 0).text())
+        if action == "up":
+            self.job_queue.set_priority(job_id, 1)
+        elif action == "down":
+            self.job_queue.set_priority(job_id, -1)
+        elif action == "cancel":
+            self.job_queue.cancel(job_id)
+        self._select_job(job_id)
+    
+    def _select_job(self, job_id):
+        """刷新后保持选中同一任务"""
+        for row in range(self.queue_table.rowCount()):
+            if self.queue_table.item(row, 0).text() == str(job_id):
+                self.queue_table.selectRow(row)
+                return
+    
+    def refresh_queue_view(self):
+        """按队列状态重绘任务表"""
+        rows = {index.row() for index in self.queue_table.selectedIndexes()}
+        selected = self.queue_table.item(rows.pop(), 0).text() if rows else None
+        
+        jobs = self.job_queue.ordered()
+        self.queue_table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            values = [str(job.id), Path(job.local_path).name, job.operation,
+                      str(job.priority), job.state, job.message.split("\n")[0]]
+            for column, value in enumerate(values):
+                item = self.queue_table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.queue_table.setItem(row, column, item)
+                item.setText(value)
+                if column == 1:
+                    item.setToolTip(job.local_path)
+                if column == 4:
+                    item.setForeground(QColor(self.QUEUE_STATE_COLORS.get(job.state, "#cbd5e1")))
+        
+        if selected:
+            self._select_job(selected)
+        pending = self.job_queue.pending()
+        self.statusBar().showMessage(
+            f"执行中 {self.job_queue.active} | 排队 {pending - self.job_queue.active}" if pending else "就绪"
+        )
+    
     def _create_log_group(self):
         """创建日志组"""
         group = QGroupBox("📋 操作日志")
@@ -739,27 +1422,50 @@ class GitHubManager(QMainWindow):
         layout = QVBoxLayout()
         layout.setContentsMargins(8, 12, 8, 8)
         
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setMinimumHeight(130)
-        self.log_text.setMaximumHeight(150)
-        self.log_text.setFont(QFont("Consolas", 9))
-        self.log_text.setStyleSheet("""
-            QTextEdit {
+        # 日志行数上限可在配置文件中通过 log_max_lines 调整
+        max_lines = self._read_config_file().get('log_max_lines', LogModel.DEFAULT_MAX_LINES)
+        self.log_model = LogModel(max_lines, self)
+        self.log_model.flushed.connect(self._scroll_log)
+        self._log_follow = True
+        
+        # 列表视图只绘制可见行, 日志再多也不影响界面响应
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.log_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.log_view.setMinimumHeight(130)
+        self.log_view.setMaximumHeight(150)
+        self.log_view.setFont(QFont("Consolas", 9))
+        self.log_view.setStyleSheet("""
+            QListView {
                 background-color: #0f172a;
                 color: #e2e8f0;
                 border: 2px solid #1e293b;
                 border-radius: 8px;
                 padding: 10px;
                 font-family: 'Consolas', 'Courier New', monospace;
+                font-weight: bold;
             }
         """)
-        layout.addWidget(self.log_text)
+        # 用户向上翻看时不再自动滚动到底部
+        self.log_view.verticalScrollBar().valueChanged.connect(self._on_log_scrolled)
+        layout.addWidget(self.log_view)
         
         # 清空日志按钮
         clear_btn = QPushButton("🧹 清空日志")
-        clear_btn.clicked.connect(self.log_text.clear)
-        layout.addWidget(clear_btn)
+        clear_btn.clicked.connect(self.log_model.clear)
+        
+        # 导出最近一次操作的耗时追踪
+        self.trace_btn = QPushButton("⏱ 导出耗时追踪")
+        self.trace_btn.setToolTip("导出最近一次操作的步骤与命令耗时 (Chrome trace 格式)")
+        self.trace_btn.setEnabled(False)
+        self.trace_btn.clicked.connect(self.export_trace)
+        
+        log_buttons = QHBoxLayout()
+        log_buttons.addWidget(clear_btn)
+        log_buttons.addWidget(self.trace_btn)
+        layout.addLayout(log_buttons)
         
         group.setLayout(layout)
         return group
@@ -847,6 +1553,25 @@ class GitHubManager(QMainWindow):
         if folder:
             self.local_path_input.setText(folder)
     
+    def _read_config_file(self):
+        """读取配置文件, 不存在或损坏时返回空配置"""
+        return read_config_file(self.config_file)
+    
+    def _update_config_file(self, updates):
+        """合并写入配置文件, 保留其他功能的配置项"""
+        config = self._read_config_file()
+        config.update(updates)
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+    
+    def _worker_config(self):
+        """构造工作线程配置"""
+        return build_worker_config(
+            self._read_config_file(),
+            self.username_input.text(),
+            self.email_input.text()
+        )
+    
     def load_config(self):
         """加载配置"""
         try:
@@ -858,6 +1583,7 @@ class GitHubManager(QMainWindow):
                     self.username_input.setText(config.get('username', ''))
                     self.email_input.setText(config.get('email', ''))
                     self.log("✓ 配置已从本地加载", "success")
+                    self.auto_sync_btn.setChecked(config.get('auto_sync_enabled', False))
             else:
                 # 使用默认配置
                 self.local_path_input.setText(r"G:\PYthon\GitHub 仓库管理\GitHub 仓库管理")
@@ -886,95 +1612,76 @@ class GitHubManager(QMainWindow):
                 return
             
             # 保存到文件
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            self._update_config_file(config)
             
             self.log("✓ 配置已保存", "success")
             QMessageBox.information(self, "成功", "配置已保存!")
+            self.configure_auto_sync()
             self.auto_check_status()
         except Exception as e:
             self.log(f"✗ 保存配置失败: {str(e)}", "error")
             QMessageBox.critical(self, "错误", f"保存配置失败: {str(e)}")
     
     def log(self, message, msg_type="info"):
-        """添加日志"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # 颜色映射
-        colors = {
-            "info": "#3b82f6",
-            "success": "#10b981",
-            "warning": "#f59e0b",
-            "error": "#ef4444"
-        }
-        
-        color = colors.get(msg_type, "#cbd5e1")
-        
-        html = f'<span style="color: #64748b;">[{timestamp}]</span> '
-        html += f'<span style="color: {color}; font-weight: bold;">{message}</span>'
-        
-        self.log_text.append(html)
-        
-        # 自动滚动到底部
-        scrollbar = self.log_text.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        """添加日志 (按帧合并渲染)"""
+        self.log_model.append(message, msg_type)
+    
+    def _on_log_scrolled(self, value):
+        """记录用户是否停留在日志底部"""
+        self._log_follow = value >= self.log_view.verticalScrollBar().maximum()
+    
+    def _scroll_log(self):
+        """批量写入后, 停留在底部时继续跟随最新日志"""
+        if self._log_follow:
+            self.log_view.scrollToBottom()
+    
+    # 保留最近若干次启动耗时
+    STARTUP_HISTORY_SIZE = 20
+    
+    def record_startup_time(self):
+        """记录启动到可交互的耗时, 并与近期启动的中位数对比"""
+        elapsed_ms = round((time.perf_counter() - STARTUP_T0) * 1000)
+        history = self._read_config_file().get('startup_ms', [])
+        history = (history + [elapsed_ms])[-self.STARTUP_HISTORY_SIZE:]
+        median = sorted(history)[len(history) // 2]
+        try:
+            self._update_config_file({'startup_ms': history})
+        except OSError:
+            pass
+        self.log(f"⏱ 启动耗时 {elapsed_ms} ms (近 {len(history)} 次中位数 {median} ms)", "info")
     
     def auto_check_status(self):
-        """自动检查仓库状态"""
-        local_path = self.local_path_input.text()
-        if not local_path or not os.path.exists(local_path):
-            self.update_status_display("--", "--", "--", "未配置")
-            return
+        """自动检查仓库状态 (后台执行, 结果通过信号更新显示)"""
+        self.status_service.request(self.local_path_input.text())
+    
+    def on_status_ready(self, status):
+        """状态刷新完成回调 (悬停未提交数可查看部分改动文件)"""
+        self.update_status_display(*self._format_status(status))
+        self.uncommitted_label.setToolTip("\n".join(status.sample_lines()))
+    
+    def on_status_unavailable(self, state, error):
+        """无法获取状态回调"""
+        if error:
+            self.log(f"⚠ 状态检查失败: {error}", "warning")
+        self.update_status_display("--", "--", "--", state)
+        self.uncommitted_label.setToolTip("")
+    
+    @staticmethod
+    def _format_status(status):
+        """将 RepoStatus 转换为状态面板的四个显示值"""
+        if not status.has_upstream:
+            sync_status = "本地仓库"
+        elif status.behind:
+            sync_status = f"⬇ 落后 {status.behind}"
+        else:
+            sync_status = "✓ 已连接"
         
-        try:
-            os.chdir(local_path)
-            
-            # 检查是否是Git仓库
-            if not os.path.exists('.git'):
-                self.update_status_display("--", "--", "--", "未初始化")
-                return
-            
-            # 获取分支
-            branch = subprocess.run(
-                "git branch --show-current",
-                shell=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            ).stdout.strip() or "main"
-            
-            # 未提交更改
-            status = subprocess.run(
-                "git status --porcelain",
-                shell=True,
-                capture_output=True,
-                text=True
-            ).stdout
-            uncommitted = len(status.strip().split('\n')) if status.strip() else 0
-            
-            # 未推送提交
-            try:
-                unpushed = subprocess.run(
-                    "git rev-list @{u}..HEAD --count",
-                    shell=True,
-                    capture_output=True,
-                    text=True
-                ).stdout.strip()
-            except:
-                unpushed = "--"
-            
-            # 更新显示
-            self.update_status_display(
-                branch,
-                str(uncommitted),
-                str(unpushed),
-                "✓ 已连接" if unpushed != "--" else "本地仓库"
-            )
-            
-        except Exception as e:
-            self.log(f"⚠ 状态检查失败: {str(e)}", "warning")
-            self.update_status_display("--", "--", "--", "检查失败")
+        return (
+            status.branch or "(detached)",
+            str(status.changed),
+            str(status.ahead) if status.has_upstream else "--",
+            sync_status
+        )
     
     def update_status_display(self, branch, uncommitted, unpushed, sync_status):
         """更新状态显示"""
@@ -983,7 +1690,10 @@ class GitHubManager(QMainWindow):
         self.unpushed_label.value_label.setText(unpushed)
         self.sync_label.value_label.setText(sync_status)
     
-    def execute_operation(self, operation, confirm_msg=None):
+    # 不需要远程仓库的操作
+    LOCAL_OPERATIONS = ("status", "backup", "restore", "tune")
+    
+    def execute_operation(self, operation, confirm_msg=None, extra_config=None):
         """执行Git操作"""
         # 验证配置
         local_path = self.local_path_input.text()
@@ -993,7 +1703,7 @@ class GitHubManager(QMainWindow):
             QMessageBox.warning(self, "警告", "请先配置本地路径!")
             return
         
-        if not remote_url and operation != "status":
+        if not remote_url and operation not in self.LOCAL_OPERATIONS:
             QMessageBox.warning(self, "警告", "请先配置远程仓库!")
             return
         
@@ -1007,43 +1717,100 @@ class GitHubManager(QMainWindow):
             if reply != QMessageBox.StandardButton.Yes:
                 return
         
-        # 禁用UI
-        self.setEnabled(False)
+        # 加入任务队列 (界面保持可用, 同一仓库的任务依次执行)
+        config = self._worker_config()
+        config.update(extra_config or {})
+        
+        job = self.job_queue.submit(operation, local_path, remote_url, config)
+        if job.state == Job.QUEUED:
+            self.log(f"🗃 已加入队列: #{job.id} {Path(local_path).name} {operation}", "info")
+    
+    def _job_prefix(self, job):
+        """非当前仓库的任务在日志中标注仓库名"""
+        if os.path.abspath(self.local_path_input.text() or ".") == job.repo_key:
+            return ""
+        return f"[{Path(job.local_path).name}] "
+    
+    def on_job_started(self, job):
+        """任务开始, 进度条跟随最近开始的任务"""
+        self._progress_job = job
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)
-        self.statusBar().showMessage(f"正在执行: {operation}")
-        
-        # 创建工作线程
-        config = {
-            'username': self.username_input.text(),
-            'email': self.email_input.text()
-        }
-        
-        self.worker = GitWorker(operation, local_path, remote_url, config)
-        self.worker.progress.connect(self.on_progress)
-        self.worker.finished.connect(self.on_operation_finished)
-        self.worker.execute_script.connect(self.execute_downloaded_script)
-        self.worker.start()
+        self.log(f"▶ {self._job_prefix(job)}开始执行 #{job.id} {job.operation}", "info")
     
-    def on_progress(self, message, msg_type):
+    def on_progress(self, job, message, msg_type):
         """进度回调"""
-        self.log(message, msg_type)
+        self.log(self._job_prefix(job) + message, msg_type)
+        # 新步骤开始时恢复为不确定进度
+        if job is self._progress_job and message.startswith("▶"):
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setFormat("%p%")
     
-    def on_operation_finished(self, success, message):
-        """操作完成回调"""
-        self.setEnabled(True)
-        self.progress_bar.setVisible(False)
-        self.statusBar().showMessage("就绪")
+    def on_transfer_progress(self, job, percent, description):
+        """传输进度回调 - 显示阶段百分比、对象数与速率"""
+        if job is not self._progress_job:
+            return
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(percent)
+        self.progress_bar.setFormat(description)
+        self.statusBar().showMessage(description)
+    
+    def on_operation_finished(self, job, success, message):
+        """任务完成回调 - 队列清空时才弹出结果"""
+        self.log(self._job_prefix(job) + message, "success" if success else "error")
+        if job.state != Job.CANCELLED:  # 主动取消的任务不再弹窗
+            self._batch_results.append((job, success, message))
+        if job is self._progress_job:
+            self._progress_job = None
+            self.progress_bar.setVisible(False)
         
-        self.log(message, "success" if success else "error")
+        # 刷新状态
+        if job.repo_key == os.path.abspath(self.local_path_input.text() or "."):
+            self.auto_check_status()
         
-        if success:
-            QMessageBox.information(self, "成功", message)
+        if self.job_queue.pending():
+            return
+        results, self._batch_results = self._batch_results, []
+        if not results:
+            return
+        if len(results) == 1:
+            _, success, message = results[0]
+            if success:
+                QMessageBox.information(self, "成功", message)
+            else:
+                QMessageBox.critical(self, "错误", message)
+            return
+        failed = [(j, m) for j, ok, m in results if not ok]
+        summary = f"共完成 {len(results)} 个任务, 成功 {len(results) - len(failed)}, 失败 {len(failed)}"
+        if failed:
+            details = "\n".join(f"#{j.id} {Path(j.local_path).name} {j.operation}: {m.splitlines()[0] if m else ''}"
+                                for j, m in failed)
+            QMessageBox.warning(self, "任务完成", f"{summary}\n\n{details}")
         else:
-            QMessageBox.critical(self, "错误", message)
-        
-        # 刷新状态
-        QTimer.singleShot(500, self.auto_check_status)
+            QMessageBox.information(self, "任务完成", summary)
+    
+    def on_trace_ready(self, trace):
+        """操作结束后输出各步骤耗时"""
+        self.last_trace = trace
+        self.trace_btn.setEnabled(True)
+        self.log(f"⏱ {trace.summary()}", "info")
+    
+    def export_trace(self):
+        """导出最近一次操作的耗时追踪"""
+        if not self.last_trace:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出耗时追踪",
+            str(Path.home() / f"trace_{self.last_trace.name}_{datetime.now():%Y%m%d_%H%M%S}.json"),
+            "Chrome Trace (*.json)"
+        )
+        if not path:
+            return
+        try:
+            OperationTrace.export_chrome([self.last_trace], path)
+            self.log(f"⏱ 已导出耗时追踪: {path}", "success")
+        except OSError as e:
+            QMessageBox.warning(self, "导出失败", str(e))
     
     def execute_downloaded_script(self, script_path):
         """执行下载后的脚本"""
@@ -1080,7 +1847,40 @@ class GitHubManager(QMainWindow):
         self.execute_operation("upload")
     
     def smart_download(self):
-        """智能下载"""
+        """智能下载 - 本地尚无仓库时先选择首次下载方式, 浅克隆仓库可选择加深历史"""
+        local_path = self.local_path_input.text()
+        git = GitRunner(local_path) if local_path else None
+        
+        if git and not git.is_repo():
+            dialog = CloneDialog(self, self._read_config_file())
+            if not dialog.exec():
+                return
+            try:
+                self._update_config_file(dialog.options)
+            except OSError:
+                pass
+            self.execute_operation("download", None, dialog.options)
+            return
+        
+        if git and os.path.exists(os.path.join(git.git_dir(), "shallow")):
+            box = QMessageBox(QMessageBox.Icon.Question, "浅克隆仓库", "本地只有最近的部分提交历史。", parent=self)
+            box.setInformativeText("可以只下载远程更新, 或者同时加深本地历史。")
+            update_btn = box.addButton("📥 只下载更新", QMessageBox.ButtonRole.AcceptRole)
+            deepen_btn = box.addButton("📜 加深历史...", QMessageBox.ButtonRole.ActionRole)
+            box.addButton(QMessageBox.StandardButton.Cancel)
+            box.setDefaultButton(update_btn)
+            box.exec()
+            if box.clickedButton() is deepen_btn:
+                from PyQt6.QtWidgets import QInputDialog
+                depth, ok = QInputDialog.getInt(
+                    self, "加深历史", "再获取多少个提交 (0 表示获取完整历史):", 100, 0, 10_000_000
+                )
+                if ok:
+                    self.execute_operation("deepen", None, {'deepen': depth})
+                return
+            if box.clickedButton() is not update_btn:
+                return
+        
         self.execute_operation("download")
     
     def smart_sync(self):
@@ -1129,6 +1929,890 @@ class GitHubManager(QMainWindow):
     def init_repo(self):
         """初始化仓库"""
         self.execute_operation("init")
+    
+    def tune_repo(self):
+        """大仓库性能调优"""
+        self.execute_operation(
+            "tune",
+            "将为大仓库启用以下性能特性 (仅修改本仓库配置):\n\n"
+            "• feature.manyFiles / untracked cache / 索引 v4\n"
+            "• commit-graph 与 multi-pack-index\n"
+            "• 内置 fsmonitor (Windows / macOS)\n"
+            "• git maintenance 后台维护计划任务\n\n"
+            "仓库规模较小时不会做任何修改。确定继续吗?"
+        )
+    
+    def closeEvent(self, event):
+        """关闭窗口前停止后台状态刷新与自动同步, 取消未完成的任务"""
+        pending = self.job_queue.pending()
+        if pending:
+            reply = QMessageBox.question(
+                self, "确认退出", f"还有 {pending} 个任务未完成, 退出将取消这些任务。确定退出吗?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+            self.job_queue.cancel_all()
+            self.job_queue.wait()
+        self.status_service.shutdown()
+        self.auto_sync.shutdown()
+        super().closeEvent(event)
+    
+    # ---------- 自动同步 ----------
+    
+    def _is_repo_busy(self, local_path):
+        """仓库是否有排队或执行中的手动任务"""
+        return self.job_queue.is_busy(local_path)
+    
+    def _auto_sync_repos(self):
+        """自动同步的仓库: 当前仓库 + 批量列表中设置了自动间隔 (分钟) 的仓库"""
+        stored = self._read_config_file()
+        repos = []
+        local_path = self.local_path_input.text()
+        if local_path and self.remote_url_input.text():
+            repos.append({
+                'local_path': local_path,
+                'remote_url': self.remote_url_input.text(),
+                'interval': stored.get('auto_sync_interval', 15) * 60,
+                'operation': stored.get('auto_sync_operation', "sync")
+            })
+        for repo in stored.get('fleet_repos', []):
+            if repo.get('auto_interval') and repo.get('remote_url'):
+                repos.append({
+                    'local_path': repo['local_path'],
+                    'remote_url': repo['remote_url'],
+                    'interval': repo['auto_interval'] * 60,
+                    'operation': repo.get('auto_operation', "sync")
+                })
+        return repos
+    
+    def configure_auto_sync(self):
+        """按当前配置更新自动同步的仓库列表"""
+        if not self.auto_sync_btn.isChecked():
+            self.auto_sync.configure([], {})
+            return
+        stored = self._read_config_file()
+        repos = self._auto_sync_repos()
+        self.auto_sync.configure(
+            repos, self._worker_config(),
+            stored.get('auto_sync_max_concurrent', AutoSyncService.DEFAULT_MAX_CONCURRENT)
+        )
+        return repos
+    
+    def toggle_auto_sync(self, enabled):
+        """开关自动同步 (状态保存到配置文件)"""
+        repos = self.configure_auto_sync()
+        if enabled:
+            self.log(f"⏰ 自动同步已开启: {len(repos)} 个仓库, 并发上限 {self.auto_sync.max_concurrent}", "info")
+        else:
+            self.log("⏰ 自动同步已关闭", "info")
+        try:
+            self._update_config_file({'auto_sync_enabled': enabled})
+        except OSError:
+            pass
+    
+    def on_auto_sync_finished(self, local_path, success, message, retry):
+        """自动同步完成"""
+        name = Path(local_path).name
+        if success:
+            self.log(f"⏰ {name}: {message}", "success")
+        else:
+            self.log(f"⏰ {name}: {message} ({retry / 60:.1f} 分钟后重试)", "warning")
+        if os.path.abspath(local_path) == os.path.abspath(self.local_path_input.text() or "."):
+            self.auto_check_status()
+        # 该仓库上等待自动同步结束的任务可以开始了
+        self.job_queue.dispatch()
+    
+    def open_backup_dialog(self):
+        """打开备份管理对话框"""
+        local_path = self.local_path_input.text()
+        if not local_path:
+            QMessageBox.warning(self, "警告", "请先配置本地路径!")
+            return
+        
+        dialog = BackupDialog(self, local_path)
+        if dialog.exec() and dialog.requested_operation:
+            operation, confirm_msg, extra_config = dialog.requested_operation
+            self.execute_operation(operation, confirm_msg, extra_config)
+    
+    def open_fleet_dialog(self):
+        """打开批量管理对话框"""
+        dialog = FleetDialog(self)
+        dialog.exec()
+        self.configure_auto_sync()
+        self.auto_check_status()
+    
+    def open_journal_dialog(self):
+        """打开操作历史对话框"""
+        try:
+            dialog = JournalDialog(self, self.local_path_input.text())
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "警告", f"无法打开操作记录: {str(e)}")
+            return
+        dialog.exec()
+
+
+# ================================
+# 批量管理对话框
+# ================================
+class FleetDialog(QDialog):
+    """批量仓库管理对话框 - 仓库列表、并发设置与结果汇总"""
+    
+    COLUMNS = ["本地路径", "远程仓库", "状态", "耗时", "结果", "自动同步(分钟)"]
+    AUTO_COLUMN = 5
+    OPERATIONS = [
+        ("📤 智能上传", "upload"),
+        ("📥 智能下载", "download"),
+        ("🔄 智能同步", "sync"),
+        ("📊 检查状态", "status"),
+        ("🚀 性能调优", "tune"),
+    ]
+    STATE_COLORS = {
+        "排队中": "#9ca3af",
+        "执行中": "#3b82f6",
+        "成功": "#10b981",
+        "失败": "#ef4444",
+    }
+    
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.manager = manager
+        self.runner = None
+        
+        self.setWindowTitle("🛰 批量仓库管理")
+        self.resize(1000, 620)
+        self.setStyleSheet(manager.styleSheet())
+        
+        self.init_ui()
+        self.load_repos()
+    
+    def init_ui(self):
+        """初始化界面"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(12, 12, 12, 12)
+        
+        # 仓库列表
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        self.table.setStyleSheet(table_stylesheet())
+        layout.addWidget(self.table)
+        
+        # 列表编辑按钮
+        list_layout = QHBoxLayout()
+        
+        add_btn = QPushButton("➕ 添加仓库")
+        add_btn.clicked.connect(self.add_repo)
+        list_layout.addWidget(add_btn)
+        
+        scan_btn = QPushButton("📂 扫描目录")
+        scan_btn.setToolTip("添加所选目录下所有已初始化的Git仓库")
+        scan_btn.clicked.connect(self.scan_folder)
+        list_layout.addWidget(scan_btn)
+        
+        remove_btn = QPushButton("➖ 移除选中")
+        remove_btn.clicked.connect(self.remove_selected)
+        list_layout.addWidget(remove_btn)
+        
+        save_btn = QPushButton("💾 保存列表")
+        save_btn.clicked.connect(self.save_repos)
+        list_layout.addWidget(save_btn)
+        
+        layout.addLayout(list_layout)
+        self.edit_buttons = [add_btn, scan_btn, remove_btn, save_btn]
+        
+        # 执行控制
+        run_layout = QHBoxLayout()
+        
+        run_layout.addWidget(QLabel("操作:"))
+        self.operation_combo = QComboBox()
+        for text, operation in self.OPERATIONS:
+            self.operation_combo.addItem(text, operation)
+        run_layout.addWidget(self.operation_combo)
+        
+        run_layout.addWidget(QLabel("并发数:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(min(8, os.cpu_count() or 4))
+        self.workers_spin.setToolTip("同时执行的仓库数量上限")
+        run_layout.addWidget(self.workers_spin)
+        
+        run_layout.addStretch()
+        
+        self.start_btn = QPushButton("▶ 开始执行")
+        self.start_btn.clicked.connect(self.start_fleet)
+        run_layout.addWidget(self.start_btn)
+        
+        self.cancel_btn = QPushButton("⏹ 取消")
+        self.cancel_btn.setToolTip("取消排队中的仓库并终止执行中的 git 操作")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_fleet)
+        run_layout.addWidget(self.cancel_btn)
+        
+        self.trace_btn = QPushButton("⏱ 导出耗时追踪")
+        self.trace_btn.setToolTip("导出各仓库的步骤与命令耗时 (Chrome trace 格式, 可在 chrome://tracing 或 Perfetto 中打开)")
+        self.trace_btn.setEnabled(False)
+        self.trace_btn.clicked.connect(self.export_traces)
+        run_layout.addWidget(self.trace_btn)
+        
+        layout.addLayout(run_layout)
+        
+        # 进度与汇总
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+        
+        self.summary_label = QLabel("就绪")
+        self.summary_label.setStyleSheet("color: #10b981; font-weight: bold;")
+        layout.addWidget(self.summary_label)
+        
+        # 吞吐量刷新
+        self.summary_timer = QTimer(self)
+        self.summary_timer.setInterval(1000)
+        self.summary_timer.timeout.connect(self.update_summary)
+    
+    def load_repos(self):
+        """从配置文件加载仓库列表"""
+        config = self.manager._read_config_file()
+        for repo in config.get('fleet_repos', []):
+            self._append_repo(repo.get('local_path', ''), repo.get('remote_url', ''), repo)
+        self.workers_spin.setValue(config.get('fleet_max_workers', self.workers_spin.value()))
+    
+    def save_repos(self):
+        """保存仓库列表到配置文件"""
+        try:
+            self.manager._update_config_file({
+                'fleet_repos': self.repos(),
+                'fleet_max_workers': self.workers_spin.value()
+            })
+            self.summary_label.setText(f"✓ 已保存 {self.table.rowCount()} 个仓库")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存仓库列表失败: {str(e)}")
+    
+    def repos(self):
+        """读取表格中的仓库列表"""
+        repos = []
+        for row in range(self.table.rowCount()):
+            local_path = self.table.item(row, 0).text().strip()
+            if local_path:
+                repo = dict(self.table.item(row, 0).data(Qt.ItemDataRole.UserRole) or {})
+                repo.update(local_path=local_path, remote_url=self.table.item(row, 1).text().strip())
+                # 自动同步间隔 (分钟), 空或 0 表示不自动同步
+                try:
+                    interval = float(self.table.item(row, self.AUTO_COLUMN).text().strip() or 0)
+                except ValueError:
+                    interval = 0
+                if interval > 0:
+                    repo['auto_interval'] = interval
+                else:
+                    repo.pop('auto_interval', None)
+                repos.append(repo)
+        return repos
+    
+    def _append_repo(self, local_path, remote_url, repo=None):
+        """向表格追加一个仓库 (repo 为配置中的完整条目, 保留其他字段)"""
+        existing = {self.table.item(row, 0).text() for row in range(self.table.rowCount())}
+        if local_path in existing:
+            return
+        
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        path_item = QTableWidgetItem(local_path)
+        path_item.setData(Qt.ItemDataRole.UserRole, repo)
+        self.table.setItem(row, 0, path_item)
+        self.table.setItem(row, 1, QTableWidgetItem(remote_url))
+        for column in range(2, self.AUTO_COLUMN):
+            item = QTableWidgetItem("--" if column < 4 else "")
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.table.setItem(row, column, item)
+        interval = (repo or {}).get('auto_interval')
+        self.table.setItem(row, self.AUTO_COLUMN, QTableWidgetItem(f"{interval:g}" if interval else ""))
+    
+    @staticmethod
+    def _read_origin_url(repo_path):
+        """从 .git/config 读取 origin 地址, 避免为每个仓库启动 git 进程"""
+        config_path = Path(repo_path) / ".git" / "config"
+        section = None
+        try:
+            with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('['):
+                        section = line
+                    elif section == '[remote "origin"]' and line.startswith('url'):
+                        return line.split('=', 1)[1].strip()
+        except OSError:
+            pass
+        return ""
+    
+    def add_repo(self):
+        """添加单个仓库"""
+        folder = QFileDialog.getExistingDirectory(self, "选择仓库目录", str(Path.home()))
+        if folder:
+            self._append_repo(folder, self._read_origin_url(folder))
+    
+    def scan_folder(self):
+        """扫描目录下的所有Git仓库"""
+        folder = QFileDialog.getExistingDirectory(self, "选择包含多个仓库的目录", str(Path.home()))
+        if not folder:
+            return
+        
+        added = 0
+        for child in sorted(Path(folder).iterdir()):
+            if child.is_dir() and (child / ".git").exists():
+                before = self.table.rowCount()
+                self._append_repo(str(child), self._read_origin_url(child))
+                added += self.table.rowCount() - before
+        
+        self.summary_label.setText(f"✓ 扫描完成, 新增 {added} 个仓库")
+    
+    def remove_selected(self):
+        """移除选中的仓库"""
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.table.removeRow(row)
+    
+    def _set_row_state(self, row, state, elapsed=None, message=None):
+        """更新单行执行状态"""
+        state_item = self.table.item(row, 2)
+        state_item.setText(state)
+        state_item.setForeground(QColor(self.STATE_COLORS.get(state, "#cbd5e1")))
+        if elapsed is not None:
+            self.table.item(row, 3).setText(f"{elapsed:.1f}s")
+        if message is not None:
+            self.table.item(row, 4).setText(message)
+    
+    def start_fleet(self):
+        """开始批量执行"""
+        # 去掉未填写路径的空行, 使表格行与仓库列表一一对应
+        for row in reversed(range(self.table.rowCount())):
+            if not self.table.item(row, 0).text().strip():
+                self.table.removeRow(row)
+        
+        repos = self.repos()
+        if not repos:
+            QMessageBox.warning(self, "警告", "请先添加仓库!")
+            return
+        
+        operation = self.operation_combo.currentData()
+        if operation in ("upload", "sync"):
+            missing = [repo['local_path'] for repo in repos if not repo['remote_url']]
+            if missing:
+                QMessageBox.warning(self, "警告", f"{len(missing)} 个仓库未配置远程仓库!")
+                return
+        
+        for row in range(len(repos)):
+            self._set_row_state(row, "排队中", message="")
+            self.table.item(row, 3).setText("--")
+        
+        config = self.manager._worker_config()
+        self.runner = FleetRunner(operation, repos, config, self.workers_spin.value(), self)
+        self.runner.repo_started.connect(lambda row: self._set_row_state(row, "执行中"))
+        self.runner.repo_progress.connect(
+            lambda row, message, msg_type: self.table.item(row, 4).setText(message)
+        )
+        self.runner.repo_finished.connect(self.on_repo_finished)
+        self.runner.repo_traced.connect(self.on_repo_traced)
+        self.runner.all_finished.connect(self.on_fleet_finished)
+        
+        self._set_running(True)
+        self.progress_bar.setRange(0, len(repos))
+        self.progress_bar.setValue(0)
+        self.manager.log(
+            f"🛰 批量{self.operation_combo.currentText()}: {len(repos)} 个仓库, 并发 {self.runner.max_workers}",
+            "info"
+        )
+        self.summary_timer.start()
+        self.runner.start()
+    
+    def cancel_fleet(self):
+        """取消排队中与执行中的仓库"""
+        if self.runner:
+            self.runner.cancel()
+    
+    def _set_running(self, running):
+        """切换运行状态下的控件可用性"""
+        self.start_btn.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        self.operation_combo.setEnabled(not running)
+        self.workers_spin.setEnabled(not running)
+        self.table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers if running
+            else QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.EditKeyPressed
+        )
+        for btn in self.edit_buttons:
+            btn.setEnabled(not running)
+    
+    def on_repo_finished(self, row, success, message, elapsed):
+        """单个仓库完成"""
+        self._set_row_state(row, "成功" if success else "失败", elapsed, message)
+        if not success:
+            self.manager.log(f"✗ {Path(self.runner.repos[row]['local_path']).name}: {message}", "error")
+        self.progress_bar.setValue(self.runner.completed)
+        self.update_summary()
+    
+    def on_repo_traced(self, row, trace):
+        """在耗时列的提示中显示步骤分解"""
+        lines = [f"{name}: {seconds:.2f}s ({share:.0%}, {count} 条命令)"
+                 for name, seconds, share, count in trace.breakdown()]
+        self.table.item(row, 3).setToolTip("\n".join(lines))
+        self.trace_btn.setEnabled(True)
+    
+    def export_traces(self):
+        """导出本次批量运行的耗时追踪"""
+        if not self.runner or not self.runner.traces:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出耗时追踪",
+            str(Path.home() / f"fleet_trace_{datetime.now():%Y%m%d_%H%M%S}.json"),
+            "Chrome Trace (*.json)"
+        )
+        if not path:
+            return
+        try:
+            traces = [self.runner.traces[index] for index in sorted(self.runner.traces)]
+            OperationTrace.export_chrome(traces, path)
+            self.manager.log(f"⏱ 已导出 {len(traces)} 个仓库的耗时追踪: {path}", "success")
+        except OSError as e:
+            QMessageBox.warning(self, "导出失败", str(e))
+    
+    def on_fleet_finished(self, succeeded, failed, elapsed):
+        """批量执行完成"""
+        self.summary_timer.stop()
+        self._set_running(False)
+        self.update_summary()
+        self.manager.log(
+            f"✓ 批量执行完成: 成功 {succeeded}, 失败 {failed}, 耗时 {elapsed:.1f}s",
+            "success" if failed == 0 else "warning"
+        )
+    
+    def update_summary(self):
+        """刷新汇总信息与吞吐量"""
+        if not self.runner:
+            return
+        runner = self.runner
+        self.summary_label.setText(
+            f"完成 {runner.completed}/{len(runner.repos)} | "
+            f"成功 {runner.succeeded} | 失败 {runner.failed} | "
+            f"执行中 {runner.active} | "
+            f"耗时 {runner.elapsed:.1f}s | "
+            f"吞吐 {runner.throughput():.1f} 仓库/分钟"
+        )
+    
+    def reject(self):
+        """关闭时处理未完成的批量任务 (窗口关闭与 Esc 均经过此处)"""
+        if self.runner and self.runner.is_running():
+            reply = QMessageBox.question(
+                self, "确认关闭",
+                "批量任务仍在执行!\n\n将取消排队中的仓库并终止执行中的操作, 确定关闭吗?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+            self.runner.cancel()
+            self.runner.wait()
+        super().reject()
+
+
+# ================================
+# 首次下载对话框
+# ================================
+class CloneDialog(QDialog):
+    """首次下载方式 - 部分克隆、浅克隆与稀疏检出, 选项保存为下次的默认值"""
+    
+    def __init__(self, manager, stored):
+        super().__init__(manager)
+        self.options = {}
+        self.setWindowTitle("📦 首次下载")
+        self.setStyleSheet(manager.styleSheet())
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(12, 12, 12, 12)
+        layout.addWidget(QLabel("本地还没有仓库, 将从远程克隆。只获取本机需要的内容可以大幅减少下载量与磁盘占用:"))
+        
+        self.blobless_check = QCheckBox("按需下载文件内容 (部分克隆 blob:none)")
+        self.blobless_check.setToolTip(
+            "只下载检出所需的文件内容, 历史版本的文件在查看时再从远程获取\n"
+            "之后查看历史差异、blame 或检出旧版本都需要能连接远程仓库"
+        )
+        self.blobless_check.setChecked(
+            stored.get('clone_filter', GitOperations.DEFAULT_CLONE_FILTER) == GitOperations.BLOBLESS_FILTER
+        )
+        layout.addWidget(self.blobless_check)
+        
+        depth_layout = QHBoxLayout()
+        depth_layout.addWidget(QLabel("提交历史:"))
+        self.depth_spin = QSpinBox()
+        self.depth_spin.setRange(0, 10_000_000)
+        self.depth_spin.setSpecialValueText("完整历史")
+        self.depth_spin.setSuffix(" 个最近提交")
+        self.depth_spin.setValue(int(stored.get('clone_depth') or 0))
+        self.depth_spin.setToolTip("浅克隆只获取最近的若干提交, 之后可在下载时选择加深历史")
+        depth_layout.addWidget(self.depth_spin)
+        depth_layout.addStretch()
+        layout.addLayout(depth_layout)
+        
+        layout.addWidget(QLabel("只检出这些目录 (留空检出全部, 多个目录用逗号分隔):"))
+        self.sparse_input = QLineEdit(", ".join(stored.get('sparse_paths') or []))
+        self.sparse_input.setPlaceholderText("例如: src, docs/api")
+        layout.addWidget(self.sparse_input)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        ok_btn = QPushButton("📥 开始下载")
+        ok_btn.clicked.connect(self.accept)
+        button_layout.addWidget(ok_btn)
+        cancel_btn = QPushButton("取消")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+    
+    def accept(self):
+        """收集选项"""
+        self.options = {
+            'clone_filter': GitOperations.BLOBLESS_FILTER if self.blobless_check.isChecked() else "",
+            'clone_depth': self.depth_spin.value(),
+            'sparse_paths': [path.strip() for path in self.sparse_input.text().split(",") if path.strip()],
+        }
+        super().accept()
+
+
+# ================================
+# 备份管理对话框
+# ================================
+class BackupDialog(QDialog):
+    """备份管理对话框 - 快照列表、比较与恢复"""
+    
+    COLUMNS = ["快照", "时间", "类型", "文件数", "数据量", "占用"]
+    MAX_LISTED_PATHS = 200
+    
+    def __init__(self, manager, local_path):
+        super().__init__(manager)
+        self.local_path = local_path
+        self.store = BackupStore(Path(local_path).parent / "backups")
+        self.snapshots = []
+        self.requested_operation = None
+        
+        self.setWindowTitle(f"🗂 备份管理 - {Path(local_path).name}")
+        self.resize(900, 600)
+        self.setStyleSheet(manager.styleSheet())
+        
+        self.init_ui()
+        self.load_snapshots()
+    
+    def init_ui(self):
+        """初始化界面"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(12, 12, 12, 12)
+        
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setStyleSheet(table_stylesheet())
+        layout.addWidget(self.table)
+        
+        button_layout = QHBoxLayout()
+        
+        backup_btn = QPushButton("📦 立即备份")
+        backup_btn.clicked.connect(self.backup_now)
+        button_layout.addWidget(backup_btn)
+        
+        worktree_btn = QPushButton("🔍 与工作区比较")
+        worktree_btn.clicked.connect(self.diff_worktree)
+        button_layout.addWidget(worktree_btn)
+        
+        diff_btn = QPushButton("⇄ 比较所选两个快照")
+        diff_btn.clicked.connect(self.diff_selected)
+        button_layout.addWidget(diff_btn)
+        
+        restore_btn = QPushButton("⏪ 恢复到此快照")
+        restore_btn.clicked.connect(self.restore_selected)
+        button_layout.addWidget(restore_btn)
+        
+        layout.addLayout(button_layout)
+        
+        self.result_text = QTextEdit()
+        self.result_text.setReadOnly(True)
+        self.result_text.setMaximumHeight(200)
+        self.result_text.setFont(QFont("Consolas", 9))
+        self.result_text.setStyleSheet("""
+            QTextEdit {
+                background-color: #0f172a;
+                color: #e2e8f0;
+                border: 2px solid #1e293b;
+                border-radius: 8px;
+                padding: 8px;
+            }
+        """)
+        layout.addWidget(self.result_text)
+    
+    @staticmethod
+    def _format_bytes(value):
+        """格式化字节数"""
+        if value is None:
+            return "--"
+        for unit in ("B", "KB", "MB", "GB"):
+            if value < 1024 or unit == "GB":
+                return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+            value /= 1024
+    
+    def load_snapshots(self):
+        """从快照索引加载列表 (最新在前)"""
+        try:
+            self.snapshots = list(reversed(self.store.list_snapshots(self.local_path)))
+        except Exception as e:
+            self.snapshots = []
+            self.result_text.setPlainText(f"读取快照索引失败: {str(e)}")
+        
+        self.table.setRowCount(len(self.snapshots))
+        for row, snapshot in enumerate(self.snapshots):
+            values = [
+                snapshot['name'],
+                snapshot['created'].replace('T', ' '),
+                "增量" if snapshot['kind'] == 'incremental' else "归档",
+                "--" if snapshot['files'] is None else str(snapshot['files']),
+                self._format_bytes(snapshot['total_bytes']),
+                self._format_bytes(snapshot['size'])
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        
+        if not self.snapshots:
+            self.result_text.setPlainText("暂无备份快照")
+    
+    def _selected(self):
+        """选中的快照, 按时间从旧到新"""
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        return [self.snapshots[row] for row in rows]
+    
+    def _show_diff(self, title, diff):
+        """显示比较结果"""
+        lines = [
+            title,
+            f"新增 {len(diff['added'])} | 删除 {len(diff['removed'])} | 修改 {len(diff['modified'])}",
+            ""
+        ]
+        for label, key in (("+", 'added'), ("-", 'removed'), ("M", 'modified')):
+            paths = diff[key]
+            lines += [f"{label} {path}" for path in paths[:self.MAX_LISTED_PATHS]]
+            if len(paths) > self.MAX_LISTED_PATHS:
+                lines.append(f"{label} ... 另有 {len(paths) - self.MAX_LISTED_PATHS} 个")
+        self.result_text.setPlainText("\n".join(lines))
+    
+    def diff_worktree(self):
+        """比较所选快照与当前工作区"""
+        selected = self._selected()
+        if len(selected) != 1:
+            QMessageBox.warning(self, "警告", "请选择一个快照!")
+            return
+        try:
+            diff = self.store.diff_worktree(selected[0]['path'], self.local_path)
+            self._show_diff(f"{selected[0]['name']} → 当前工作区", diff)
+        except Exception as e:
+            QMessageBox.warning(self, "比较失败", str(e))
+    
+    def diff_selected(self):
+        """比较所选的两个快照"""
+        selected = self._selected()
+        if len(selected) != 2:
+            QMessageBox.warning(self, "警告", "请选择两个快照!")
+            return
+        try:
+            diff = self.store.diff_snapshots(selected[0]['path'], selected[1]['path'])
+            self._show_diff(f"{selected[0]['name']} → {selected[1]['name']}", diff)
+        except Exception as e:
+            QMessageBox.warning(self, "比较失败", str(e))
+    
+    def backup_now(self):
+        """在工作线程中立即备份"""
+        self.requested_operation = ("backup", None, None)
+        self.accept()
+    
+    def restore_selected(self):
+        """恢复到所选快照"""
+        selected = self._selected()
+        if len(selected) != 1:
+            QMessageBox.warning(self, "警告", "请选择一个快照!")
+            return
+        snapshot = selected[0]
+        if snapshot['kind'] != 'incremental':
+            QMessageBox.warning(self, "警告", "压缩归档请手动解压恢复, 只有增量快照支持按差异恢复!")
+            return
+        
+        reply = QMessageBox.question(
+            self, "删除多余文件",
+            "是否同时删除快照之后新增的文件?\n\n"
+            "选择「是」将工作区完全恢复到快照时的状态,\n"
+            "选择「否」只恢复被修改或删除的文件。",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        delete_extra = reply == QMessageBox.StandardButton.Yes
+        
+        self.requested_operation = (
+            "restore",
+            f"⚠ 将把工作区恢复到快照 {snapshot['name']}!\n\n"
+            "恢复前会自动备份当前状态。\n\n确定继续吗?",
+            {'snapshot': snapshot['path'], 'delete_extra': delete_extra}
+        )
+        self.accept()
+
+
+# ================================
+# 操作历史对话框
+# ================================
+class JournalDialog(QDialog):
+    """操作历史对话框 - 按仓库、时间范围和结果查询操作记录"""
+    
+    COLUMNS = ["时间", "仓库", "操作", "结果", "耗时", "消息"]
+    RANGES = [("最近7天", 7), ("今天", 1), ("最近30天", 30), ("全部", None)]
+    MAX_ROWS = 500
+    
+    def __init__(self, manager, local_path):
+        super().__init__(manager)
+        self.local_path = local_path
+        self.journal = OperationJournal(manager._worker_config().get('journal_file'))
+        self.operations = []
+        
+        self.setWindowTitle("📜 操作历史")
+        self.resize(1000, 650)
+        self.setStyleSheet(manager.styleSheet())
+        
+        self.init_ui()
+        self.load_operations()
+    
+    def init_ui(self):
+        """初始化界面"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(12, 12, 12, 12)
+        
+        filter_layout = QHBoxLayout()
+        
+        self.current_repo_check = QCheckBox("仅当前仓库")
+        self.current_repo_check.setChecked(bool(self.local_path))
+        self.current_repo_check.setEnabled(bool(self.local_path))
+        self.current_repo_check.toggled.connect(self.load_operations)
+        filter_layout.addWidget(self.current_repo_check)
+        
+        self.range_combo = QComboBox()
+        for label, days in self.RANGES:
+            self.range_combo.addItem(label, days)
+        self.range_combo.currentIndexChanged.connect(self.load_operations)
+        filter_layout.addWidget(self.range_combo)
+        
+        self.failed_check = QCheckBox("仅失败")
+        self.failed_check.toggled.connect(self.load_operations)
+        filter_layout.addWidget(self.failed_check)
+        
+        filter_layout.addStretch()
+        
+        refresh_btn = QPushButton("🔄 刷新")
+        refresh_btn.clicked.connect(self.load_operations)
+        filter_layout.addWidget(refresh_btn)
+        
+        layout.addLayout(filter_layout)
+        
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        self.table.setStyleSheet(table_stylesheet())
+        self.table.itemSelectionChanged.connect(self.show_commands)
+        layout.addWidget(self.table)
+        
+        self.result_text = QTextEdit()
+        self.result_text.setReadOnly(True)
+        self.result_text.setMaximumHeight(220)
+        self.result_text.setFont(QFont("Consolas", 9))
+        self.result_text.setStyleSheet("""
+            QTextEdit {
+                background-color: #0f172a;
+                color: #e2e8f0;
+                border: 2px solid #1e293b;
+                border-radius: 8px;
+                padding: 8px;
+            }
+        """)
+        layout.addWidget(self.result_text)
+    
+    def load_operations(self):
+        """按筛选条件查询 (最新在前)"""
+        days = self.range_combo.currentData()
+        if days == 1:
+            since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        else:
+            since = time.time() - days * 86400 if days else None
+        
+        try:
+            self.operations = self.journal.search(
+                repo=self.local_path if self.current_repo_check.isChecked() else None,
+                since=since,
+                failed_only=self.failed_check.isChecked(),
+                limit=self.MAX_ROWS
+            )
+        except sqlite3.Error as e:
+            self.operations = []
+            self.result_text.setPlainText(f"读取操作记录失败: {str(e)}")
+        
+        self.table.setRowCount(len(self.operations))
+        for row, op in enumerate(self.operations):
+            values = [
+                datetime.fromtimestamp(op['started']).strftime("%Y-%m-%d %H:%M:%S"),
+                Path(op['repo']).name,
+                op['operation'],
+                {1: "✓ 成功", 0: "✗ 失败"}.get(op['success'], "--"),
+                f"{op['duration']:.1f}s" if op['duration'] is not None else "--",
+                (op['message'] or "").split("\n")[0]
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 1:
+                    item.setToolTip(op['repo'])
+                self.table.setItem(row, column, item)
+        
+        if not self.operations:
+            self.result_text.setPlainText("没有符合条件的操作记录")
+    
+    def show_commands(self):
+        """显示所选操作执行的命令"""
+        rows = {index.row() for index in self.table.selectedIndexes()}
+        if not rows:
+            return
+        op = self.operations[rows.pop()]
+        
+        lines = [f"{op['repo']}  ({op['operation']})", op['message'] or "", ""]
+        try:
+            for cmd in self.journal.commands(op['id']):
+                lines.append(
+                    f"$ git {' '.join(cmd['args'])}  → 退出码 {cmd['returncode']}, {cmd['duration']:.2f}s"
+                    + (f"  ({cmd['description']})" if cmd['description'] else "")
+                )
+                if cmd['returncode'] != 0 and cmd['output']:
+                    lines += [f"    {line}" for line in cmd['output'].splitlines()]
+        except sqlite3.Error as e:
+            lines.append(f"读取命令记录失败: {str(e)}")
+        self.result_text.setPlainText("\n".join(lines))
+    
+    def done(self, result):
+        self.journal.close()
+        super().done(result)
 
 
 # ================================
@@ -1177,12 +2861,13 @@ def main():
     splash.show()
     app.processEvents()
     
-    # 创建主窗口
+    # 创建主窗口, 就绪后立即显示
     window = GitHubManager()
+    window.show()
+    splash.finish(window)
     
-    # 关闭启动画面并显示主窗口
-    QTimer.singleShot(1500, splash.close)
-    QTimer.singleShot(1500, window.show)
+    # 事件循环处理完首批事件即视为可交互
+    QTimer.singleShot(0, window.record_startup_time)
     
     sys.exit(app.exec())
 
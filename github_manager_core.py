@@ -0,0 +1,4289 @@
+"""
+GitHub 仓库智能管理器 - 核心模块
+Git 操作、仓库状态、备份、操作记录与命令行模式, 不依赖 Qt
+
+图形界面 (GitHub 仓库管理_Claude_V2.py) 从这里导入核心功能;
+cron / CI 脚本可以直接 import github_manager_core 复用 GitOperations、cli_main 等,
+不需要安装 PyQt6。也可以直接运行:
+    python github_manager_core.py status --path /srv/repo
+    python github_manager_core.py sync --all --jobs 16
+"""
+
+import time
+import sys
+import os
+import json
+import subprocess
+import importlib
+import shutil
+import threading
+import signal
+import select
+import struct
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import re
+import itertools
+import sqlite3
+import gzip
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from datetime import datetime
+
+
+# ================================
+# 依赖管理系统
+# ================================
+class DependencyManager:
+    """智能依赖管理器"""
+    
+    REQUIRED_PACKAGES = {
+        'PyQt6': 'PyQt6',
+        'PyQt6.QtWidgets': 'PyQt6',
+        'PyQt6.QtCore': 'PyQt6',
+        'PyQt6.QtGui': 'PyQt6'
+    }
+    
+    # 已验证环境的指纹缓存, 指纹不变时跳过逐个导入检查与 git --version
+    ENV_CACHE_FILE = Path.home() / ".github_manager_env.json"
+    
+    # 本进程内已确认 Git 可用
+    git_verified = False
+    
+    @staticmethod
+    def fingerprint():
+        """计算环境指纹: 解释器、PyQt6 版本、git 路径及其文件属性
+        
+        只读取包元数据与文件属性, 不导入 PyQt6, 也不启动子进程
+        """
+        from importlib import metadata
+        try:
+            pyqt_version = metadata.version('PyQt6')
+        except metadata.PackageNotFoundError:
+            pyqt_version = None
+        
+        git_path = shutil.which('git')
+        git_stat = None
+        if git_path:
+            try:
+                st = os.stat(git_path)
+                git_stat = [st.st_size, st.st_mtime_ns]
+            except OSError:
+                git_path = None
+        
+        return {
+            'python': sys.executable,
+            'python_version': sys.version,
+            'pyqt6': pyqt_version,
+            'git': git_path,
+            'git_stat': git_stat
+        }
+    
+    @staticmethod
+    def _load_env_cache():
+        try:
+            with open(DependencyManager.ENV_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _save_env_cache(fingerprint, git_version):
+        try:
+            with open(DependencyManager.ENV_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'fingerprint': fingerprint,
+                    'git_version': git_version,
+                    'verified_at': datetime.now().isoformat(timespec='seconds')
+                }, f, indent=4, ensure_ascii=False)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def check_and_install():
+        """检查并安装所有依赖 (环境指纹未变化时直接跳过)"""
+        fingerprint = DependencyManager.fingerprint()
+        cached = DependencyManager._load_env_cache()
+        if fingerprint['pyqt6'] and fingerprint['git'] and cached.get('fingerprint') == fingerprint:
+            DependencyManager.git_verified = True
+            print(f"✓ 运行环境未变化 (PyQt6 {fingerprint['pyqt6']}, {cached.get('git_version', 'git')}), 跳过依赖检查")
+            return True
+        
+        print("=" * 60)
+        print("🔍 GitHub 仓库管理器 - 依赖检查系统")
+        print("=" * 60)
+        
+        missing_packages = []
+        installed_packages = set()
+        
+        # 检查依赖
+        for module_name, package_name in DependencyManager.REQUIRED_PACKAGES.items():
+            if package_name in installed_packages:
+                continue
+                
+            try:
+                importlib.import_module(module_name)
+                print(f"✓ {package_name:20} - 已安装")
+                installed_packages.add(package_name)
+            except ImportError:
+                if package_name not in missing_packages:
+                    print(f"✗ {package_name:20} - 未安装")
+                    missing_packages.append(package_name)
+        
+        # 安装缺失的包
+        if missing_packages:
+            print("\n" + "=" * 60)
+            print(f"📦 发现 {len(missing_packages)} 个缺失的依赖包")
+            print("=" * 60)
+            
+            for package in missing_packages:
+                DependencyManager._install_package(package)
+            
+            print("\n" + "=" * 60)
+            print("✓ 所有依赖已成功安装!")
+            print("=" * 60)
+            print("🚀 正在启动应用程序...\n")
+        else:
+            print("\n✓ 所有依赖已就绪!")
+            print("🚀 正在启动应用程序...\n")
+        
+        # Git 也可用时记录指纹, 下次启动跳过检查 (安装过的包重新计算指纹)
+        git_version = DependencyManager.git_version()
+        if git_version:
+            DependencyManager._save_env_cache(DependencyManager.fingerprint(), git_version)
+        
+        return True
+    
+    @staticmethod
+    def _install_package(package_name):
+        """安装单个包"""
+        print(f"\n📥 正在安装 {package_name}...")
+        try:
+            subprocess.check_call(
+                [sys.executable, "-m", "pip", "install", package_name, "-q"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            print(f"✓ {package_name} 安装成功!")
+        except subprocess.CalledProcessError as e:
+            print(f"✗ {package_name} 安装失败!")
+            print(f"错误信息: {e}")
+            print(f"请手动执行: pip install {package_name}")
+            sys.exit(1)
+    
+    @staticmethod
+    def git_version():
+        """返回 git --version 输出, Git 不可用时返回 None"""
+        try:
+            result = subprocess.run(["git", "--version"], 
+                                  capture_output=True, 
+                                  text=True,
+                                  check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        DependencyManager.git_verified = True
+        return result.stdout.strip()
+    
+    @staticmethod
+    def check_git():
+        """检查Git是否安装 (本进程已验证过则不再启动子进程)"""
+        return DependencyManager.git_verified or DependencyManager.git_version() is not None
+
+
+# ================================
+# Git命令执行层
+# ================================
+class GitCommandError(Exception):
+    """Git命令执行失败"""
+    
+    def __init__(self, message, returncode=None):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+class OperationCancelled(GitCommandError):
+    """操作已被用户取消"""
+    
+    def __init__(self, message="操作已取消"):
+        super().__init__(message)
+
+
+class OperationTimeout(GitCommandError):
+    """git 命令超时 (超过截止时刻) 或卡住 (长时间没有任何输出)"""
+    
+    DEADLINE, STALL = "deadline", "stall"
+    
+    def __init__(self, args, kind, seconds):
+        command = " ".join(arg for arg in args if not arg.startswith("-"))[:80]
+        if kind == self.STALL:
+            message = f"git {command} 已 {seconds:.0f} 秒无任何输出, 判定为卡住并已终止"
+        else:
+            message = f"git {command} 超过操作时限 ({seconds:.0f} 秒), 已终止"
+        super().__init__(message)
+        self.kind = kind
+        self.seconds = seconds
+
+
+class CommandWatchdog:
+    """监视一条 git 命令: 超过截止时刻或长时间无输出时终止其整个进程树
+    
+    由后台线程轮询, 命令正常结束时调用 stop()。终止后 expired 保存对应的
+    OperationTimeout, 由 GitRunner 在收尾时抛出。
+    """
+    
+    POLL_INTERVAL = 0.5
+    
+    def __init__(self, process, args, deadline, budget, stall_timeout):
+        self.process = process
+        self.args = args
+        self.deadline = deadline  # time.monotonic() 截止时刻, None 表示不限
+        self.budget = budget  # 截止时刻对应的总时限 (秒), 用于提示
+        self.stall_timeout = stall_timeout  # 无输出的容忍秒数, None 表示不检测
+        self.last_activity = time.monotonic()
+        self.expired = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True, name="git-watchdog")
+        self._thread.start()
+    
+    def touch(self):
+        """有新输出"""
+        self.last_activity = time.monotonic()
+    
+    def stop(self):
+        self._done.set()
+    
+    def _watch(self):
+        while not self._done.wait(self.POLL_INTERVAL):
+            if self.process.poll() is not None:
+                return
+            now = time.monotonic()
+            if self.deadline is not None and now >= self.deadline:
+                self.expired = OperationTimeout(self.args, OperationTimeout.DEADLINE, self.budget)
+            elif self.stall_timeout and now - self.last_activity >= self.stall_timeout:
+                self.expired = OperationTimeout(self.args, OperationTimeout.STALL, self.stall_timeout)
+            else:
+                continue
+            GitRunner.terminate(self.process)
+            return
+
+
+class TransferProgress:
+    """git 传输进度解析 - 识别计数/压缩/接收/写入等阶段的百分比、对象数与速率"""
+    
+    # 例: "remote: Counting objects:  45% (9/20)"
+    #     "Receiving objects:  33% (100/300), 5.00 MiB | 1.20 MiB/s"
+    LINE_RE = re.compile(r'^(?:remote:\s*)?([^:]+):\s+(\d+)%\s+\((\d+)/(\d+)\)(.*)$')
+    RATE_RE = re.compile(r'([\d.]+\s*\w?i?B)\s*\|\s*([\d.]+\s*\w?i?B/s)')
+    REPORT_INTERVAL = 0.1
+    
+    def __init__(self):
+        self.phase = None
+        self.percent = 0
+        self.current = 0
+        self.total = 0
+        self.transferred = None
+        self.rate = None
+        self.updated = 0.0
+        self._reported = (None, -1)
+        self._reported_at = 0.0
+    
+    def feed(self, line):
+        """解析一行输出, 是进度行返回 True"""
+        match = self.LINE_RE.match(line)
+        if not match:
+            return False
+        
+        phase = match.group(1).strip()
+        if phase != self.phase:
+            self.transferred = self.rate = None
+        self.phase = phase
+        self.percent = int(match.group(2))
+        self.current = int(match.group(3))
+        self.total = int(match.group(4))
+        rate = self.RATE_RE.search(match.group(5))
+        if rate:
+            self.transferred, self.rate = rate.group(1), rate.group(2)
+        self.updated = time.monotonic()
+        return True
+    
+    def should_report(self):
+        """阶段或百分比变化, 或距上次报告超过间隔时才报告, 避免刷屏"""
+        now = time.monotonic()
+        key = (self.phase, self.percent)
+        if key != self._reported or now - self._reported_at >= self.REPORT_INTERVAL:
+            self._reported = key
+            self._reported_at = now
+            return True
+        return False
+    
+    def describe(self):
+        """进度描述文本"""
+        text = f"{self.phase} {self.percent}% ({self.current}/{self.total})"
+        if self.transferred:
+            text += f" {self.transferred} | {self.rate}"
+        return text
+
+
+class GitRunner:
+    """Git命令执行器 - 每次调用都显式携带仓库目录, 不依赖进程工作目录"""
+    
+    # Windows 下隐藏 git 子进程的控制台窗口, 并使其自成进程组以便整体终止
+    CREATION_FLAGS = (subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+                      if sys.platform == "win32" else 0)
+    
+    # 支持 --progress 的网络传输命令
+    TRANSFER_COMMANDS = ("push", "fetch", "pull", "clone")
+    
+    # 流式读取标准输出的块大小
+    STREAM_CHUNK = 256 * 1024
+    
+    # 终止进程树时 SIGTERM 后等待的秒数, 仍未退出则 SIGKILL
+    KILL_GRACE = 3
+    
+    def __init__(self, repo_path):
+        self.repo_path = os.path.abspath(str(repo_path))
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._cancelled = False
+        # 超时控制 (默认不限): deadline 为整个操作的 time.monotonic() 截止时刻,
+        # stall_timeout 为传输命令连续无输出的容忍秒数
+        self.deadline = None
+        self.deadline_budget = None
+        self.stall_timeout = None
+        # 每条命令结束后回调 on_command(args, 开始时刻, 耗时, 子进程用户态CPU, 子进程内核态CPU,
+        #                                   stdout字节数, stderr字节数, 退出码), 用于耗时追踪
+        self.on_command = None
+    
+    def _notify(self, args, started, cpu_before, returncode, stdout_bytes, stderr_bytes):
+        """通知命令耗时观察者"""
+        if self.on_command:
+            cpu_after = os.times()
+            self.on_command(
+                list(args), started, time.perf_counter() - started,
+                cpu_after.children_user - cpu_before.children_user,
+                cpu_after.children_system - cpu_before.children_system,
+                stdout_bytes, stderr_bytes, returncode
+            )
+    
+    def command(self, *args):
+        """构造带仓库上下文的命令行"""
+        return ["git", "-C", self.repo_path, *args]
+    
+    # ---------- 取消 ----------
+    
+    @property
+    def cancelled(self):
+        return self._cancelled
+    
+    def cancel(self):
+        """取消: 终止正在运行的 git 子进程, 之后的命令直接抛出 OperationCancelled"""
+        with self._lock:
+            self._cancelled = True
+            processes = list(self._processes)
+        for process in processes:
+            self._kill_tree(process)
+    
+    @staticmethod
+    def _kill_tree(process, sig=signal.SIGTERM):
+        """终止 git 及其派生的子进程 (ssh、远程助手等), 否则它们会占住管道使读取无法结束"""
+        # 强制终止时 git 本身可能已退出而子进程仍在, 进程组仍然有效
+        if process.poll() is not None and sig == signal.SIGTERM:
+            return
+        try:
+            if sys.platform == "win32":
+                subprocess.run(
+                    ["taskkill", "/T", "/F", "/PID", str(process.pid)],
+                    capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW
+                )
+            else:
+                os.killpg(process.pid, sig)
+        except OSError:
+            pass
+    
+    @classmethod
+    def terminate(cls, process):
+        """先礼后兵: SIGTERM 让 git 清理锁文件, 宽限期后仍有残留则 SIGKILL 整个进程组"""
+        cls._kill_tree(process)
+        if sys.platform == "win32":
+            return  # taskkill /F 已是强制终止
+        try:
+            process.wait(cls.KILL_GRACE)
+        except subprocess.TimeoutExpired:
+            pass
+        cls._kill_tree(process, signal.SIGKILL)
+    
+    def _watch(self, process, args, stall=False):
+        """按超时设置为命令创建看门狗, 未设置超时时返回 None"""
+        stall_timeout = self.stall_timeout if stall else None
+        if self.deadline is None and not stall_timeout:
+            return None
+        return CommandWatchdog(process, args, self.deadline, self.deadline_budget, stall_timeout)
+    
+    def _finish_watch(self, watchdog):
+        """停止看门狗, 命令被其终止时抛出 OperationTimeout"""
+        if watchdog is None:
+            return
+        watchdog.stop()
+        if watchdog.expired:
+            raise watchdog.expired
+    
+    def _spawn(self, args, **kwargs):
+        """启动 git 子进程并登记, 以便取消时终止"""
+        with self._lock:
+            if self._cancelled:
+                raise OperationCancelled()
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                raise OperationTimeout(args, OperationTimeout.DEADLINE, self.deadline_budget)
+            process = subprocess.Popen(
+                self.command(*args),
+                cwd=self.repo_path,
+                creationflags=self.CREATION_FLAGS,
+                # POSIX 下每条命令自成会话 (进程组), 取消时可整组终止
+                start_new_session=sys.platform != "win32",
+                **kwargs
+            )
+            self._processes.add(process)
+        return process
+    
+    def _release(self, process):
+        """子进程结束后注销, 被取消时抛出 OperationCancelled"""
+        with self._lock:
+            self._processes.discard(process)
+        if self._cancelled:
+            raise OperationCancelled()
+    
+    def _reap(self, process, reader, watchdog, completed):
+        """流式命令收尾 (读取中途出错时也会执行): 没有读完的命令连同子进程一起终止,
+        停止看门狗、关闭管道并注销, 返回退出码"""
+        if not completed:
+            self.terminate(process)
+        if watchdog:
+            watchdog.stop()
+        returncode = process.wait()
+        if reader:
+            reader.join()
+        process.stdout.close()
+        process.stderr.close()
+        with self._lock:
+            self._processes.discard(process)
+        return returncode
+    
+    def run(self, *args, input=None):
+        """执行Git命令, 返回 CompletedProcess (不检查返回码)"""
+        started, cpu_before = time.perf_counter(), os.times()
+        process = self._spawn(
+            args,
+            stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='ignore'
+        )
+        watchdog = self._watch(process, args)
+        try:
+            stdout, stderr = process.communicate(input)
+        finally:
+            if watchdog:
+                watchdog.stop()
+            self._release(process)
+        self._finish_watch(watchdog)
+        result = subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+        if self.on_command:
+            self._notify(args, started, cpu_before, result.returncode,
+                         len(result.stdout.encode('utf-8')), len(result.stderr.encode('utf-8')))
+        return result
+    
+    def output(self, *args):
+        """执行Git命令并返回标准输出, 失败时抛出 GitCommandError"""
+        result = self.run(*args)
+        if result.returncode != 0:
+            error_msg = result.stderr.strip() or result.stdout.strip()
+            raise GitCommandError(f"git {' '.join(args)} 失败: {error_msg}", result.returncode)
+        return result.stdout.strip()
+    
+    def stream(self, *args, on_progress=None):
+        """执行传输类命令 (push/fetch/pull/clone), 实时解析 --progress 输出
+        
+        标准错误按回车/换行增量读取, 进度行交给 on_progress(TransferProgress),
+        其余行保留用于错误信息。返回 CompletedProcess。
+        """
+        args = list(args)
+        if args and args[0] in self.TRANSFER_COMMANDS and "--progress" not in args:
+            args.insert(1, "--progress")
+        
+        started, cpu_before = time.perf_counter(), os.times()
+        process = self._spawn(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        
+        reader = watchdog = None
+        stdout_chunks = []
+        tracker = TransferProgress()
+        messages = []
+        pending = b""
+        stderr_bytes = 0
+        completed = False
+        try:
+            # 标准输出在后台线程读取, 避免两个管道互相阻塞
+            reader = threading.Thread(target=lambda: stdout_chunks.append(process.stdout.read()), daemon=True)
+            reader.start()
+            
+            # 传输命令持续输出进度, 长时间没有输出说明连接已死或在等待输入
+            watchdog = self._watch(process, args, stall=True)
+            while True:
+                chunk = process.stderr.read1(8192) if hasattr(process.stderr, 'read1') else process.stderr.read(8192)
+                if not chunk:
+                    break
+                if watchdog:
+                    watchdog.touch()
+                stderr_bytes += len(chunk)
+                pending += chunk
+                parts = re.split(rb'[\r\n]', pending)
+                pending = parts.pop()
+                for raw in parts:
+                    line = raw.decode('utf-8', errors='ignore').strip()
+                    if not line:
+                        continue
+                    if tracker.feed(line):
+                        if on_progress and tracker.should_report():
+                            on_progress(tracker)
+                    else:
+                        messages.append(line)
+            if pending.strip():
+                messages.append(pending.decode('utf-8', errors='ignore').strip())
+            completed = True
+        finally:
+            returncode = self._reap(process, reader, watchdog, completed)
+        
+        if self._cancelled:
+            raise OperationCancelled()
+        self._finish_watch(watchdog)
+        if on_progress and tracker.phase:
+            on_progress(tracker)
+        
+        stdout = b"".join(stdout_chunks)
+        self._notify(args, started, cpu_before, returncode, len(stdout), stderr_bytes)
+        stdout = stdout.decode('utf-8', errors='ignore')
+        return subprocess.CompletedProcess(process.args, returncode, stdout, "\n".join(messages))
+    
+    def is_repo(self):
+        """检查目录是否为Git仓库"""
+        return os.path.exists(os.path.join(self.repo_path, '.git'))
+    
+    # 中断的 git 命令可能留下的状态: (.git 下的路径, 说明)
+    PARTIAL_STATES = (
+        ("rebase-merge", "变基未完成, 可执行 git rebase --continue 或 git rebase --abort"),
+        ("rebase-apply", "变基/补丁应用未完成, 可执行 git rebase --abort 或 git am --abort"),
+        ("MERGE_HEAD", "合并未完成, 可执行 git merge --abort"),
+        ("CHERRY_PICK_HEAD", "拣选未完成, 可执行 git cherry-pick --abort"),
+        ("REVERT_HEAD", "撤销提交未完成, 可执行 git revert --abort"),
+        ("index.lock", "残留 index.lock, 确认没有其他 git 进程运行后删除该文件"),
+        ("shallow.lock", "残留 shallow.lock, 确认没有其他 git 进程运行后删除该文件"),
+    )
+    
+    def git_dir(self):
+        """仓库的 .git 目录 (兼容 .git 为指向实际目录的文件的工作树/子模块)"""
+        dot_git = os.path.join(self.repo_path, '.git')
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, 'r', encoding='utf-8') as f:
+                    line = f.readline().strip()
+                if line.startswith("gitdir:"):
+                    return os.path.normpath(os.path.join(self.repo_path, line[len("gitdir:"):].strip()))
+            except OSError:
+                pass
+        return dot_git
+    
+    def partial_state(self):
+        """检查被中断的操作留下的未完成状态, 返回说明列表"""
+        git_dir = self.git_dir()
+        return [hint for name, hint in self.PARTIAL_STATES if os.path.exists(os.path.join(git_dir, name))]
+    
+    def iter_records(self, *args, separator=b"\0"):
+        """流式执行 git 命令, 按分隔符逐条产出标准输出中的记录
+        
+        边读边切分, 内存占用与输出总量无关。生成器被提前关闭 (调用方已得到
+        所需结果) 时终止 git 进程; 命令失败时在产出全部记录后抛出 GitCommandError。
+        """
+        started, cpu_before = time.perf_counter(), os.times()
+        process = self._spawn(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        
+        # 按块解码 (与 os.fsdecode 相同的编码), 分隔符不会出现在多字节字符内部
+        encoding, errors = sys.getfilesystemencoding(), sys.getfilesystemencodeerrors()
+        text_separator = separator.decode(encoding)
+        reader = watchdog = None
+        stderr_chunks = []
+        stdout_bytes = 0
+        pending = b""
+        completed = False
+        try:
+            # 标准错误在后台线程读取, 避免管道写满阻塞 git
+            reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+            reader.start()
+            watchdog = self._watch(process, args)
+            
+            while True:
+                chunk = process.stdout.read1(self.STREAM_CHUNK)
+                if not chunk:
+                    break
+                stdout_bytes += len(chunk)
+                complete, found, pending = (pending + chunk).rpartition(separator)
+                if found:
+                    yield from complete.decode(encoding, errors).split(text_separator)
+            if pending:
+                yield pending.decode(encoding, errors)
+            completed = True
+        finally:
+            returncode = self._reap(process, reader, watchdog, completed)
+        
+        if self._cancelled:
+            raise OperationCancelled()
+        self._finish_watch(watchdog)
+        stderr = b"".join(stderr_chunks)
+        self._notify(args, started, cpu_before, returncode, stdout_bytes, len(stderr))
+        if returncode != 0:
+            error_msg = stderr.decode('utf-8', errors='ignore').strip()
+            raise GitCommandError(f"git {' '.join(args)} 失败: {error_msg}", returncode)
+    
+    # --no-optional-locks: 后台刷新不改写索引, 避免与其他 git 操作争用 index.lock
+    STATUS_ARGS = ("--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z")
+    
+    def status(self, sample=0):
+        """单次 git 调用获取分支、上游、领先/落后与文件改动统计 (流式解析, 只计数)
+        
+        sample > 0 时额外保留前 sample 条改动 (类型, XY, 路径) 用于展示。
+        """
+        return RepoStatus.parse(self.iter_records(*self.STATUS_ARGS), sample)
+    
+    def has_changes(self):
+        """工作区或暂存区是否有任何改动 - 读到第一条改动记录即停止 git"""
+        records = RepoStatus.iter_records(self.iter_records(*self.STATUS_ARGS))
+        try:
+            return any(kind != '#' for kind, _, _ in records)
+        finally:
+            records.close()
+
+
+# ================================
+# 仓库状态引擎
+# ================================
+class RepoStatus:
+    """仓库状态快照 - 解析 git status --porcelain=v2 --branch -z 的输出"""
+    
+    SAMPLE = 20  # 用于展示的改动路径条数
+    
+    # 记录类型与 XY 状态码的显示名称
+    KIND_LABELS = {'u': "冲突", '?': "未跟踪"}
+    XY_LABELS = {'M': "修改", 'T': "类型变更", 'A': "新增", 'D': "删除", 'R': "重命名", 'C': "复制"}
+    
+    def __init__(self):
+        self.branch = None       # 当前分支, 游离 HEAD 时为 None
+        self.oid = None          # HEAD 提交, 尚无提交时为 None
+        self.upstream = None     # 上游分支, 例如 origin/main
+        self.ahead = None        # 领先上游的提交数, 无上游时为 None
+        self.behind = None       # 落后上游的提交数, 无上游时为 None
+        self.staged = 0          # 暂存区有改动的文件数
+        self.unstaged = 0        # 工作区有改动的已跟踪文件数
+        self.untracked = 0       # 未跟踪文件数
+        self.conflicted = 0      # 冲突文件数
+        self.changed = 0         # 有任何改动的文件数 (等同 porcelain 输出行数)
+        self.sample = []         # 解析时按需保留的前若干条改动 (类型, XY, 路径)
+    
+    @property
+    def has_upstream(self):
+        """是否配置了可用的上游分支"""
+        return self.ahead is not None
+    
+    @property
+    def is_clean(self):
+        """工作区与暂存区是否干净"""
+        return self.changed == 0
+    
+    @staticmethod
+    def iter_records(output):
+        """逐条产出 (类型, XY, 路径), 头信息产出 ('#', '', 原始记录)
+        
+        output 可以是完整的 NUL 分隔字符串, 也可以是逐条产出记录的迭代器
+        (GitRunner.iter_records), 后者边读边解析。
+        """
+        records = iter(output.split('\0') if isinstance(output, str) else output)
+        for record in records:
+            if not record:
+                continue
+            
+            kind = record[0]
+            if kind == '#':
+                yield kind, '', record
+            elif kind == '1':
+                yield kind, record[2:4], record.split(' ', 8)[8]
+            elif kind == '2':
+                # 重命名/复制记录后面紧跟原路径
+                yield kind, record[2:4], record.split(' ', 9)[9]
+                next(records, None)
+            elif kind == 'u':
+                yield kind, record[2:4], record.split(' ', 10)[10]
+            elif kind in '?!':
+                yield kind, '', record[2:]
+    
+    @classmethod
+    def describe(cls, kind, xy):
+        """单条改动的简短说明, 例如 修改 / 未跟踪"""
+        if kind in cls.KIND_LABELS:
+            return cls.KIND_LABELS[kind]
+        code = xy[0] if xy[0] != '.' else xy[1]
+        return cls.XY_LABELS.get(code, xy)
+    
+    def sample_lines(self):
+        """改动样本的展示文本, 超出样本的部分以计数概括"""
+        lines = [f"{self.describe(kind, xy)}: {path}" for kind, xy, path in self.sample]
+        if self.changed > len(self.sample):
+            lines.append(f"... 及其他 {self.changed - len(self.sample)} 个文件")
+        return lines
+    
+    def count(self, kind, xy, sign=1):
+        """按条目类别增减文件计数"""
+        if kind == '!':
+            return
+        self.changed += sign
+        if kind in '12':
+            if xy[0] != '.':
+                self.staged += sign
+            if xy[1] != '.':
+                self.unstaged += sign
+        elif kind == 'u':
+            self.conflicted += sign
+        elif kind == '?':
+            self.untracked += sign
+    
+    @classmethod
+    def parse(cls, output, sample=0):
+        """解析 NUL 分隔的 porcelain v2 输出, 只累计计数 (sample > 0 时保留前 sample 条改动)"""
+        status = cls()
+        for kind, xy, data in cls.iter_records(output):
+            if kind == '#':
+                status._parse_header(data)
+            else:
+                status.count(kind, xy)
+                if len(status.sample) < sample and kind != '!':
+                    status.sample.append((kind, xy, data))
+        return status
+    
+    def _parse_header(self, record):
+        """解析 # branch.* 头信息"""
+        parts = record.split(' ')
+        key = parts[1] if len(parts) > 1 else ''
+        value = parts[2] if len(parts) > 2 else ''
+        
+        if key == 'branch.oid':
+            self.oid = None if value == '(initial)' else value
+        elif key == 'branch.head':
+            self.branch = None if value == '(detached)' else value
+        elif key == 'branch.upstream':
+            self.upstream = value
+        elif key == 'branch.ab' and len(parts) >= 4:
+            self.ahead = int(parts[2].lstrip('+'))
+            self.behind = int(parts[3].lstrip('-'))
+
+
+# ================================
+# Git索引读取
+# ================================
+class IndexFormatError(ValueError):
+    """索引文件无法解析或使用了不支持的格式"""
+
+
+class IndexEntry:
+    """索引中的一个条目 (只保留判断工作区变化所需的字段)"""
+    __slots__ = ("path", "mode", "size", "mtime_ns", "ino", "stage", "assume_valid", "skip_worktree")
+    
+    GITLINK = 0o160000  # 子模块
+
+
+class GitIndex:
+    """.git/index 只读解析器 - 支持版本 2/3/4 与 untracked cache 扩展, 不启动 git 进程
+    
+    拆分索引 (split index) 需要合并共享索引文件, 暂不支持, 遇到时抛出 IndexFormatError。
+    不校验末尾的校验和: git 总是先写 index.lock 再原子替换, 不会读到写了一半的文件。
+    """
+    
+    SIGNATURE = b"DIRC"
+    STAT = struct.Struct(">10I")  # ctime(秒/纳秒) mtime(秒/纳秒) dev ino mode uid gid size
+    FLAG_ASSUME_VALID = 0x8000
+    FLAG_EXTENDED = 0x4000
+    FLAG_STAGE = 0x3000
+    XFLAG_SKIP_WORKTREE = 0x4000
+    # untracked cache 头部: 两组 stat 数据 (各 36 字节) 与 dir_flags
+    UNTR_HEADER = 76
+    
+    def __init__(self, version):
+        self.version = version
+        self.entries = []
+        self.extensions = []  # 扩展签名, 例如 TREE, UNTR
+        self.untracked_dirs = None  # untracked cache 中记录的目录 (相对路径, 根目录为空串)
+    
+    @classmethod
+    def read_header(cls, path):
+        """只读取文件头, 返回 (版本, 条目数); 索引不存在时返回 (None, 0)"""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(12)
+        except FileNotFoundError:
+            return None, 0
+        if len(header) < 12 or header[:4] != cls.SIGNATURE:
+            raise IndexFormatError("不是有效的 git 索引文件")
+        return struct.unpack(">II", header[4:])
+    
+    @classmethod
+    def read(cls, path, hash_size=20):
+        """读取并解析索引文件 (SHA-256 仓库 hash_size 为 32)"""
+        with open(path, 'rb') as f:
+            return cls.parse(f.read(), hash_size)
+    
+    @staticmethod
+    def _varint(data, pos):
+        """git 的变长整数 (每字节 7 位, 高位表示后续还有字节, 每多一字节先加 1)"""
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7F
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value = ((value + 1) << 7) | (byte & 0x7F)
+        return value, pos
+    
+    @classmethod
+    def parse(cls, data, hash_size=20):
+        """解析索引内容"""
+        if len(data) < 12 + hash_size or data[:4] != cls.SIGNATURE:
+            raise IndexFormatError("不是有效的 git 索引文件")
+        version, count = struct.unpack_from(">II", data, 4)
+        if version not in (2, 3, 4):
+            raise IndexFormatError(f"不支持的索引版本: {version}")
+        
+        index = cls(version)
+        entries = index.entries
+        unpack = cls.STAT.unpack_from
+        oid_end = 40 + hash_size
+        previous = b""
+        pos = 12
+        try:
+            for _ in range(count):
+                _, _, mtime_s, mtime_ns, _, ino, mode, _, _, size = unpack(data, pos)
+                flags = int.from_bytes(data[pos + oid_end:pos + oid_end + 2], 'big')
+                cursor = pos + oid_end + 2
+                skip_worktree = False
+                if flags & cls.FLAG_EXTENDED:
+                    skip_worktree = bool(int.from_bytes(data[cursor:cursor + 2], 'big') & cls.XFLAG_SKIP_WORKTREE)
+                    cursor += 2
+                
+                if version == 4:
+                    # 路径前缀压缩: 去掉上一路径末尾 N 个字节后接上本条后缀
+                    strip, cursor = cls._varint(data, cursor)
+                    end = data.index(b"\0", cursor)
+                    name = previous[:len(previous) - strip] + data[cursor:end]
+                    pos = end + 1
+                else:
+                    # 名称长度字段最多 0xFFF, 直接找结尾 NUL; 条目按 8 字节对齐补 NUL
+                    end = data.index(b"\0", cursor)
+                    name = data[cursor:end]
+                    pos += (cursor - pos + len(name) + 8) & ~7
+                previous = name
+                
+                entry = IndexEntry()
+                entry.path = os.fsdecode(name)
+                entry.mode = mode
+                entry.size = size
+                entry.mtime_ns = mtime_s * 1_000_000_000 + mtime_ns
+                entry.ino = ino
+                entry.stage = (flags & cls.FLAG_STAGE) >> 12
+                entry.assume_valid = bool(flags & cls.FLAG_ASSUME_VALID)
+                entry.skip_worktree = skip_worktree
+                entries.append(entry)
+        except (IndexError, ValueError, struct.error) as e:
+            raise IndexFormatError(f"索引条目损坏: {e}")
+        
+        # 扩展: 4 字节签名 + 4 字节长度 + 内容, 之后是校验和
+        end = len(data) - hash_size
+        while pos + 8 <= end:
+            signature = data[pos:pos + 4]
+            size = int.from_bytes(data[pos + 4:pos + 8], 'big')
+            body = data[pos + 8:pos + 8 + size]
+            pos += 8 + size
+            index.extensions.append(signature.decode('ascii', errors='replace'))
+            if signature == b"link":
+                raise IndexFormatError("拆分索引 (split index) 暂不支持")
+            if signature == b"UNTR":
+                index.untracked_dirs = cls._parse_untracked(body, hash_size)
+        return index
+    
+    @classmethod
+    def _parse_untracked(cls, data, hash_size):
+        """解析 untracked cache 扩展, 只取其中记录的目录树; 格式异常时返回 None"""
+        dirs = []
+        
+        def read_dir(pos, parent):
+            untracked_count, pos = cls._varint(data, pos)
+            dir_count, pos = cls._varint(data, pos)
+            end = data.index(b"\0", pos)
+            name = os.fsdecode(data[pos:end]).rstrip("/")
+            path = f"{parent}/{name}" if parent and name else (parent or name)
+            pos = end + 1
+            for _ in range(untracked_count):
+                pos = data.index(b"\0", pos) + 1
+            dirs.append(path)
+            for _ in range(dir_count):
+                pos = read_dir(pos, path)
+            return pos
+        
+        try:
+            # 标识串, 头部, info/exclude 与 core.excludesFile 的对象 ID, 每目录排除文件名
+            ident_len, pos = cls._varint(data, 0)
+            pos = data.index(b"\0", pos + ident_len + cls.UNTR_HEADER + 2 * hash_size) + 1
+            if pos >= len(data):
+                return dirs
+            count, pos = cls._varint(data, pos)
+            if count:
+                read_dir(pos, "")
+        except (IndexError, ValueError, RecursionError):
+            return None
+        return dirs
+
+
+# ================================
+# 增量状态跟踪
+# ================================
+class WorkTreeStatCache:
+    """工作区 stat 缓存 - 在进程内判断自上次 git status 以来哪些路径可能变化
+    
+    每次 git status 确认后记录索引/引用/配置文件的 stat 签名、已跟踪文件
+    (由 GitIndex 读出) 与非忽略目录的 stat。之后只需 lstat 即可得出需要重新
+    检查的路径, 没有变化时直接复用上次的结果而不启动 git。
+    
+    目录通过遍历工作区得到 (跳过被忽略的目录), 并补充 untracked cache 扩展中
+    记录的目录; 该扩展不记录空的或整体未跟踪的目录, 不能单独用来发现新文件。
+    """
+    
+    # 这些文件变化会影响其他路径的状态, 出现时全量刷新
+    GLOBAL_FILES = (".gitignore", ".gitattributes", ".gitmodules")
+    # 时间戳精度不足的文件系统上, 记录前后短时间内的修改可能不改变 stat, 这段时间内的路径总是重新检查
+    RACY_NS = 2_000_000_000
+    
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, repo_path):
+        """同一仓库在进程内共用一个缓存 (状态刷新与上传前检查)"""
+        key = os.path.abspath(repo_path)
+        with cls._shared_lock:
+            cache = cls._shared.get(key)
+            if cache is None:
+                cache = cls._shared[key] = cls(GitRunner(key))
+            return cache
+    
+    def __init__(self, git):
+        self.git = git
+        self._lock = threading.Lock()
+        self._signature = None  # None 表示尚无可用基线
+        # 路径 -> (stat 键, 确认时刻); 修改时间接近确认时刻的路径总是重新检查
+        self._files = {}  # 已跟踪文件
+        self._dirs = {}  # 目录 (根目录为空串)
+        self._status = None
+    
+    @staticmethod
+    def _stat_key(path):
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino, st.st_mode)
+    
+    def _full_path(self, path):
+        return os.path.join(self.git.repo_path, path) if path else self.git.repo_path
+    
+    def _hash_size(self, common_dir):
+        """SHA-256 仓库的对象 ID 为 32 字节"""
+        try:
+            with open(os.path.join(common_dir, "config"), 'r', encoding='utf-8', errors='ignore') as f:
+                return 32 if re.search(r'objectformat\s*=\s*sha256', f.read(), re.IGNORECASE) else 20
+        except OSError:
+            return 20
+    
+    def _common_dir(self, git_dir):
+        """工作树共享的仓库目录 (引用、配置所在位置)"""
+        try:
+            with open(os.path.join(git_dir, "commondir"), 'r', encoding='utf-8') as f:
+                return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+        except OSError:
+            return git_dir
+    
+    def _signature_of(self, status):
+        """影响 git status 结果的仓库元数据文件的 stat 签名"""
+        git_dir = self.git.git_dir()
+        common_dir = self._common_dir(git_dir)
+        paths = [
+            os.path.join(git_dir, "index"), os.path.join(git_dir, "HEAD"),
+            os.path.join(common_dir, "packed-refs"), os.path.join(common_dir, "config"),
+            os.path.join(common_dir, "info", "exclude"), os.path.join(common_dir, "reftable", "tables.list"),
+        ]
+        if status.branch:
+            paths.append(os.path.join(common_dir, "refs", "heads", status.branch))
+        if status.upstream:
+            paths.append(os.path.join(common_dir, "refs", "remotes", status.upstream))
+            paths.append(os.path.join(common_dir, "refs", "heads", status.upstream))
+        return tuple(self._stat_key(path) for path in paths)
+    
+    def _record(self, path, verified_ns):
+        return self._stat_key(self._full_path(path)), verified_ns - self.RACY_NS
+    
+    def _walk(self, top, ignored, verified_ns):
+        """记录 top 及其下所有非忽略目录的 stat"""
+        stack = [top]
+        while stack:
+            rel = stack.pop()
+            self._dirs[rel] = self._record(rel, verified_ns)
+            try:
+                with os.scandir(self._full_path(rel)) as it:
+                    for entry in it:
+                        if entry.name == ".git" or not entry.is_dir(follow_symlinks=False):
+                            continue
+                        child = f"{rel}/{entry.name}" if rel else entry.name
+                        if child + "/" not in ignored:
+                            stack.append(child)
+            except OSError:
+                pass
+    
+    def read_index(self):
+        """按仓库的对象格式读取索引, 失败时抛出 OSError / IndexFormatError"""
+        git_dir = self.git.git_dir()
+        return GitIndex.read(os.path.join(git_dir, "index"), self._hash_size(self._common_dir(git_dir)))
+    
+    def invalidate(self):
+        with self._lock:
+            self._signature = None
+    
+    def seed(self, status, ignored, started_ns):
+        """git status 全量确认后记录基线 (started_ns 为查询开始时刻)"""
+        with self._lock:
+            self._signature = None
+            try:
+                index = self.read_index()
+            except (OSError, IndexFormatError):
+                return
+            
+            files = {}
+            for entry in index.entries:
+                if entry.mode == IndexEntry.GITLINK:
+                    return  # 子模块内部的变化无法通过 stat 发现
+                if entry.assume_valid or entry.skip_worktree:
+                    continue
+                files[entry.path] = self._record(entry.path, started_ns)
+            
+            self._files = files
+            self._dirs = {}
+            self._walk("", ignored, started_ns)
+            for path in index.untracked_dirs or ():
+                if path not in self._dirs and os.path.isdir(self._full_path(path)):
+                    self._dirs[path] = self._record(path, started_ns)
+            
+            # 查询期间元数据有变化时不建立基线, 下次仍然全量查询
+            signature = self._signature_of(status)
+            if any(key and key[0] >= started_ns for key in signature):
+                return
+            self._status = status
+            self._signature = signature
+    
+    def update(self, paths, status, ignored, started_ns):
+        """按路径增量查询后更新这些路径的基线 (元数据签名保持不变, 其变化仍触发全量刷新)"""
+        with self._lock:
+            if self._signature is None:
+                return
+            for path in paths:
+                if path in self._files:
+                    self._files[path] = self._record(path, started_ns)
+                if os.path.isdir(self._full_path(path)) and path + "/" not in ignored:
+                    self._walk(path, ignored, started_ns)
+                elif path in self._dirs:
+                    self._dirs[path] = self._record(path, started_ns)
+            self._status = status
+    
+    def check(self):
+        """返回自上次确认以来可能变化的路径集合; 没有可用基线或需要全量刷新时返回 None"""
+        with self._lock:
+            return self._changed()
+    
+    def _changed(self):
+        """check 的实现, 调用方持有 _lock"""
+        if self._signature is None or self._signature != self._signature_of(self._status):
+            return None
+        
+        changed = set()
+        for table in (self._files, self._dirs):
+            for path, (key, racy_after) in table.items():
+                if key is None:
+                    if os.path.lexists(self._full_path(path)):
+                        changed.add(path)
+                elif key[0] >= racy_after or self._stat_key(self._full_path(path)) != key:
+                    changed.add(path)
+        if "" in changed or any(os.path.basename(path) in self.GLOBAL_FILES for path in changed):
+            return None
+        return changed
+    
+    def quick_status(self):
+        """自上次确认以来没有任何变化时返回当时的状态副本, 否则返回 None
+        
+        检查与复制在同一把锁内完成, 不会拿到另一个线程刚写入的新基线之外的状态。
+        """
+        with self._lock:
+            changed = self._changed()
+            if changed is None or changed:
+                return None
+            status = RepoStatus()
+            status.__dict__.update(self._status.__dict__)
+            status.sample = list(self._status.sample)
+            return status
+
+
+class StatusTracker:
+    """增量状态跟踪 - 全量扫描一次后只重新检查发生变化的路径
+    
+    与 git status 默认方式一样, 整体未跟踪的目录只计为一条 "目录/"。
+    """
+    
+    # 单批变化路径超过此数量时直接全量刷新
+    MAX_PATHSPEC = 256
+    
+    def __init__(self, git):
+        self.git = git
+        self.entries = {}  # 路径 -> (类型, XY)
+        self.ignored = set()  # 被忽略的目录 (以 / 结尾), stat 缓存遍历时跳过
+        self.stat_cache = WorkTreeStatCache.shared(git.repo_path)
+        self._status = RepoStatus()
+        self._verified = False  # 条目表是否来自全量查询
+        self._tracked_dirs = None  # (索引 stat 键, 含已跟踪文件的目录集合)
+    
+    def _query(self, paths=()):
+        """执行 porcelain v2 查询 (未跟踪目录的折叠方式与 GitRunner.status 相同)"""
+        args = ["--no-optional-locks", "--literal-pathspecs", "status",
+                "--porcelain=v2", "--branch", "-z", "--ignored=matching"]
+        if paths:
+            args += ["--", *paths]
+        return self.git.iter_records(*args)
+    
+    def _tracked_dir_set(self):
+        """索引中含有已跟踪文件的目录 (索引不变时复用); 索引无法解析时返回 None"""
+        key = WorkTreeStatCache._stat_key(os.path.join(self.git.git_dir(), "index"))
+        if self._tracked_dirs and self._tracked_dirs[0] == key:
+            return self._tracked_dirs[1]
+        
+        dirs = set()
+        if key is not None:
+            try:
+                index = self.stat_cache.read_index()
+            except (OSError, IndexFormatError):
+                return None
+            for entry in index.entries:
+                path = entry.path
+                while '/' in path:
+                    path = path.rsplit('/', 1)[0]
+                    if path in dirs:
+                        break
+                    dirs.add(path)
+        self._tracked_dirs = (key, dirs)
+        return dirs
+    
+    def _collapse(self, paths):
+        """把未跟踪目录中的路径换成最外层的未跟踪目录; 索引无法解析时返回 None
+        
+        git 按目录查询时输出 "目录/", 按其中的文件查询时却逐个列出,
+        不换成目录会与全量查询的计数不一致。
+        """
+        tracked_dirs = self._tracked_dir_set()
+        if tracked_dirs is None:
+            return None
+        collapsed = set()
+        for path in paths:
+            parts = path.split('/')
+            for depth in range(1, len(parts)):
+                parent = '/'.join(parts[:depth])
+                if parent not in tracked_dirs:
+                    path = parent
+                    break
+            collapsed.add(path)
+        return collapsed
+    
+    def _apply(self, output):
+        """边读取查询结果边合并到条目表与计数"""
+        status = self._status
+        status.branch = status.oid = status.upstream = status.ahead = status.behind = None
+        for kind, xy, data in RepoStatus.iter_records(output):
+            if kind == '#':
+                status._parse_header(data)
+            elif kind == '!':
+                if data.endswith('/'):
+                    self.ignored.add(data)
+            else:
+                previous = self.entries.get(data)
+                if previous:
+                    status.count(*previous, sign=-1)
+                self.entries[data] = (kind, xy)
+                status.count(kind, xy)
+    
+    def full_refresh(self):
+        """全量刷新 - stat 缓存确认没有变化时不启动 git, 只有少量路径变化时按路径查询"""
+        if self._verified:
+            changed = self.stat_cache.check()
+            if changed is not None and len(changed) <= self.MAX_PATHSPEC:
+                return self.refresh_paths(changed)
+        
+        started = time.time_ns()
+        self.entries = {}
+        self.ignored = set()
+        self._status = RepoStatus()
+        self._verified = False
+        self._apply(self._query())
+        self._verified = True
+        self.stat_cache.seed(self.snapshot(), self.ignored, started)
+        return self.snapshot()
+    
+    def refresh_paths(self, paths):
+        """只重新检查给定路径 (相对仓库根目录, 目录包含其下所有文件)"""
+        if not paths:
+            return self.snapshot()
+        paths = self._collapse(paths)
+        if paths is None or len(paths) > self.MAX_PATHSPEC:
+            self.stat_cache.invalidate()
+            return self.full_refresh()
+        
+        started = time.time_ns()
+        
+        paths = sorted(paths)
+        # 先移除这些路径下的旧条目, 查询结果中仍有改动的会被重新加入
+        prefixes = tuple(path.rstrip('/') + '/' for path in paths)
+        exact = set(paths)
+        for path in [p for p in self.entries if p in exact or p.startswith(prefixes)]:
+            self._status.count(*self.entries.pop(path), sign=-1)
+        
+        try:
+            self._apply(self._query(paths))
+        except Exception:
+            # 查询中途失败时条目表已不完整, 下次必须全量查询
+            self._verified = False
+            self.stat_cache.invalidate()
+            raise
+        if self._verified:
+            self.stat_cache.update(paths, self.snapshot(), self.ignored, started)
+        return self.snapshot()
+    
+    def snapshot(self):
+        """返回当前状态的副本 (附带前若干条改动作为样本)"""
+        status = RepoStatus()
+        status.__dict__.update(self._status.__dict__)
+        status.sample = [
+            (kind, xy, path) for path, (kind, xy) in itertools.islice(self.entries.items(), RepoStatus.SAMPLE)
+        ]
+        return status
+
+
+# ================================
+# 工作区文件监视
+# ================================
+class WorkTreeWatcher:
+    """工作区文件监视器 - Linux 使用 inotify, 其他平台轮询; 突发事件合并后批量回调
+    
+    回调参数为 (变化路径集合, 是否需要全量刷新), 路径相对仓库根目录并使用 / 分隔。
+    .git 中 HEAD、index、refs 的变化 (提交、暂存、切换分支等) 会要求全量刷新。
+    被忽略的目录 (node_modules、构建输出等) 既不监视也不扫描, 其中的变化不会回调。
+    """
+    
+    SETTLE_SECONDS = 0.3    # 事件静默多久后回调
+    MAX_LATENCY = 2.0       # 事件持续不断时的最长等待
+    POLL_INTERVAL = 3.0     # 轮询模式的扫描间隔
+    MAX_POLL_INTERVAL = 30.0  # 工作区持续没有变化时, 扫描间隔逐次加倍到此上限
+    
+    # inotify 常量
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+    
+    def __init__(self, repo_path, callback, on_started=None):
+        self.repo_path = os.path.abspath(str(repo_path))
+        self.callback = callback
+        self.on_started = on_started
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._libc = None
+        self._fd = -1
+        self._watches = {}  # 监视描述符 -> 相对目录
+        self._ignored = set()  # 被忽略的路径 (目录以 / 结尾)
+        self._ignore_dirty = False  # .gitignore 等规则文件有变化, 需要重新查询
+        self._pending = set()
+        self._pending_full = False
+        self._first_event = 0.0
+        self._last_event = 0.0
+    
+    def start(self):
+        """启动监视线程 (建立监视需要遍历目录树, 也在线程中完成)"""
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"watch:{Path(self.repo_path).name}",
+            daemon=True
+        )
+        self._thread.start()
+    
+    def _run(self):
+        """选择后端并进入事件循环 (inotify 描述符由本线程关闭, 退出前不会被其他线程关掉)"""
+        try:
+            self._load_ignored()
+            self.backend = "inotify" if self._init_inotify() else "polling"
+            if self._stop.is_set():
+                return
+            if self.on_started:
+                self.on_started(self.backend)
+            if self.backend == "inotify":
+                self._inotify_loop()
+            else:
+                self._poll_loop()
+        finally:
+            self._close_fd()
+    
+    def stop(self):
+        """停止监视 (线程仍在遍历目录时由它自行退出并关闭描述符)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        else:
+            self._close_fd()
+    
+    def _close_fd(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+    
+    # ---------- 忽略规则 ----------
+    IGNORE_FILES = ('.gitignore', '.git/info/exclude')
+    
+    def _load_ignored(self):
+        """查询被忽略的目录与文件, 整个被忽略的目录只列出目录本身"""
+        self._ignore_dirty = False
+        try:
+            self._ignored = set(GitRunner(self.repo_path).iter_records(
+                "ls-files", "-z", "--others", "--ignored", "--exclude-standard", "--directory"
+            ))
+            self._ignored.discard("")
+        except (GitCommandError, OSError):
+            self._ignored = set()
+    
+    def _check_ignored(self, rel_dirs):
+        """一次 check-ignore 查询新出现的目录是否被忽略, 被忽略的加入忽略表"""
+        if not rel_dirs:
+            return
+        try:
+            result = GitRunner(self.repo_path).run("check-ignore", "--stdin", "-z", input="\0".join(rel_dirs))
+        except OSError:
+            return
+        self._ignored.update(path.rstrip('/') + '/' for path in result.stdout.split('\0') if path)
+    
+    def _is_ignored(self, rel_path):
+        """路径本身或其所在的某级目录被忽略"""
+        if rel_path in self._ignored or rel_path + '/' in self._ignored:
+            return True
+        parts = rel_path.split('/')
+        prefix = ''
+        for part in parts[:-1]:
+            prefix += part + '/'
+            if prefix in self._ignored:
+                return True
+        return False
+    
+    def _prune_ignored(self, rel_dir, dirnames):
+        """遍历时剔除被忽略的子目录 (os.walk 自顶向下, 就地修改 dirnames)"""
+        if rel_dir == '.git':
+            dirnames[:] = [d for d in dirnames if d == 'refs']
+            return
+        if rel_dir.startswith('.git/'):
+            return
+        dirnames[:] = [
+            d for d in dirnames
+            if (f"{rel_dir}/{d}/" if rel_dir else f"{d}/") not in self._ignored
+        ]
+    
+    # ---------- 事件合并 ----------
+    def _record(self, path, full=False):
+        """记录一次变化"""
+        now = time.monotonic()
+        if not self._pending and not self._pending_full:
+            self._first_event = now
+        self._last_event = now
+        if full:
+            self._pending_full = True
+        elif path:
+            self._pending.add(path)
+    
+    def _flush_if_settled(self):
+        """事件静默或等待过久时回调一批变化"""
+        if not self._pending and not self._pending_full:
+            return
+        now = time.monotonic()
+        if (now - self._last_event < self.SETTLE_SECONDS and
+                now - self._first_event < self.MAX_LATENCY):
+            return
+        
+        paths, full = self._pending, self._pending_full
+        self._pending, self._pending_full = set(), False
+        try:
+            self.callback(paths, full)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _is_git_meta(rel_path):
+        """.git 内部路径中会影响状态的部分"""
+        name = rel_path.rsplit('/', 1)[-1]
+        if name.endswith('.lock'):
+            return False
+        return rel_path in ('.git/HEAD', '.git/index', '.git/packed-refs') or \
+            rel_path.startswith('.git/refs/')
+    
+    def _classify(self, rel_path):
+        """将变化路径记入批次"""
+        if rel_path == '.git' or rel_path.startswith('.git/'):
+            if rel_path == '.git/info/exclude':
+                self._ignore_dirty = True
+            if self._is_git_meta(rel_path):
+                self._record(None, full=True)
+        elif not self._is_ignored(rel_path):
+            if rel_path.rsplit('/', 1)[-1] == '.gitignore':
+                self._ignore_dirty = True
+            self._record(rel_path)
+    
+    # ---------- inotify ----------
+    def _init_inotify(self):
+        """初始化 inotify, 不可用或监视数超限时返回 False"""
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+        if self._fd < 0:
+            return False
+        
+        if not self._add_tree(''):
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()
+            return False
+        return True
+    
+    def _add_watch(self, rel_dir):
+        """为单个目录添加监视"""
+        full_path = os.path.join(self.repo_path, rel_dir) if rel_dir else self.repo_path
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(full_path), self.WATCH_MASK)
+        if wd < 0:
+            # ENOSPC: 超出 max_user_watches; 目录已消失等其他错误忽略
+            return ctypes.get_errno() != errno.ENOSPC
+        self._watches[wd] = rel_dir
+        return True
+    
+    def _add_tree(self, rel_root):
+        """递归监视目录树, .git 中只监视 .git、.git/info 与 .git/refs, 跳过被忽略的目录"""
+        root = os.path.join(self.repo_path, rel_root) if rel_root else self.repo_path
+        for dirpath, dirnames, _ in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, self.repo_path).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir
+            self._prune_ignored(rel_dir, dirnames)
+            if rel_dir == '.git':
+                dirnames.extend(d for d in ('info',) if os.path.isdir(os.path.join(dirpath, d)))
+            if self._stop.is_set() or not self._add_watch(rel_dir):
+                return False
+        return True
+    
+    def _rewatch(self):
+        """目录移动后重建全部监视"""
+        for wd in list(self._watches):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._watches.clear()
+        if not self._add_tree(''):
+            # 监视数超限, 退回轮询
+            os.close(self._fd)
+            self._fd = -1
+            self.backend = "polling"
+            self._poll_loop()
+            return False
+        return True
+    
+    def _inotify_loop(self):
+        """inotify 事件循环"""
+        header = struct.Struct('iIII')
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.1)
+            if not readable:
+                self._flush_if_settled()
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            
+            rewatch = False
+            offset = 0
+            while offset + header.size <= len(data):
+                wd, mask, _, length = header.unpack_from(data, offset)
+                name = data[offset + header.size:offset + header.size + length].rstrip(b'\0')
+                offset += header.size + length
+                
+                if mask & self.IN_Q_OVERFLOW:
+                    self._record(None, full=True)
+                    continue
+                if mask & self.IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                
+                rel_dir = self._watches.get(wd)
+                if rel_dir is None:
+                    continue
+                rel_path = f"{rel_dir}/{os.fsdecode(name)}" if rel_dir else os.fsdecode(name)
+                
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_MOVED_FROM | self.IN_MOVED_TO):
+                        rewatch = True
+                    elif mask & self.IN_CREATE and (not rel_path.startswith('.git/') or
+                                                    rel_path.startswith('.git/refs/')):
+                        if not rel_path.startswith('.git/'):
+                            self._check_ignored([rel_path])
+                        if not self._is_ignored(rel_path + '/') and not self._add_tree(rel_path):
+                            rewatch = True
+                self._classify(rel_path if name else rel_dir)
+            
+            if self._ignore_dirty:
+                # 忽略规则变化: 重新查询并按新规则重建监视, 状态也要全量刷新
+                self._load_ignored()
+                self._record(None, full=True)
+                rewatch = True
+            if rewatch:
+                self._record(None, full=True)
+                if not self._rewatch():
+                    return
+            self._flush_if_settled()
+    
+    # ---------- 轮询 ----------
+    def _scan(self, known_dirs=None):
+        """采集工作区与 .git 关键文件的 (mtime, size) 快照, 跳过被忽略的目录
+        
+        known_dirs 为上次扫描到的目录, 新出现的目录先批量查询是否被忽略再进入。
+        """
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.repo_path):
+            rel_dir = os.path.relpath(dirpath, self.repo_path).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir
+            if known_dirs is not None and rel_dir != '.git' and not rel_dir.startswith('.git/'):
+                self._check_ignored([
+                    child for child in (f"{rel_dir}/{d}" if rel_dir else d for d in dirnames)
+                    if child + '/' not in known_dirs and child + '/' not in self._ignored and child != '.git'
+                ])
+            self._prune_ignored(rel_dir, dirnames)
+            if rel_dir == '.git':
+                dirnames.extend(d for d in ('info',) if os.path.isdir(os.path.join(dirpath, d)))
+            snapshot[rel_dir + '/'] = None
+            for name in filenames:
+                rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                try:
+                    st = os.lstat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                snapshot[rel_path] = (st.st_mtime_ns, st.st_size, st.st_mode)
+        return snapshot
+    
+    def _poll_loop(self):
+        """轮询模式: 定期比较快照, 工作区空闲时逐步拉长扫描间隔"""
+        previous = self._scan()
+        interval = self.POLL_INTERVAL
+        while not self._stop.wait(interval):
+            current = self._scan(previous)
+            changed = [
+                rel_path for rel_path in previous.keys() | current.keys()
+                if previous.get(rel_path) != current.get(rel_path) and not rel_path.endswith('/')
+            ]
+            for rel_path in changed:
+                self._classify(rel_path)
+            if self._ignore_dirty:
+                self._load_ignored()
+                self._record(None, full=True)
+                current = self._scan()
+            interval = self.POLL_INTERVAL if changed else min(interval * 2, self.MAX_POLL_INTERVAL)
+            previous = current
+            # 轮询周期本身已合并了事件, 直接回调
+            self._last_event = self._first_event = 0.0
+            self._flush_if_settled()
+
+
+# ================================
+# 增量备份
+# ================================
+class BackupStoreLock:
+    """备份库的跨进程文件锁 - 快照与恢复持共享锁, 回收对象持独占锁
+    
+    同一目录下的多个仓库共用一个对象库, 批量操作、任务队列与自动同步可能同时备份
+    不同的仓库; 回收对象时必须等所有进行中的快照写完清单, 否则会删掉它们刚写入
+    或正要复用的对象。Windows 不支持共享锁, 退化为独占锁。
+    
+    每个仓库的快照索引另有一把独占锁 (在备份库锁之内获取), 同一仓库的并发备份
+    读-改-写索引时不会互相覆盖对方登记的快照。
+    """
+    
+    def __init__(self, path, shared):
+        self.path = Path(path)
+        self.shared = shared
+        self._file = None
+    
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                self._file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass  # LK_LOCK 重试约 10 秒后仍失败时抛出, 继续等待
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        except BaseException:
+            self._file.close()
+            raise
+        return self
+    
+    def __exit__(self, *exc):
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class BackupStore:
+    """增量去重备份 - 文件内容按哈希存储, 每个快照一份清单
+    
+    目录结构:
+        objects/ab/cdef...          文件内容 (SHA-256 命名, 所有快照和仓库共享)
+        snapshots/<仓库名>-<路径哈希>/backup_<时间戳>.json    快照清单
+        snapshots/<仓库名>-<路径哈希>/index.json              快照索引 (index.lock 为其锁文件)
+        lock                        BackupStoreLock 锁文件
+    
+    与上一个快照相比大小和修改时间未变的文件直接复用哈希, 不重新读取;
+    只有内容变化的文件才会被复制, 备份耗时取决于改动量而不是仓库大小。
+    快照按仓库的绝对路径区分, 同名仓库或移动过的仓库不会混用彼此的快照。
+    """
+    
+    CHUNK_SIZE = 1024 * 1024
+    MANIFEST_VERSION = 1
+    
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.snapshots_dir = self.root / "snapshots"
+    
+    def object_path(self, digest):
+        """内容对象路径"""
+        return self.objects_dir / digest[:2] / digest[2:]
+    
+    def lock(self, shared=True):
+        """备份库锁: 写入或读取对象时用共享锁, 回收对象时用独占锁"""
+        return BackupStoreLock(self.root / "lock", shared)
+    
+    def repo_key(self, source):
+        """仓库的快照目录名: 目录名加绝对路径哈希
+        
+        旧版本只按目录名存放, 其中最新清单记录的来源就是该仓库时整体迁移过来。
+        """
+        resolved = os.path.realpath(str(source))
+        name = Path(resolved).name
+        key = f"{name}-{hashlib.sha256(resolved.encode('utf-8', 'surrogateescape')).hexdigest()[:12]}"
+        
+        legacy_dir = self.snapshots_dir / name
+        if legacy_dir.is_dir() and not (self.snapshots_dir / key).exists():
+            manifests = sorted(legacy_dir.glob("backup_*.json"))
+            try:
+                owner = self.load_manifest(manifests[-1]).get('source') if manifests else None
+            except (OSError, ValueError):
+                owner = None
+            if owner and os.path.realpath(owner) == resolved:
+                try:
+                    os.replace(legacy_dir, self.snapshots_dir / key)
+                except OSError:
+                    pass
+        return key
+    
+    @staticmethod
+    def snapshot_time(path):
+        """从文件名 backup_YYYYmmdd_HHMMSS[_n].* 解析快照时间"""
+        stamp = Path(path).name[len("backup_"):len("backup_") + 15]
+        try:
+            return datetime.strptime(stamp, "%Y%m%d_%H%M%S")
+        except ValueError:
+            return datetime.fromtimestamp(Path(path).stat().st_mtime)
+    
+    def _new_snapshot_path(self, repo_name, suffix):
+        """生成不重名的快照路径, 同一秒内的多次备份追加序号"""
+        repo_dir = self.snapshots_dir / repo_name
+        repo_dir.mkdir(parents=True, exist_ok=True)
+        base = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        path = repo_dir / f"{base}{suffix}"
+        counter = 1
+        while path.exists():
+            path = repo_dir / f"{base}_{counter}{suffix}"
+            counter += 1
+        return path
+    
+    def all_snapshots(self):
+        """全部仓库的快照 (清单与归档), 返回 [(仓库名, 时间, 路径)]"""
+        result = []
+        if not self.snapshots_dir.exists():
+            return result
+        for repo_dir in sorted(self.snapshots_dir.iterdir()):
+            if not repo_dir.is_dir():
+                continue
+            for path in repo_dir.iterdir():
+                if path.name.startswith("backup_") and path.name.endswith(('.json', '.tar.gz')):
+                    result.append((repo_dir.name, self.snapshot_time(path), path))
+        return result
+    
+    def repo_snapshots(self, repo_name):
+        """某仓库的全部快照清单, 按时间从旧到新"""
+        repo_dir = self.snapshots_dir / repo_name
+        if not repo_dir.exists():
+            return []
+        return sorted(repo_dir.glob("backup_*.json"))
+    
+    @staticmethod
+    def load_manifest(manifest_path):
+        """读取快照清单"""
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _store_file(self, path):
+        """复制文件内容到对象库, 边读边算哈希, 返回 (哈希, 是否新对象)"""
+        tmp_dir = self.objects_dir / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_dir / f"{os.getpid()}_{threading.get_ident()}_{time.monotonic_ns()}"
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            while True:
+                chunk = src.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                dst.write(chunk)
+        
+        digest = digest.hexdigest()
+        target = self.object_path(digest)
+        if target.exists():
+            tmp_path.unlink()
+            return digest, False
+        
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+        return digest, True
+    
+    def snapshot(self, source, progress=None):
+        """创建快照, 返回 (清单路径, 统计信息)
+        
+        从复用对象到写入清单都持有共享锁, 期间其他仓库的回收不会删除这些对象。
+        """
+        with self.lock(shared=True):
+            return self._snapshot(source, progress)
+    
+    def _snapshot(self, source, progress):
+        source = Path(source)
+        repo_name = self.repo_key(source)
+        started = time.monotonic()
+        
+        # 上一个快照用于跳过未变化的文件
+        previous = {}
+        history = self.repo_snapshots(repo_name)
+        if history:
+            try:
+                previous = self.load_manifest(history[-1]).get('files', {})
+            except (OSError, ValueError):
+                previous = {}
+        
+        files = {}
+        stats = {'files': 0, 'copied': 0, 'copied_bytes': 0, 'reused': 0, 'total_bytes': 0}
+        
+        for rel_path, full_path, st in self._walk(source):
+            entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'mode': st.st_mode}
+            if os.path.islink(full_path):
+                entry['link'] = os.readlink(full_path)
+                files[rel_path] = entry
+                continue
+            if os.path.isdir(full_path):
+                entry['dir'] = True
+                files[rel_path] = entry
+                continue
+            
+            old = previous.get(rel_path)
+            if (old and 'hash' in old and old['size'] == st.st_size and
+                    old['mtime_ns'] == st.st_mtime_ns and
+                    self.object_path(old['hash']).exists()):
+                entry['hash'] = old['hash']
+                stats['reused'] += 1
+            else:
+                try:
+                    entry['hash'], is_new = self._store_file(full_path)
+                except OSError:
+                    # 备份过程中被删除或无法读取的文件跳过
+                    continue
+                if is_new:
+                    stats['copied'] += 1
+                    stats['copied_bytes'] += st.st_size
+                else:
+                    stats['reused'] += 1
+            
+            files[rel_path] = entry
+            stats['files'] += 1
+            stats['total_bytes'] += st.st_size
+            if progress and stats['files'] % 5000 == 0:
+                progress(stats)
+        
+        stats['elapsed'] = round(time.monotonic() - started, 3)
+        manifest = {
+            'version': self.MANIFEST_VERSION,
+            'source': os.path.realpath(str(source)),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'stats': stats,
+            'files': files
+        }
+        
+        manifest_path = self._new_snapshot_path(repo_name, ".json")
+        tmp_path = manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, manifest_path)
+        
+        self._index_add(manifest_path, {
+            'kind': 'incremental',
+            'created': manifest['created'],
+            'files': stats['files'],
+            'total_bytes': stats['total_bytes'],
+            'size': manifest_path.stat().st_size
+        })
+        return manifest_path, stats
+    
+    def archive(self, source, level=1, workers=None):
+        """创建流式压缩归档 (tar + 并行 gzip), 返回 (归档路径, 统计信息)"""
+        with self.lock(shared=True):
+            return self._archive(Path(source), level, workers)
+    
+    def _archive(self, source, level, workers):
+        started = time.monotonic()
+        archive_path = self._new_snapshot_path(self.repo_key(source), ".tar.gz")
+        tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+        
+        writer = None
+        try:
+            with open(tmp_path, 'wb') as f:
+                writer = ParallelGzipWriter(f, level=level, workers=workers)
+                with tarfile.open(fileobj=writer, mode='w|') as tar:
+                    tar.add(str(source), arcname=source.name)
+                writer.close()
+            os.replace(tmp_path, archive_path)
+        except BaseException:
+            # 读取失败、磁盘已满等情况下不留下半截的归档
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            if writer:
+                writer.abort()
+        
+        stats = {
+            'bytes_in': writer.bytes_in,
+            'bytes_out': writer.bytes_out,
+            'elapsed': round(time.monotonic() - started, 3)
+        }
+        self._index_add(archive_path, {
+            'kind': 'archive',
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'files': None,
+            'total_bytes': writer.bytes_in,
+            'size': writer.bytes_out
+        })
+        return archive_path, stats
+    
+    # ---------- 快照索引 ----------
+    def _index_path(self, repo_name):
+        """每个仓库一份索引, 并行备份不同仓库时互不干扰"""
+        return self.snapshots_dir / repo_name / "index.json"
+    
+    def _load_index(self, repo_name):
+        """读取快照索引"""
+        try:
+            with open(self._index_path(repo_name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self, repo_name, index):
+        """原子写入快照索引"""
+        path = self._index_path(repo_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+    
+    def _index_lock(self, repo_name):
+        """仓库快照索引的独占锁, 读-改-写索引期间持有"""
+        return BackupStoreLock(self.snapshots_dir / repo_name / "index.lock", shared=False)
+    
+    def _index_add(self, path, summary):
+        """登记新快照"""
+        repo_name = path.parent.name
+        with self._index_lock(repo_name):
+            index = self._load_index(repo_name)
+            index[path.name] = summary
+            self._save_index(repo_name, index)
+    
+    def _summarize(self, path):
+        """为索引中缺失的快照生成摘要"""
+        if path.suffix == '.json':
+            manifest = self.load_manifest(path)
+            stats = manifest.get('stats', {})
+            return {
+                'kind': 'incremental',
+                'created': manifest.get('created', self.snapshot_time(path).isoformat()),
+                'files': stats.get('files', len(manifest.get('files', {}))),
+                'total_bytes': stats.get('total_bytes', 0),
+                'size': path.stat().st_size
+            }
+        return {
+            'kind': 'archive',
+            'created': self.snapshot_time(path).isoformat(),
+            'files': None,
+            'total_bytes': None,
+            'size': path.stat().st_size
+        }
+    
+    def list_snapshots(self, source):
+        """列出某仓库 (工作区路径) 的快照摘要 (只读索引, 与目录不一致时自动修正)"""
+        return self._list_snapshots(self.repo_key(source))
+    
+    def _list_snapshots(self, repo_name):
+        repo_dir = self.snapshots_dir / repo_name
+        if not repo_dir.exists():
+            return []
+        
+        with self._index_lock(repo_name):
+            present = {
+                path.name: path for path in repo_dir.iterdir()
+                if path.name.startswith("backup_") and path.name.endswith(('.json', '.tar.gz'))
+            }
+            index = self._load_index(repo_name)
+            changed = False
+            for name in set(index) - set(present):
+                del index[name]
+                changed = True
+            for name in set(present) - set(index):
+                index[name] = self._summarize(present[name])
+                changed = True
+            if changed:
+                self._save_index(repo_name, index)
+        
+        result = []
+        for name in sorted(index, key=lambda n: (index[n]['created'], n)):
+            summary = dict(index[name])
+            summary['name'] = name
+            summary['path'] = str(present[name])
+            result.append(summary)
+        return result
+    
+    # ---------- 比较与恢复 ----------
+    @staticmethod
+    def _walk(source):
+        """遍历目录树, 产出 (相对路径, 完整路径, lstat 结果)
+        
+        除文件外还产出符号链接 (包括指向目录的链接, 不跟随) 与空目录, 恢复时据此重建。
+        """
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            rel_dir = os.path.relpath(dirpath, source).replace(os.sep, '/')
+            if rel_dir != '.' and not dirnames and not filenames:
+                try:
+                    yield rel_dir, dirpath, os.lstat(dirpath)
+                except OSError:
+                    pass
+                continue
+            # os.walk 把指向目录的符号链接放在 dirnames 中, 不会进入也不会作为文件产出
+            links = [name for name in dirnames if os.path.islink(os.path.join(dirpath, name))]
+            for name in sorted(filenames + links):
+                rel_path = name if rel_dir == '.' else f"{rel_dir}/{name}"
+                full_path = os.path.join(dirpath, name)
+                try:
+                    yield rel_path, full_path, os.lstat(full_path)
+                except OSError:
+                    continue
+    
+    def _manifest_files(self, snapshot):
+        """读取快照清单中的文件表, 归档快照不支持逐文件操作"""
+        snapshot = Path(snapshot)
+        if snapshot.suffix != '.json':
+            raise ValueError(f"{snapshot.name} 是压缩归档, 只有增量快照支持比较和恢复")
+        return self.load_manifest(snapshot).get('files', {})
+    
+    @staticmethod
+    def _diff_files(old, new, same):
+        """比较两个文件表, 返回 {'added', 'removed', 'modified'}"""
+        return {
+            'added': sorted(path for path in new if path not in old),
+            'removed': sorted(path for path in old if path not in new),
+            'modified': sorted(
+                path for path in old
+                if path in new and not same(old[path], new[path])
+            )
+        }
+    
+    def diff_snapshots(self, old_snapshot, new_snapshot):
+        """比较两个快照 (只比较清单中的哈希, 不读取文件内容)"""
+        return self._diff_files(
+            self._manifest_files(old_snapshot),
+            self._manifest_files(new_snapshot),
+            lambda a, b: (a.get('hash'), a.get('link'), a.get('dir')) == (b.get('hash'), b.get('link'), b.get('dir'))
+        )
+    
+    def diff_worktree(self, snapshot, source):
+        """比较快照与工作区 (只比较大小与修改时间, 不读取文件内容)"""
+        current = {}
+        for rel_path, full_path, st in self._walk(source):
+            entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+            if os.path.islink(full_path):
+                entry['link'] = os.readlink(full_path)
+            elif os.path.isdir(full_path):
+                entry['dir'] = True
+            current[rel_path] = entry
+        return self._diff_files(self._manifest_files(snapshot), current, self._same_stat)
+    
+    @staticmethod
+    def _same_stat(old, new):
+        """清单条目与工作区条目是否一致: 链接比较目标, 目录只比较类型, 文件比较大小与修改时间"""
+        if 'link' in old or 'link' in new:
+            return old.get('link') == new.get('link')
+        if old.get('dir') or new.get('dir'):
+            return old.get('dir') == new.get('dir')
+        return old['size'] == new['size'] and old['mtime_ns'] == new['mtime_ns']
+    
+    def restore(self, snapshot, target, delete_extra=False):
+        """将目录恢复到快照时的状态, 只复制有差异的文件, 返回统计信息"""
+        with self.lock(shared=True):
+            return self._restore(snapshot, target, delete_extra)
+    
+    def _restore(self, snapshot, target, delete_extra):
+        files = self._manifest_files(snapshot)
+        target = Path(target)
+        diff = self.diff_worktree(snapshot, target) if target.exists() else {
+            'added': [], 'removed': sorted(files), 'modified': []
+        }
+        stats = {'restored': 0, 'restored_bytes': 0, 'deleted': 0}
+        
+        for rel_path in diff['removed'] + diff['modified']:
+            entry = files[rel_path]
+            dest = target / rel_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            
+            if 'link' in entry:
+                if dest.is_symlink() or dest.exists():
+                    dest.unlink()
+                os.symlink(entry['link'], dest)
+            elif entry.get('dir'):
+                if dest.is_symlink() or dest.is_file():
+                    dest.unlink()
+                dest.mkdir(exist_ok=True)
+            else:
+                tmp_path = dest.with_name(dest.name + ".restore_tmp")
+                shutil.copyfile(self.object_path(entry['hash']), tmp_path)
+                os.chmod(tmp_path, entry['mode'] & 0o7777)
+                os.utime(tmp_path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+                os.replace(tmp_path, dest)
+                stats['restored_bytes'] += entry['size']
+            stats['restored'] += 1
+        
+        if delete_extra:
+            for rel_path in diff['added']:
+                extra = target / rel_path
+                if extra.is_dir() and not extra.is_symlink():
+                    extra.rmdir()  # 工作区中多出的空目录
+                else:
+                    extra.unlink()
+                stats['deleted'] += 1
+        
+        return stats
+    
+    def gc(self):
+        """删除不再被任何快照清单引用的内容对象, 返回释放的字节数"""
+        with self.lock(shared=False):
+            return self._gc()
+    
+    def _gc(self):
+        # 持独占锁时没有进行中的写入, 残留的临时文件来自中途退出的备份
+        for repo_dir in self.snapshots_dir.glob("*/"):
+            for partial in repo_dir.glob("backup_*.tmp"):
+                partial.unlink(missing_ok=True)
+        
+        referenced = set()
+        for _, _, path in self.all_snapshots():
+            if path.suffix == '.json':
+                files = self.load_manifest(path).get('files', {})
+                referenced.update(entry['hash'] for entry in files.values() if 'hash' in entry)
+        
+        freed = 0
+        if not self.objects_dir.exists():
+            return freed
+        for prefix_dir in self.objects_dir.iterdir():
+            if not prefix_dir.is_dir() or prefix_dir.name == "tmp":
+                continue
+            for obj in prefix_dir.iterdir():
+                if prefix_dir.name + obj.name not in referenced:
+                    freed += obj.stat().st_size
+                    obj.unlink()
+        return freed
+    
+    def prune(self, policy):
+        """按保留策略淘汰旧快照并回收对象, 返回 (删除的快照列表, 释放字节数)
+        
+        持独占锁: 等待进行中的快照写完清单, 期间新的快照也不会开始复用对象。
+        """
+        with self.lock(shared=False):
+            return self._prune(policy)
+    
+    def _prune(self, policy):
+        snapshots = self.all_snapshots()
+        
+        # 每个仓库按层级策略选出保留项
+        keep = set()
+        by_repo = {}
+        for repo, created, path in snapshots:
+            by_repo.setdefault(repo, []).append((created, path))
+        for items in by_repo.values():
+            keep |= policy.select(items)
+        
+        if policy.max_total_bytes:
+            keep = self._evict_for_size(snapshots, keep, by_repo, policy.max_total_bytes)
+        
+        removed = [path for _, _, path in snapshots if path not in keep]
+        freed = 0
+        for path in removed:
+            freed += path.stat().st_size
+            path.unlink()
+        for repo in {path.parent.name for path in removed}:
+            self._list_snapshots(repo)
+        if any(path.suffix == '.json' for path in removed):
+            freed += self._gc()
+        return removed, freed
+    
+    def _evict_for_size(self, snapshots, keep, by_repo, max_total_bytes):
+        """超出容量上限时从最旧的快照开始淘汰 (每个仓库至少保留最新一份)"""
+        refcount = {}
+        object_sizes = {}
+        manifest_objects = {}
+        total = 0
+        
+        for _, _, path in snapshots:
+            if path not in keep:
+                continue
+            total += path.stat().st_size
+            if path.suffix == '.json':
+                hashes = {}
+                for entry in self.load_manifest(path).get('files', {}).values():
+                    if 'hash' in entry:
+                        hashes[entry['hash']] = entry['size']
+                manifest_objects[path] = hashes
+                for digest, size in hashes.items():
+                    if digest not in refcount:
+                        refcount[digest] = 0
+                        total += size
+                    refcount[digest] += 1
+                    object_sizes[digest] = size
+        
+        newest = {max(items)[1] for items in by_repo.values()}
+        candidates = sorted(
+            (created, path) for _, created, path in snapshots
+            if path in keep and path not in newest
+        )
+        keep = set(keep)
+        for _, path in candidates:
+            if total <= max_total_bytes:
+                break
+            keep.discard(path)
+            total -= path.stat().st_size
+            for digest in manifest_objects.get(path, {}):
+                refcount[digest] -= 1
+                if refcount[digest] == 0:
+                    total -= object_sizes[digest]
+        return keep
+
+
+class ParallelGzipWriter:
+    """并行 gzip 写入器 - 数据按块交给线程池独立压缩, 依次写出为多个 gzip 成员
+    
+    多成员 gzip 仍是标准格式, gzip/tar/tarfile 均可直接读取。
+    zlib 压缩时释放 GIL, 因此多个线程可以同时压缩。
+    """
+    
+    BLOCK_SIZE = 4 * 1024 * 1024
+    
+    def __init__(self, fileobj, level=1, workers=None):
+        self.fileobj = fileobj
+        self.level = level
+        self.workers = workers or min(8, os.cpu_count() or 2)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._buffer = bytearray()
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gzip")
+    
+    def write(self, data):
+        """写入未压缩数据"""
+        self._buffer += data
+        self.bytes_in += len(data)
+        while len(self._buffer) >= self.BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:self.BLOCK_SIZE]))
+            del self._buffer[:self.BLOCK_SIZE]
+        return len(data)
+    
+    def _submit(self, block):
+        """提交一个块压缩, 限制在途块数以保持内存恒定"""
+        self._futures.append(self._executor.submit(gzip.compress, block, self.level, mtime=0))
+        while len(self._futures) > self.workers * 2:
+            self._drain_one()
+    
+    def _drain_one(self):
+        """按顺序写出最早的压缩块"""
+        compressed = self._futures.pop(0).result()
+        self.fileobj.write(compressed)
+        self.bytes_out += len(compressed)
+    
+    def close(self):
+        """压缩剩余数据并写出全部块"""
+        if self._buffer or not self.bytes_in:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        while self._futures:
+            self._drain_one()
+        self._executor.shutdown()
+    
+    def abort(self):
+        """丢弃尚未写出的数据并释放线程池 (close 之后调用无影响)"""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self._buffer = bytearray()
+        self._executor.shutdown()
+
+
+class RetentionPolicy:
+    """备份保留策略 - 最近 N 个、每日/每周各保留一份、总容量上限"""
+    
+    def __init__(self, keep_last=5, keep_daily=7, keep_weekly=4, max_total_bytes=None):
+        self.keep_last = max(1, int(keep_last))
+        self.keep_daily = max(0, int(keep_daily))
+        self.keep_weekly = max(0, int(keep_weekly))
+        self.max_total_bytes = max_total_bytes
+    
+    @classmethod
+    def from_config(cls, config):
+        """从配置字典创建 (max_gb 为 0 或缺省时不限容量)"""
+        max_gb = float(config.get('backup_max_gb') or 0)
+        return cls(
+            keep_last=config.get('backup_keep_last', 5),
+            keep_daily=config.get('backup_keep_daily', 7),
+            keep_weekly=config.get('backup_keep_weekly', 4),
+            max_total_bytes=int(max_gb * 1024 ** 3) if max_gb > 0 else None
+        )
+    
+    def select(self, snapshots):
+        """从 (时间, 路径) 列表中选出按层级应保留的路径"""
+        ordered = sorted(snapshots, reverse=True)
+        keep = {path for _, path in ordered[:self.keep_last]}
+        
+        days, weeks = [], []
+        for created, path in ordered:
+            day = created.date()
+            week = created.isocalendar()[:2]
+            if day not in days and len(days) < self.keep_daily:
+                days.append(day)
+                keep.add(path)
+            if week not in weeks and len(weeks) < self.keep_weekly:
+                weeks.append(week)
+                keep.add(path)
+        return keep
+
+
+# ================================
+# 操作记录
+# ================================
+class OperationJournal:
+    """持久化操作记录 (SQLite) - 每次操作及其执行的每条 git 命令
+    
+    按仓库、时间和失败状态建立索引, 长期积累后查询依然迅速。
+    记录失败不会影响操作本身。
+    """
+    
+    DEFAULT_PATH = Path.home() / ".github_manager_journal.db"
+    DEFAULT_KEEP_DAYS = 365
+    MAX_OUTPUT_CHARS = 4000
+    
+    # 远程URL中的凭据不写入记录
+    CREDENTIAL_RE = re.compile(r'(\w+://)[^/@\s]+@')
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS operations (
+            id INTEGER PRIMARY KEY,
+            repo TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            started REAL NOT NULL,
+            duration REAL,
+            success INTEGER,
+            message TEXT
+        );
+        CREATE TABLE IF NOT EXISTS commands (
+            id INTEGER PRIMARY KEY,
+            operation_id INTEGER NOT NULL REFERENCES operations(id) ON DELETE CASCADE,
+            description TEXT,
+            args TEXT NOT NULL,
+            started REAL NOT NULL,
+            duration REAL NOT NULL,
+            returncode INTEGER,
+            output TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_operations_repo ON operations(repo, started);
+        CREATE INDEX IF NOT EXISTS idx_operations_started ON operations(started);
+        CREATE INDEX IF NOT EXISTS idx_operations_failed ON operations(started) WHERE success = 0;
+        CREATE INDEX IF NOT EXISTS idx_commands_operation ON commands(operation_id);
+    """
+    
+    def __init__(self, path=None):
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.db = sqlite3.connect(str(self.path), timeout=10)
+        self.db.row_factory = sqlite3.Row
+        # WAL 允许批量执行的多个线程/进程同时写入
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(self.SCHEMA)
+    
+    @classmethod
+    def from_config(cls, config):
+        """按配置打开记录库, 配置 journal_enabled 为 false 时返回 None"""
+        if not config.get('journal_enabled', True):
+            return None
+        return cls(config.get('journal_file'))
+    
+    def close(self):
+        self.db.close()
+    
+    @classmethod
+    def _redact(cls, text):
+        return cls.CREDENTIAL_RE.sub(r'\1***@', text)
+    
+    def begin_operation(self, repo, operation):
+        """记录操作开始, 返回操作编号"""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO operations (repo, operation, started) VALUES (?, ?, ?)",
+                (os.path.abspath(repo), operation, time.time())
+            )
+        return cursor.lastrowid
+    
+    def finish_operation(self, operation_id, success, message):
+        """记录操作结果与总耗时"""
+        with self.db:
+            self.db.execute(
+                "UPDATE operations SET duration = ? - started, success = ?, message = ? WHERE id = ?",
+                (time.time(), None if success is None else int(success), message, operation_id)
+            )
+    
+    def record_command(self, operation_id, args, description, started, duration, returncode, output):
+        """记录一条 git 命令 (输出只保留末尾部分)"""
+        with self.db:
+            self.db.execute(
+                "INSERT INTO commands (operation_id, description, args, started, duration, returncode, output) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    operation_id, description,
+                    self._redact(json.dumps(list(args), ensure_ascii=False)),
+                    started, duration, returncode,
+                    self._redact(output[-self.MAX_OUTPUT_CHARS:]) if output else None
+                )
+            )
+    
+    def search(self, repo=None, since=None, until=None, failed_only=False, operation=None, limit=200):
+        """按仓库 / 时间范围 / 失败状态查询操作 (最新在前), 时间为 Unix 时间戳"""
+        clauses, params = [], []
+        if repo:
+            clauses.append("repo = ?")
+            params.append(os.path.abspath(repo))
+        if since is not None:
+            clauses.append("started >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("started < ?")
+            params.append(until)
+        if failed_only:
+            clauses.append("success = 0")
+        if operation:
+            clauses.append("operation = ?")
+            params.append(operation)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.execute(
+            f"SELECT * FROM operations {where} ORDER BY started DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def commands(self, operation_id):
+        """某次操作执行的全部命令 (按执行顺序)"""
+        rows = self.db.execute(
+            "SELECT * FROM commands WHERE operation_id = ? ORDER BY id", (operation_id,)
+        ).fetchall()
+        return [dict(row, args=json.loads(row['args'])) for row in rows]
+    
+    def prune(self, keep_days=DEFAULT_KEEP_DAYS):
+        """删除超过保留天数的记录, 返回删除的操作数"""
+        with self.db:
+            cursor = self.db.execute(
+                "DELETE FROM operations WHERE started < ?", (time.time() - keep_days * 86400,)
+            )
+        return cursor.rowcount
+
+
+# ================================
+# 耗时追踪
+# ================================
+class OperationTrace:
+    """单次操作的耗时追踪 - 步骤与 git 命令组成嵌套区间, 可导出为 Chrome trace-event JSON
+    
+    子进程 CPU 时间取自 os.times() 的差值, 是整个进程的子进程累计值,
+    批量并发执行时会包含其他仓库的命令, 仅作参考。
+    """
+    
+    def __init__(self, name, repo):
+        self.name = name
+        self.repo = repo
+        self.origin = time.perf_counter()
+        self.wall_start = time.time()
+        self.events = []  # 完成的区间 (Chrome "X" 事件)
+        self._stack = []
+    
+    def _offset_us(self, moment):
+        return round((moment - self.origin) * 1_000_000)
+    
+    def begin(self, name, category="step"):
+        """开始一个区间, 与 end() 成对使用"""
+        self._stack.append([name, category, time.perf_counter(), 0])
+    
+    def end(self):
+        """结束最近开始的区间"""
+        name, category, started, commands = self._stack.pop()
+        self._add(name, category, started, time.perf_counter() - started, {'commands': commands})
+    
+    def _add(self, name, category, started, duration, args):
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ts': self._offset_us(started),
+            'dur': round(duration * 1_000_000),
+            'depth': len(self._stack),
+            'args': args
+        })
+    
+    def add_command(self, args, started, duration, cpu_user, cpu_system, stdout_bytes, stderr_bytes, returncode):
+        """GitRunner.on_command 回调 - 记录一条 git 命令"""
+        for frame in self._stack:
+            frame[3] += 1
+        command = next((arg for arg in args if not arg.startswith('-')), '')
+        self._add(f"git {command}".strip(), "git", started, duration, {
+            'argv': " ".join(OperationJournal._redact(arg) for arg in args),
+            'returncode': returncode,
+            'cpu_user_ms': round(cpu_user * 1000, 1),
+            'cpu_system_ms': round(cpu_system * 1000, 1),
+            'stdout_bytes': stdout_bytes,
+            'stderr_bytes': stderr_bytes
+        })
+    
+    @property
+    def total(self):
+        """已结束的最外层区间的总耗时 (秒)"""
+        return sum(e['dur'] for e in self.events if e['depth'] == 0) / 1_000_000
+    
+    def breakdown(self):
+        """按步骤汇总: [(步骤名, 耗时秒, 占操作总耗时比例, 命令数)]
+        
+        步骤取操作区间的直接子区间 (同名合并, 按耗时降序)
+        """
+        steps = {}
+        for event in self.events:
+            if event['depth'] != 1:
+                continue
+            entry = steps.setdefault(event['name'], [0, 0])
+            entry[0] += event['dur']
+            entry[1] += event['args'].get('commands', 1)
+        total = self.total * 1_000_000 or 1
+        return sorted(
+            ((name, dur / 1_000_000, dur / total, count) for name, (dur, count) in steps.items()),
+            key=lambda item: item[1], reverse=True
+        )
+    
+    def chrome_events(self, pid=1, tid=1):
+        """转换为 Chrome trace-event 列表 (时间戳相对于 Unix 纪元, 多个追踪可合并显示)"""
+        base = round(self.wall_start * 1_000_000)
+        events = [
+            {'name': "process_name", 'ph': "M", 'pid': pid, 'tid': tid, 'args': {'name': self.repo}},
+            {'name': "thread_name", 'ph': "M", 'pid': pid, 'tid': tid, 'args': {'name': self.name}}
+        ]
+        for event in self.events:
+            events.append({
+                'name': event['name'], 'cat': event['cat'], 'ph': "X",
+                'ts': base + event['ts'], 'dur': event['dur'],
+                'pid': pid, 'tid': tid, 'args': event['args']
+            })
+        return events
+    
+    @staticmethod
+    def export_chrome(traces, path):
+        """把一个或多个追踪写入 Chrome trace JSON 文件 (每个仓库一个进程行)"""
+        events = []
+        for pid, trace in enumerate(traces, start=1):
+            events.extend(trace.chrome_events(pid=pid))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': "ms"}, f, ensure_ascii=False)
+    
+    def summary(self):
+        """一行耗时分解, 用于日志"""
+        parts = [f"{name} {seconds:.2f}s ({share:.0%})" for name, seconds, share, _ in self.breakdown()]
+        return f"总耗时 {self.total:.2f}s" + (": " + " | ".join(parts) if parts else "")
+
+
+# ================================
+# Git操作
+# ================================
+class OperationSignal:
+    """无 Qt 环境下的信号 - 与 pyqtSignal 相同的 connect/emit 用法"""
+    
+    def __init__(self):
+        self._slots = []
+    
+    def connect(self, slot):
+        """订阅"""
+        self._slots.append(slot)
+    
+    def emit(self, *args):
+        """通知所有订阅者"""
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class GitOperations:
+    """Git 智能操作 - 不依赖 Qt, 由 GitWorker 线程或命令行模式驱动
+    
+    进度与结果通过 progress / transfer_progress / finished / execute_script /
+    trace_ready 信号对象发出, GitWorker 会将它们替换为对应的 pyqtSignal。
+    """
+    
+    # 默认时限: 整个操作 1 小时, 传输命令连续 3 分钟无输出视为卡住 (0 表示不限)
+    DEFAULT_OPERATION_TIMEOUT = 3600
+    DEFAULT_STALL_TIMEOUT = 180
+    
+    def __init__(self, operation, local_path, remote_url, config):
+        self.progress = OperationSignal()  # (消息, 类型)
+        self.transfer_progress = OperationSignal()  # (百分比, 描述)
+        self.finished = OperationSignal()  # (成功, 消息)
+        self.execute_script = OperationSignal()  # 执行脚本信号
+        self.trace_ready = OperationSignal()  # (OperationTrace) 操作全部结束后发出
+        self.operation = operation
+        self.local_path = local_path
+        self.remote_url = remote_url
+        self.config = config
+        self.backup_path = None
+        self.git = GitRunner(local_path)
+        self.journal = None
+        self.journal_id = None
+        self.trace = OperationTrace(operation, self.git.repo_path)
+        self.git.on_command = self.trace.add_command
+    
+    def run(self):
+        """执行Git操作 (同时写入操作记录与耗时追踪)"""
+        self._apply_timeouts()
+        self._open_journal()
+        self.trace.begin(self.operation, "operation")
+        try:
+            self._run()
+        finally:
+            self.trace.end()
+            self._close_journal()
+        self.trace_ready.emit(self.trace)
+    
+    def _open_journal(self):
+        """打开操作记录, 失败时仅跳过记录"""
+        try:
+            self.journal = OperationJournal.from_config(self.config)
+            if self.journal:
+                self.journal_id = self.journal.begin_operation(self.local_path, self.operation)
+                self.finished.connect(self._journal_finished)
+        except sqlite3.Error:
+            self.journal = None
+    
+    def cancel(self):
+        """取消操作 (可从其他线程调用): 终止当前 git 子进程, 后续命令不再执行"""
+        self.git.cancel()
+    
+    def _apply_timeouts(self):
+        """按配置设置操作时限与卡住检测
+        
+        operation_timeouts 可按操作名单独设置 (如 {"sync": 600}), 否则取
+        operation_timeout; stall_timeout 为传输命令无输出的容忍秒数。
+        """
+        timeout = self.config.get('operation_timeouts', {}).get(
+            self.operation, self.config.get('operation_timeout', self.DEFAULT_OPERATION_TIMEOUT)
+        )
+        if timeout:
+            self.git.deadline = time.monotonic() + timeout
+            self.git.deadline_budget = timeout
+        self.git.stall_timeout = self.config.get('stall_timeout', self.DEFAULT_STALL_TIMEOUT) or None
+    
+    def _interrupted(self, message):
+        """中断后的结果消息, 附带仓库中遗留的未完成状态"""
+        states = self.git.partial_state() if self.git.is_repo() else []
+        if states:
+            message += "\n仓库处于未完成状态:\n" + "\n".join(f"  • {state}" for state in states)
+        return message
+    
+    def _journal_finished(self, success, message):
+        """记录操作结果 (部分操作可能多次发出完成信号, 以第一次为准)"""
+        if self.journal and self.journal_id is not None:
+            try:
+                self.journal.finish_operation(self.journal_id, success, message)
+            except sqlite3.Error:
+                pass
+            self.journal_id = None
+    
+    def _close_journal(self):
+        if not self.journal:
+            return
+        try:
+            if self.journal_id is not None:
+                self.journal.finish_operation(self.journal_id, None, "操作未返回结果")
+            self.journal.prune(self.config.get('journal_keep_days', OperationJournal.DEFAULT_KEEP_DAYS))
+            self.journal.close()
+        except sqlite3.Error:
+            pass
+        self.journal = None
+    
+    def _run(self):
+        try:
+            # 确保仓库目录存在 (命令由 GitRunner 指定目录, 不切换进程工作目录)
+            if not os.path.exists(self.local_path):
+                os.makedirs(self.local_path, exist_ok=True)
+            
+            # 配置Git用户信息
+            self._configure_user()
+            
+            # 执行相应操作
+            operations = {
+                "upload": self._smart_upload,
+                "download": self._smart_download,
+                "sync": self._smart_sync,
+                "overwrite": self._smart_overwrite,
+                "delete": self._smart_delete,
+                "init": self._init_repo,
+                "status": self._check_status,
+                "backup": self._backup,
+                "restore": self._restore_backup,
+                "tune": self._tune_repo,
+                "deepen": self._deepen_history
+            }
+            
+            if self.operation in operations:
+                operations[self.operation]()
+            else:
+                raise Exception(f"未知操作: {self.operation}")
+                
+        except OperationCancelled:
+            self.finished.emit(False, self._interrupted("⏹ 操作已取消"))
+        except OperationTimeout as e:
+            self.finished.emit(False, self._interrupted(f"⏱ {e}"))
+        except Exception as e:
+            self.finished.emit(False, f"操作失败: {str(e)}")
+    
+    def _configure_user(self):
+        """写入仓库级用户名与邮箱 (尚未初始化时忽略失败)"""
+        if self.config.get('username') and self.config.get('email'):
+            self._run_cmd(
+                ["config", "user.name", self.config["username"]],
+                "配置用户名", silent=True
+            )
+            self._run_cmd(
+                ["config", "user.email", self.config["email"]],
+                "配置邮箱", silent=True
+            )
+    
+    def _run_cmd(self, args, description, silent=False):
+        """执行Git命令并发送进度 (args 为 git 之后的参数列表)"""
+        if not silent:
+            self.progress.emit(f"▶ {description}", "info")
+        
+        started = time.time()
+        self.trace.begin(description)
+        try:
+            if args and args[0] in GitRunner.TRANSFER_COMMANDS:
+                # 网络传输: 流式读取进度, 驱动确定进度条
+                result = self.git.stream(
+                    *args,
+                    on_progress=lambda p: self.transfer_progress.emit(p.percent, p.describe())
+                )
+            else:
+                result = self.git.run(*args)
+        except OperationTimeout as e:
+            self._journal_command(args, description, started, subprocess.CompletedProcess(args, None, "", str(e)))
+            raise
+        finally:
+            self.trace.end()
+        self._journal_command(args, description, started, result)
+        
+        if result.returncode != 0 and not silent:
+            error_msg = result.stderr.strip() or result.stdout.strip()
+            if error_msg:
+                raise GitCommandError(f"{description} 失败: {error_msg}", result.returncode)
+        
+        return result.stdout.strip()
+    
+    def _journal_command(self, args, description, started, result):
+        """记录一条命令的耗时、退出码与输出"""
+        if not self.journal or self.journal_id is None:
+            return
+        try:
+            self.journal.record_command(
+                self.journal_id, args, description, started, time.time() - started,
+                result.returncode, result.stderr.strip() or result.stdout.strip()
+            )
+        except sqlite3.Error:
+            pass
+    
+    def _is_git_repo(self):
+        """检查工作目录是否为Git仓库"""
+        return self.git.is_repo()
+    
+    def _init_repo(self, emit_finished=True):
+        """初始化仓库"""
+        self.progress.emit("🔧 正在初始化Git仓库...", "info")
+        
+        if not self._is_git_repo():
+            self._run_cmd(["init"], "初始化Git仓库")
+            self._run_cmd(["remote", "add", "origin", self.remote_url], "添加远程仓库")
+            self._run_cmd(["branch", "-M", "main"], "创建main分支")
+            # 操作开始时仓库尚不存在, 用户信息要在初始化之后才能写入
+            self._configure_user()
+            self.progress.emit("✓ 仓库初始化完成", "success")
+        else:
+            # 检查远程仓库
+            try:
+                current_remote = self._run_cmd(["remote", "get-url", "origin"], "获取远程URL", silent=True)
+                if current_remote != self.remote_url:
+                    self._run_cmd(["remote", "set-url", "origin", self.remote_url], "更新远程仓库URL")
+                    self.progress.emit("✓ 远程仓库已更新", "success")
+                else:
+                    self.progress.emit("✓ 仓库已存在且配置正确", "success")
+            except:
+                self._run_cmd(["remote", "add", "origin", self.remote_url], "添加远程仓库")
+        
+        if emit_finished:
+            self.finished.emit(True, "✓ 仓库初始化完成")
+    
+    def _create_backup(self, prune=True):
+        """创建备份 (增量快照或压缩归档), 随后按保留策略淘汰旧备份"""
+        store = BackupStore(Path(self.local_path).parent / "backups")
+        
+        if self.config.get('backup_format') == "archive":
+            self.progress.emit(f"📦 正在创建压缩归档到: {store.root}", "info")
+            self.backup_path, stats = store.archive(self.local_path)
+            self.progress.emit(
+                f"✓ 归档完成: {self.backup_path.name} - "
+                f"{stats['bytes_in'] / 1024 / 1024:.1f} MB → {stats['bytes_out'] / 1024 / 1024:.1f} MB, "
+                f"耗时 {stats['elapsed']:.1f}s",
+                "success"
+            )
+        else:
+            self.progress.emit(f"📦 正在创建增量备份到: {store.root}", "info")
+            self.backup_path, stats = store.snapshot(
+                self.local_path,
+                progress=lambda s: self.progress.emit(f"  已扫描 {s['files']} 个文件...", "info")
+            )
+            self.progress.emit(
+                f"✓ 备份完成: {self.backup_path.name} - "
+                f"{stats['files']} 个文件, 复制 {stats['copied']} 个 "
+                f"({stats['copied_bytes'] / 1024 / 1024:.1f} MB), "
+                f"复用 {stats['reused']} 个, 耗时 {stats['elapsed']:.1f}s",
+                "success"
+            )
+        
+        # 保留策略
+        if not prune:
+            return self.backup_path
+        removed, freed = store.prune(RetentionPolicy.from_config(self.config))
+        if removed:
+            self.progress.emit(
+                f"🧹 已淘汰 {len(removed)} 个旧备份, 释放 {freed / 1024 / 1024:.1f} MB", "info"
+            )
+        return self.backup_path
+    
+    def _backup(self):
+        """立即备份"""
+        self._create_backup()
+        self.finished.emit(True, f"✓ 备份完成: {self.backup_path.name}")
+    
+    def _restore_backup(self):
+        """恢复到指定快照 (只复制有差异的文件)"""
+        snapshot = Path(self.config['snapshot'])
+        store = BackupStore(Path(self.local_path).parent / "backups")
+        
+        # 先为当前状态做一次备份, 恢复出错时可以回退 (此时不淘汰, 以免删掉要恢复的快照)
+        self.progress.emit("📦 恢复前备份当前状态...", "info")
+        self._create_backup(prune=False)
+        
+        self.progress.emit(f"⏪ 正在恢复到快照: {snapshot.name}", "warning")
+        stats = store.restore(snapshot, self.local_path, delete_extra=self.config.get('delete_extra', False))
+        
+        self.finished.emit(
+            True,
+            f"✓ 恢复完成! 恢复 {stats['restored']} 个文件 "
+            f"({stats['restored_bytes'] / 1024 / 1024:.1f} MB), 删除 {stats['deleted']} 个多余文件"
+        )
+    
+    def _find_main_script(self):
+        """查找主程序脚本"""
+        # 查找可能的主程序文件
+        possible_names = ['main.py', 'app.py', 'run.py', 'start.py', '__main__.py']
+        
+        for name in possible_names:
+            script_path = Path(self.local_path) / name
+            if script_path.exists():
+                return str(script_path)
+        
+        # 如果没有找到,查找第一个.py文件
+        for file in Path(self.local_path).glob("*.py"):
+            if file.name != "__init__.py":
+                return str(file)
+        
+        return None
+    
+    def _check_status(self):
+        """检查仓库状态"""
+        try:
+            # 检查是否是Git仓库
+            if not self._is_git_repo():
+                self.finished.emit(False, "当前目录不是Git仓库")
+                return
+            
+            status = (WorkTreeStatCache.shared(self.local_path).quick_status()
+                      or self.git.status(sample=RepoStatus.SAMPLE))
+            
+            # 分支与上游
+            self.progress.emit(f"当前分支: {status.branch or '(detached)'}", "info")
+            if status.has_upstream:
+                self.progress.emit(
+                    f"上游 {status.upstream}: 领先 {status.ahead}, 落后 {status.behind}", "info"
+                )
+            
+            # 文件状态
+            if status.is_clean:
+                self.progress.emit("工作区干净", "success")
+            else:
+                self.progress.emit(
+                    f"未提交更改: {status.changed} 个文件 "
+                    f"(暂存 {status.staged}, 未暂存 {status.unstaged}, "
+                    f"未跟踪 {status.untracked}, 冲突 {status.conflicted})",
+                    "warning"
+                )
+                for line in status.sample_lines():
+                    self.progress.emit(f"  {line}", "info")
+            
+            # 大工作区尚未调优 (未启用 manyFiles 的索引 v4) 时提示
+            version, files = GitIndex.read_header(os.path.join(self.git.git_dir(), "index"))
+            if files >= self.LARGE_TREE_FILES and version != 4:
+                self.progress.emit(f"💡 仓库包含 {files} 个文件, 建议执行性能调优 (tune)", "warning")
+            
+            self.finished.emit(True, "状态检查完成")
+        except (OperationCancelled, OperationTimeout):
+            raise
+        except Exception as e:
+            self.finished.emit(False, f"状态检查失败: {str(e)}")
+    
+    def _smart_upload(self):
+        """智能上传 - 检测更改并推送"""
+        self.progress.emit("📊 正在分析本地文件变化...", "info")
+        
+        # 确保仓库已初始化
+        if not self._is_git_repo():
+            self._init_repo(emit_finished=False)
+        
+        # 检查是否有变化 (状态刷新确认过且之后没有文件变化时直接复用结果, 不启动 git)
+        status = WorkTreeStatCache.shared(self.local_path).quick_status() or self.git.status()
+        
+        # 分批模式下先续传上次中断时已提交但未推送的批次
+        batch_bytes = int(float(self.config.get('upload_batch_mb', self.DEFAULT_UPLOAD_BATCH_MB) or 0) * 1024 ** 2)
+        resumed = self._resume_push(batch_bytes) if batch_bytes else 0
+        
+        if status.is_clean:
+            if resumed:
+                self.finished.emit(True, f"✓ 上传成功! 已续传 {resumed} 个未推送的分批提交")
+            else:
+                self.finished.emit(True, "✓ 工作区干净,没有需要上传的更改")
+            return
+        
+        # 显示变化统计
+        self.progress.emit(f"检测到 {status.changed} 个文件变化", "info")
+        
+        # 变化总量超过批次上限时分批提交、逐批推送
+        if batch_bytes:
+            batches = self._plan_batches(batch_bytes)
+            if len(batches) > 1:
+                self._batched_upload(batches, batch_bytes)
+                return
+        
+        # 添加所有文件
+        self._run_cmd(["add", "."], "添加文件到暂存区")
+        
+        # 提交更改
+        from datetime import datetime
+        commit_msg = f"Auto sync: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        self._run_cmd(["commit", "-m", commit_msg], "提交更改")
+        
+        # 推送到远程
+        try:
+            self._run_cmd(["push", "origin", "main"], "推送到远程仓库")
+        except:
+            # 如果是第一次推送
+            self._run_cmd(["push", "-u", "origin", "main"], "首次推送到远程仓库")
+        
+        self.finished.emit(True, f"✓ 上传成功! {status.changed} 个文件已同步到远程仓库")
+    
+    # ---------- 分批上传 ----------
+    
+    # 单次推送的数据量上限 (MB), 需在配置中显式开启: 变化总量超过它时拆成多个提交逐批推送,
+    # 避开服务端的单次推送大小限制与传输超时, 中断后已推送的批次不必重传 (0 表示不分批)
+    DEFAULT_UPLOAD_BATCH_MB = 0
+    
+    # 分批提交的标记 (提交信息尾注), 续传只处理带标记的提交, 不会逐个推送普通的本地历史
+    BATCH_TRAILER = "Upload-Batch-Bytes"
+    
+    def _plan_batches(self, batch_bytes):
+        """按文件大小把工作区的全部变化 (含已暂存的) 划分为若干批, 返回 [(路径列表, 字节数), ...]
+        
+        按路径顺序装箱, 同一目录的文件尽量落在同一批; 单个文件超过上限时独占一批。
+        已删除的文件计为 0 字节。
+        """
+        paths = dict.fromkeys(self.git.iter_records(
+            "ls-files", "-z", "--others", "--modified", "--deleted", "--exclude-standard"
+        ))
+        # 已暂存的更改也要参与分批, 否则会被第一批提交一并带走
+        if self._has_commits():
+            paths.update(dict.fromkeys(self.git.iter_records("diff", "--cached", "--name-only", "--no-renames", "-z")))
+        else:
+            paths.update(dict.fromkeys(self.git.iter_records("ls-files", "-z", "--cached")))
+        paths.pop("", None)
+        
+        batches = []
+        current, current_bytes = [], 0
+        for path in sorted(paths):
+            try:
+                size = os.lstat(os.path.join(self.local_path, path)).st_size
+            except OSError:
+                size = 0
+            if current and current_bytes + size > batch_bytes:
+                batches.append((current, current_bytes))
+                current, current_bytes = [], 0
+            current.append(path)
+            current_bytes += size
+        if current:
+            batches.append((current, current_bytes))
+        return batches
+    
+    def _batched_upload(self, batches, batch_bytes):
+        """逐批暂存、提交并推送; 中断后再次上传会先续传未推送的批次, 再处理剩余文件"""
+        total_bytes = sum(size for _, size in batches)
+        total_files = sum(len(paths) for paths, _ in batches)
+        self.progress.emit(
+            f"📦 变化共 {total_bytes / 1024 ** 2:.1f} MB, 按每批 {batch_bytes / 1024 ** 2:.0f} MB "
+            f"分为 {len(batches)} 批上传", "info"
+        )
+        
+        # 已暂存的更改放回工作区, 由各批按路径重新暂存
+        if not self._has_commits():
+            self.git.run("read-tree", "--empty")
+        elif self.git.run("diff", "--cached", "--quiet").returncode != 0:
+            self._run_cmd(["reset", "-q"], "取消暂存", silent=True)
+        
+        # 路径清单写入文件传给 git, 不受命令行长度限制
+        pathspec_file = os.path.join(self.git.git_dir(), "UPLOAD_BATCH_PATHS")
+        stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        pending = []
+        pushed = 0
+        try:
+            for index, (paths, size) in enumerate(batches, 1):
+                if size > batch_bytes:
+                    self.progress.emit(f"⚠ {paths[0]} 单个文件超过批次上限, 单独推送", "warning")
+                # 已提交的批次再加上这一批会超过上限时先推送, 合起来不超过上限的批次一次推送
+                if pending and sum(s for _, s in pending) + size > batch_bytes:
+                    pushed += self._push_runs(pending, batch_bytes)
+                    pending = []
+                label = f"批次 {index}/{len(batches)}"
+                self.progress.emit(f"{label}: {len(paths)} 个文件, {size / 1024 ** 2:.1f} MB", "info")
+                with open(pathspec_file, 'wb') as f:
+                    f.write(b"\0".join(os.fsencode(path) for path in paths))
+                self._run_cmd(
+                    ["--literal-pathspecs", "add", "-A", f"--pathspec-from-file={pathspec_file}",
+                     "--pathspec-file-nul"], f"{label} 添加文件"
+                )
+                self._run_cmd(
+                    ["commit", "-m", f"Auto sync: {stamp} ({label})", "-m", f"{self.BATCH_TRAILER}: {size}"],
+                    f"{label} 提交"
+                )
+                pending.append((self.git.output("rev-parse", "HEAD"), size))
+            pushed += self._push_runs(pending, batch_bytes)
+        except (OperationCancelled, OperationTimeout, GitCommandError):
+            if pushed:
+                self.progress.emit(
+                    f"已推送 {pushed}/{len(batches)} 批; 再次上传会从最后一个推送成功的批次继续", "warning"
+                )
+            raise
+        finally:
+            try:
+                os.remove(pathspec_file)
+            except OSError:
+                pass
+        
+        self.finished.emit(
+            True, f"✓ 上传成功! {total_files} 个文件 ({total_bytes / 1024 ** 2:.1f} MB) "
+                  f"已分 {len(batches)} 批同步到远程仓库"
+        )
+    
+    def _unpushed_batches(self):
+        """HEAD 起连续的、尚未推送的分批提交, 从旧到新返回 [(提交, 字节数), ...]
+        
+        以 origin/main 为已推送的位置, 沿第一父提交向前, 遇到不带分批标记的提交即停止,
+        普通的本地历史不会被遍历。
+        """
+        if not self._has_commits():
+            return []
+        base = ["^refs/remotes/origin/main"] if self._tracked_head() else []
+        batches = []
+        records = self.git.iter_records(
+            "log", "--first-parent", f"--format=%H %(trailers:key={self.BATCH_TRAILER},valueonly,separator=%x2C)",
+            "HEAD", *base, separator=b"\n"
+        )
+        try:
+            for record in records:
+                commit, _, size = record.partition(" ")
+                if not size.strip().isdigit():
+                    break
+                batches.append((commit, int(size)))
+        finally:
+            records.close()
+        batches.reverse()
+        return batches
+    
+    def _resume_push(self, batch_bytes):
+        """推送上次中断时遗留的分批提交, 返回推送的批次数"""
+        batches = self._unpushed_batches()
+        if not batches:
+            return 0
+        self.progress.emit(f"🔁 发现 {len(batches)} 个未推送的分批提交, 从上次中断处续传", "info")
+        return self._push_runs(batches, batch_bytes)
+    
+    def _push_runs(self, commits, batch_bytes):
+        """把 [(提交, 字节数), ...] 按上限合并成若干段, 每段一次推送到远程 main, 返回推送的提交数
+        
+        每次推送都是快进; 推送成功后 origin/main 随之更新, 作为续传的断点。
+        """
+        runs, run, run_bytes = [], [], 0
+        for commit, size in commits:
+            if run and run_bytes + size > batch_bytes:
+                runs.append(run)
+                run, run_bytes = [], 0
+            run.append(commit)
+            run_bytes += size
+        if run:
+            runs.append(run)
+        
+        head = self.git.output("rev-parse", "HEAD")
+        for index, run in enumerate(runs, 1):
+            description = f"推送 {len(run)} 个分批提交" + (f" ({index}/{len(runs)})" if len(runs) > 1 else "")
+            if run[-1] == head:
+                # 推送分支本身, 首次推送时顺带设置上游
+                args = ["push", "origin", "main"] if self._tracked_head() else ["push", "-u", "origin", "main"]
+            else:
+                args = ["push", "origin", f"{run[-1]}:refs/heads/main"]
+            self._run_cmd(args, description)
+        return len(commits)
+    
+    def _smart_download(self):
+        """智能下载 - 拉取远程更新"""
+        self.progress.emit("🔍 正在检查远程仓库更新...", "info")
+        
+        if not self._is_git_repo():
+            if not self.remote_url:
+                self.finished.emit(False, "本地仓库未初始化,请先初始化仓库")
+            elif os.listdir(self.local_path):
+                self.finished.emit(False, "本地目录不是Git仓库且不为空, 无法直接克隆; 请选择空目录或先初始化仓库")
+            else:
+                self._bootstrap_clone()
+            return
+        
+        # 只访问一次网络, 之后的比较与合并都在本地完成
+        if not self._fetch_main():
+            self.finished.emit(False, "下载失败: 远程仓库没有 main 分支")
+            return
+        
+        ahead, behind = self._ahead_behind()
+        if behind == 0:
+            self.finished.emit(True, "✓ 本地已是最新版本")
+            return
+        
+        self.progress.emit(f"发现 {behind} 个远程提交", "info")
+        self._integrate(ahead, behind, rebase=False)
+        self.finished.emit(True, f"✓ 下载成功! 已更新 {behind} 个提交")
+    
+    # ---------- 首次下载 ----------
+    
+    # 默认完整克隆; 选择部分克隆时只下载检出所需的文件内容, 历史版本的文件
+    # 在用到时 (log -p / blame / 检出旧版本) 再从远程按需获取, 需要网络
+    DEFAULT_CLONE_FILTER = ""
+    BLOBLESS_FILTER = "blob:none"
+    
+    def _bootstrap_clone(self):
+        """首次下载 - 按配置进行部分克隆 / 浅克隆 / 稀疏检出, 只获取本机需要的内容
+        
+        clone_filter: 部分克隆过滤器 (空串表示完整克隆), clone_depth: 只获取最近
+        N 个提交 (0 表示完整历史, 之后可用 deepen 操作加深), sparse_paths: 只检出的目录。
+        """
+        clone_filter = self.config.get('clone_filter', self.DEFAULT_CLONE_FILTER)
+        depth = int(self.config.get('clone_depth') or 0)
+        sparse_paths = [path.strip().strip("/") for path in self.config.get('sparse_paths') or [] if path.strip("/ ")]
+        
+        args = ["clone", "--origin", "origin"]
+        branch = self._remote_clone_branch()
+        if branch == "main":
+            args += ["--branch", "main"]
+        else:
+            self.progress.emit(f"远程没有 main 分支, 检出远程默认分支 {branch or '(空仓库)'}", "warning")
+        modes = []
+        if clone_filter:
+            args.append(f"--filter={clone_filter}")
+            modes.append(f"部分克隆 {clone_filter}")
+        if depth:
+            args += ["--depth", str(depth)]
+            modes.append(f"最近 {depth} 个提交")
+        if sparse_paths:
+            args.append("--sparse")
+            modes.append(f"稀疏检出 {', '.join(sparse_paths)}")
+        mode = "; ".join(modes) or "完整克隆"
+        
+        self.progress.emit(f"📦 本地尚无仓库, 首次下载: {mode}", "info")
+        self._run_cmd(args + ["--", self.remote_url, "."], "克隆远程仓库")
+        if sparse_paths:
+            self._run_cmd(["sparse-checkout", "set", "--cone", *sparse_paths], "检出所选目录")
+        self._configure_user()
+        
+        self.finished.emit(
+            True, f"✓ 下载完成! 已克隆远程仓库 ({mode}), 本地 .git 占用 {self._dir_size(self.git.git_dir()) / 1024 ** 2:.1f} MB"
+        )
+    
+    def _remote_clone_branch(self):
+        """首次克隆检出的分支: 远程有 main 时用 main, 否则为远程 HEAD 指向的默认分支 (空仓库为 None)"""
+        output = self._run_cmd(
+            ["ls-remote", "--symref", self.remote_url, "HEAD", "refs/heads/main"], "检查远程分支", silent=True
+        )
+        default = None
+        for line in output.splitlines():
+            target, _, ref = line.partition("\t")
+            if ref == "refs/heads/main":
+                return "main"
+            if target.startswith("ref: refs/heads/") and ref == "HEAD":
+                default = target[len("ref: refs/heads/"):]
+        return default
+    
+    @staticmethod
+    def _dir_size(path):
+        """目录下所有文件的总大小 (字节)"""
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+    
+    def _deepen_history(self):
+        """加深浅克隆的历史: deepen > 0 时多获取 N 个提交, 否则获取完整历史"""
+        if not self._is_git_repo():
+            self.finished.emit(False, "本地仓库未初始化,请先初始化仓库")
+            return
+        shallow_file = os.path.join(self.git.git_dir(), "shallow")
+        if not os.path.exists(shallow_file):
+            self.finished.emit(True, "✓ 本地已有完整历史, 无需加深")
+            return
+        
+        depth = int(self.config.get('deepen') or 0)
+        if depth > 0:
+            self._run_cmd(["fetch", f"--deepen={depth}", "origin"], f"加深 {depth} 个提交")
+        else:
+            self._run_cmd(["fetch", "--unshallow", "origin"], "获取完整历史")
+        
+        count = self.git.output("rev-list", "--count", "HEAD")
+        suffix = "仍为浅克隆" if os.path.exists(shallow_file) else "已是完整历史"
+        self.finished.emit(True, f"✓ 历史已加深, 本地共有 {count} 个提交 ({suffix})")
+    
+    def _smart_sync(self):
+        """智能同步 - 双向同步"""
+        self.progress.emit("🔄 正在执行双向智能同步...", "info")
+        
+        if not self._is_git_repo():
+            self.finished.emit(False, "本地仓库未初始化,请先初始化仓库")
+            return
+        
+        # 1. 保存本地更改
+        has_local_changes = self.git.has_changes()
+        
+        if has_local_changes:
+            self.progress.emit("保存本地更改...", "info")
+            self._run_cmd(["add", "."], "添加本地更改")
+            from datetime import datetime
+            commit_msg = f"Sync: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            self._run_cmd(["commit", "-m", commit_msg], "提交本地更改")
+        
+        # 2. 获取远程更新 (唯一一次拉取), 在本地合并
+        self.progress.emit("拉取远程更新...", "info")
+        remote_exists = self._fetch_main()
+        if remote_exists:
+            ahead, behind = self._ahead_behind()
+            if behind:
+                self._integrate(ahead, behind, rebase=True)
+                ahead, behind = self._ahead_behind()
+        else:
+            ahead = 1 if self._has_commits() else 0
+        
+        # 3. 推送到远程 (没有需要推送的提交时不访问网络)
+        if ahead == 0:
+            self.finished.emit(True, "✓ 同步完成! 本地与远程已保持一致")
+            return
+        
+        self.progress.emit("推送到远程仓库...", "info")
+        if remote_exists:
+            self._run_cmd(["push", "origin", "main"], "推送更新")
+        else:
+            self._run_cmd(["push", "-u", "origin", "main"], "推送更新")
+        
+        self.finished.emit(True, "✓ 同步完成! 本地与远程已保持一致")
+    
+    # ---------- 单次获取的同步流程 ----------
+    
+    def _fetch_main(self):
+        """让 origin/main 与远程一致, 远程没有 main 分支时返回 False
+        
+        先用 ls-remote 探测远程 main 的提交, 与上次获取时记录在 origin/main 的
+        提交相同就跳过 fetch, 空闲仓库只需一次轻量的网络往返。
+        """
+        remote_head = self._probe_remote_head()
+        tracked_head = self._tracked_head()
+        
+        if remote_head is None:
+            # 远程分支已删除时清理过期的远程跟踪分支
+            if tracked_head:
+                self.git.run("update-ref", "-d", "refs/remotes/origin/main")
+            return False
+        
+        if remote_head == tracked_head:
+            self.progress.emit("远程没有新的提交, 跳过获取", "info")
+            return True
+        
+        self._run_cmd(["fetch", "--prune", "origin"], "获取远程更新")
+        return self._tracked_head() is not None
+    
+    def _probe_remote_head(self):
+        """ls-remote 查询远程 main 分支当前指向的提交, 没有该分支时返回 None"""
+        output = self._run_cmd(["ls-remote", "origin", "refs/heads/main"], "检查远程变化")
+        for line in output.splitlines():
+            sha, _, ref = line.partition("\t")
+            if ref == "refs/heads/main":
+                return sha
+        return None
+    
+    def _tracked_head(self):
+        """上次获取时记录的远程 main 提交 (origin/main), 不存在时返回 None"""
+        result = self.git.run("rev-parse", "--verify", "-q", "refs/remotes/origin/main")
+        return result.stdout.strip() if result.returncode == 0 else None
+    
+    def _has_commits(self):
+        """当前分支是否已有提交"""
+        return self.git.run("rev-parse", "--verify", "-q", "HEAD").returncode == 0
+    
+    def _ahead_behind(self):
+        """本地计算 (领先, 落后) 提交数"""
+        if not self._has_commits():
+            behind = self.git.output("rev-list", "--count", "origin/main")
+            return 0, int(behind or 0)
+        counts = self.git.output("rev-list", "--left-right", "--count", "HEAD...origin/main").split()
+        return int(counts[0]), int(counts[1])
+    
+    def _integrate(self, ahead, behind, rebase):
+        """把已获取的 origin/main 合入当前分支: 能快进则快进, 否则变基 (失败回退为合并) 或合并"""
+        if ahead == 0:
+            self._run_cmd(["merge", "--ff-only", "origin/main"], "快进到远程版本")
+            return
+        
+        self.progress.emit(f"本地领先 {ahead} 个提交, 落后 {behind} 个提交", "info")
+        if rebase:
+            try:
+                self._run_cmd(["rebase", "origin/main"], "变基到远程版本")
+                return
+            except GitCommandError:
+                # 变基冲突时放弃变基, 改用合并
+                self.git.run("rebase", "--abort")
+                self.progress.emit("变基冲突, 改用合并", "warning")
+        
+        try:
+            self._run_cmd(["merge", "--no-edit", "origin/main"], "合并远程更改")
+        except GitCommandError:
+            self.git.run("merge", "--abort")
+            raise GitCommandError("本地与远程修改存在冲突, 请手动解决后再试")
+    
+    def _smart_overwrite(self):
+        """强制覆盖远程"""
+        self.progress.emit("⚠ 正在强制覆盖远程仓库...", "warning")
+        
+        if not self._is_git_repo():
+            self._init_repo(emit_finished=False)
+        
+        # 添加并提交所有文件
+        self._run_cmd(["add", "."], "添加所有文件")
+        from datetime import datetime
+        commit_msg = f"Force overwrite: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        
+        try:
+            self._run_cmd(["commit", "-m", commit_msg], "提交更改")
+        except:
+            pass  # 可能没有更改
+        
+        # 强制推送
+        self._run_cmd(["push", "-f", "origin", "main"], "强制推送")
+        
+        self.finished.emit(True, "✓ 覆盖完成! 远程仓库已被本地版本替换")
+    
+    def _smart_delete(self):
+        """删除远程所有文件"""
+        self.progress.emit("🗑 正在清理远程仓库...", "warning")
+        
+        if not self._is_git_repo():
+            self.finished.emit(False, "本地仓库未初始化")
+            return
+        
+        # 删除所有文件并提交
+        self._run_cmd(["rm", "-rf", "."], "删除所有文件")
+        self._run_cmd(["commit", "-m", "Clean repository"], "提交删除")
+        self._run_cmd(["push", "origin", "main"], "推送删除")
+        
+        self.finished.emit(True, "✓ 删除完成! 远程文件已清理")
+    
+    # ---------- 性能调优 ----------
+    
+    # 达到任一阈值视为大仓库 (文件数 / 对象数 / 打包大小 MB)
+    LARGE_TREE_FILES = 10_000
+    LARGE_HISTORY_OBJECTS = 200_000
+    LARGE_PACK_MB = 500
+    
+    # (配置项, 值, 说明); feature.manyFiles 会启用索引 v4 与 untracked cache
+    TUNE_SETTINGS = (
+        ("feature.manyFiles", "true", "大量文件优化"),
+        ("core.untrackedCache", "true", "缓存未跟踪文件扫描结果"),
+        ("core.commitGraph", "true", "使用 commit-graph 加速历史遍历"),
+        ("fetch.writeCommitGraph", "true", "获取后增量更新 commit-graph"),
+        ("core.multiPackIndex", "true", "多包索引"),
+    )
+    
+    def _repo_size(self):
+        """(已跟踪文件数, 对象数, 打包大小 MB) - 文件数直接读取索引文件头"""
+        _, files = GitIndex.read_header(os.path.join(self.git.git_dir(), "index"))
+        counts = {}
+        for line in self.git.output("count-objects", "-v").splitlines():
+            key, _, value = line.partition(":")
+            if value.strip().isdigit():
+                counts[key.strip()] = int(value)
+        return files, counts.get('count', 0) + counts.get('in-pack', 0), counts.get('size-pack', 0) / 1024
+    
+    def _is_large_repo(self, files, objects, pack_mb):
+        return (files >= self.LARGE_TREE_FILES or objects >= self.LARGE_HISTORY_OBJECTS
+                or pack_mb >= self.LARGE_PACK_MB)
+    
+    def _timed(self, *args):
+        """执行一次命令并返回耗时 (毫秒), 失败时返回 None"""
+        started = time.perf_counter()
+        result = self.git.run(*args)
+        return (time.perf_counter() - started) * 1000 if result.returncode == 0 else None
+    
+    # 调优前后对比的本地命令 (名称, 参数); 均不访问网络
+    TUNE_TIMINGS = (
+        ("git status", ("status", "--porcelain")),
+        ("git rev-list --count", ("rev-list", "--count", "HEAD")),
+        ("git for-each-ref", ("for-each-ref", "--format=%(refname)")),
+    )
+    
+    def _measure_timings(self, has_remote):
+        """本地命令的耗时 (各取第二次, 即缓存预热后), 返回 {名称: 毫秒}
+        
+        fetch --dry-run 仍会与远程协商并下载数据, 在大仓库上代价最高,
+        只有配置 tune_measure_fetch 时才测量。
+        """
+        timings = {}
+        for name, args in self.TUNE_TIMINGS:
+            if args[0] == "rev-list" and not self._has_commits():
+                continue
+            self._timed(*args)
+            timings[name] = self._timed(*args)
+        if has_remote and self.config.get('tune_measure_fetch'):
+            timings["git fetch (协商)"] = self._timed("fetch", "--dry-run", "--quiet", "origin")
+        return timings
+    
+    def _tune_step(self, args, description):
+        """执行一项调优, 失败时给出警告并继续其余各项"""
+        try:
+            self._run_cmd(args, description)
+            return True
+        except (OperationCancelled, OperationTimeout):
+            raise
+        except GitCommandError as e:
+            self.progress.emit(f"⚠ {e}", "warning")
+            return False
+    
+    def _fsmonitor_supported(self):
+        """内置 fsmonitor 守护进程需要 git 2.36+ 且仅支持 Windows 与 macOS"""
+        result = self.git.run("fsmonitor--daemon", "status")
+        output = (result.stderr + result.stdout).lower()
+        return "not supported" not in output and "not a git command" not in output
+    
+    def _schedule_maintenance(self):
+        """登记后台 git maintenance 计划任务; 系统没有可用的计划程序时退回为 git 命令后自动维护"""
+        if self._tune_step(["maintenance", "start"], "登记后台维护计划任务"):
+            return "系统计划任务 (每小时预取与提交图, 每日增量打包)"
+        self._tune_step(["config", "maintenance.strategy", "incremental"], "设置增量维护策略")
+        self._tune_step(["config", "maintenance.auto", "true"], "启用命令后自动维护")
+        return "命令后自动维护 (未找到系统计划程序)"
+    
+    def _object_layout(self):
+        """(共享仓库目录, 对象 ID 字节数) - 链接工作树与子模块的对象库位于共享目录, SHA-256 仓库为 32 字节"""
+        lines = self.git.output("rev-parse", "--git-common-dir", "--show-object-format").splitlines()
+        common_dir = os.path.normpath(os.path.join(self.git.repo_path, lines[0].strip()))
+        hash_size = 32 if len(lines) > 1 and lines[1].strip() == "sha256" else 20
+        return common_dir, hash_size
+    
+    def _verify_tuning(self, fsmonitor):
+        """读回配置与生成的文件, 返回 (项目, 是否生效) 列表"""
+        checks = []
+        for key, value, description in self.TUNE_SETTINGS:
+            result = self.git.run("config", "--get", key)
+            checks.append((f"{description} ({key})", result.stdout.strip() == value))
+        
+        common_dir, hash_size = self._object_layout()
+        try:
+            # 索引属于各自的工作树, 在 git_dir 而不是共享目录中
+            index = GitIndex.read(os.path.join(self.git.git_dir(), "index"), hash_size)
+            checks.append(("索引版本 4", index.version == 4))
+            checks.append(("索引中的 untracked cache", "UNTR" in index.extensions))
+        except (OSError, IndexFormatError):
+            checks.append(("索引可读取", False))
+        
+        objects = os.path.join(common_dir, "objects")
+        checks.append(("commit-graph 文件", any(
+            os.path.exists(os.path.join(objects, "info", name)) for name in ("commit-graph", "commit-graphs")
+        )))
+        pack_dir = os.path.join(objects, "pack")
+        if os.path.isdir(pack_dir) and any(name.endswith(".pack") for name in os.listdir(pack_dir)):
+            checks.append(("multi-pack-index 文件", os.path.exists(os.path.join(objects, "pack", "multi-pack-index"))))
+        if fsmonitor:
+            result = self.git.run("fsmonitor--daemon", "status")
+            checks.append(("fsmonitor 守护进程", result.returncode == 0))
+        return checks
+    
+    def _tune_repo(self):
+        """大仓库性能调优 - 启用并验证 git 的性能特性, 登记后台维护, 报告前后耗时"""
+        self.progress.emit("🚀 正在分析仓库规模...", "info")
+        if not self._is_git_repo():
+            self.finished.emit(False, "当前目录不是Git仓库")
+            return
+        
+        files, objects, pack_mb = self._repo_size()
+        size = f"{files} 个文件, {objects} 个对象, 打包 {pack_mb:.0f} MB"
+        self.progress.emit(f"仓库规模: {size}", "info")
+        if not self._is_large_repo(files, objects, pack_mb) and not self.config.get('tune_force'):
+            self.finished.emit(True, f"✓ 仓库规模较小 ({size}), 无需调优")
+            return
+        
+        has_remote = self.git.run("remote", "get-url", "origin").returncode == 0
+        timings_before = self._measure_timings(has_remote)
+        
+        # 1. 配置项
+        for key, value, description in self.TUNE_SETTINGS:
+            self._tune_step(["config", key, value], f"{description} ({key})")
+        fsmonitor = self._fsmonitor_supported()
+        if fsmonitor:
+            self._tune_step(["config", "core.fsmonitor", "true"], "内置文件系统监视 (core.fsmonitor)")
+        else:
+            self.progress.emit("当前平台或 git 版本不支持内置 fsmonitor, 已跳过", "info")
+        
+        # 2. 立即生效: 改写索引, 生成提交图与多包索引
+        self._tune_step(["update-index", "--index-version", "4"], "索引升级到版本 4")
+        self._tune_step(["update-index", "--untracked-cache"], "启用 untracked cache")
+        if self._has_commits():
+            self._tune_step(["commit-graph", "write", "--reachable", "--changed-paths"], "生成 commit-graph")
+        self._tune_step(["multi-pack-index", "write"], "生成 multi-pack-index")
+        if fsmonitor:
+            self._tune_step(["fsmonitor--daemon", "start"], "启动 fsmonitor 守护进程")
+        
+        # 3. 后台维护
+        maintenance = self._schedule_maintenance()
+        
+        # 4. 验证与前后对比 (预热一次以填充 untracked cache 与 fsmonitor 状态)
+        timings_after = self._measure_timings(has_remote)
+        checks = self._verify_tuning(fsmonitor)
+        for name, ok in checks:
+            self.progress.emit(f"{'✓' if ok else '✗'} {name}", "success" if ok else "warning")
+        
+        def change(before, after):
+            if before is None or after is None:
+                return "无法测量"
+            return f"{before:.0f}ms → {after:.0f}ms"
+        
+        lines = [f"{name}: {change(before, timings_after.get(name))}" for name, before in timings_before.items()]
+        lines.append(f"后台维护: {maintenance}")
+        passed = sum(1 for _, ok in checks if ok)
+        self.finished.emit(
+            passed == len(checks),
+            f"{'✓' if passed == len(checks) else '⚠'} 调优完成, {passed}/{len(checks)} 项已生效\n" + "\n".join(lines)
+        )
+
+
+# ================================
+# 自动同步调度
+# ================================
+class AutoSyncPolicy:
+    """自动同步调度策略 - 按仓库间隔或本地改动静默后触发, 失败指数退避
+    
+    只负责决定"哪个仓库何时执行", 不执行任何操作; 时间均为 time.monotonic() 秒。
+    首次执行时间在一个间隔内随机分散, 退避时长带随机抖动, 避免大量仓库同时同步。
+    """
+    
+    DEFAULT_INTERVAL = 15 * 60
+    SETTLE_SECONDS = 30          # 本地改动静默多久后触发
+    BACKOFF_BASE = 60            # 首次失败后的重试等待
+    BACKOFF_MAX = 60 * 60        # 最长重试等待
+    CHANGE_GRACE = 2.0           # 操作结束后的短时间内忽略文件变化 (多为操作自身写入)
+    
+    def __init__(self, rng=None):
+        import random
+        self.rng = rng or random.Random()
+        self.repos = {}  # 本地路径 -> 调度状态
+    
+    def configure(self, repos, now):
+        """更新仓库列表: [{'local_path', 'remote_url', 'interval', 'operation'}], 已有仓库保留调度状态"""
+        current = {}
+        for repo in repos:
+            path = os.path.abspath(repo['local_path'])
+            interval = max(60, int(repo.get('interval') or self.DEFAULT_INTERVAL))
+            state = self.repos.get(path) or {
+                'next_due': now + interval * self.rng.random(),
+                'failures': 0,
+                'retry_at': 0.0,
+                'changed_at': None,
+                'running': False,
+                'finished_at': 0.0
+            }
+            state.update(
+                local_path=path,
+                remote_url=repo.get('remote_url', ''),
+                interval=interval,
+                operation=repo.get('operation') or "sync"
+            )
+            current[path] = state
+        self.repos = current
+    
+    def mark_changed(self, local_path, now):
+        """记录本地文件变化, 静默 SETTLE_SECONDS 后触发"""
+        state = self.repos.get(os.path.abspath(local_path))
+        if state is None or state['running'] or now - state['finished_at'] < self.CHANGE_GRACE:
+            return
+        state['changed_at'] = now
+    
+    def _ready_at(self, state):
+        """该仓库最早可执行的时刻"""
+        ready = state['next_due']
+        if state['changed_at'] is not None:
+            ready = min(ready, state['changed_at'] + self.SETTLE_SECONDS)
+        return max(ready, state['retry_at'])
+    
+    def due(self, now, limit):
+        """取出至多 limit 个到期仓库 (等待最久的优先), 并标记为执行中"""
+        ready = sorted(
+            (self._ready_at(state), path) for path, state in self.repos.items()
+            if not state['running'] and self._ready_at(state) <= now
+        )
+        selected = [self.repos[path] for _, path in ready[:max(0, limit)]]
+        for state in selected:
+            state['running'] = True
+            state['changed_at'] = None
+        return selected
+    
+    def next_wakeup(self, now):
+        """距离下一个仓库到期的秒数, 没有待调度仓库时返回 None"""
+        times = [self._ready_at(state) for state in self.repos.values() if not state['running']]
+        return max(0.0, min(times) - now) if times else None
+    
+    def defer(self, local_path, now, delay):
+        """暂不执行, delay 秒后再到期 (不计为失败)"""
+        state = self.repos.get(os.path.abspath(local_path))
+        if state is not None:
+            state['running'] = False
+            state['next_due'] = now + delay
+    
+    def finished(self, local_path, success, now):
+        """记录执行结果, 返回失败时的重试等待秒数 (成功返回 0)"""
+        state = self.repos.get(os.path.abspath(local_path))
+        if state is None:
+            return 0
+        state['running'] = False
+        state['finished_at'] = now
+        state['next_due'] = now + state['interval']
+        if success:
+            state['failures'] = 0
+            state['retry_at'] = 0.0
+            return 0
+        
+        # 指数退避 + 抖动: 等待时间在 [d/2, d] 之间随机
+        state['failures'] += 1
+        delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (state['failures'] - 1))
+        delay = delay / 2 + self.rng.random() * delay / 2
+        state['retry_at'] = now + delay
+        return delay
+
+
+# ================================
+# 基准测试
+# ================================
+class BenchmarkSuite:
+    """离线基准测试 - 以本地裸仓库充当远程, 在合成工作区上计时各项操作
+    
+    每次测量在 fork 出的子进程中执行, 以便单独统计该操作的 git 子进程数、
+    峰值内存 (RSS) 与写入字节数; 不支持 fork 的平台退化为进程内执行,
+    此时内存与写入量为累计值。结果写入 JSON 文件, 可与基线比较。
+    
+    git 子进程的峰值 RSS 包含 exec 之前从解释器继承的内存, 只有高于
+    解释器自身的 RSS 时才反映 git 的真实占用。
+    """
+    
+    RESULTS_DIR = Path.home() / ".github_manager_bench"
+    
+    # 负载: 说明, 默认测量的操作 (未跟踪文件负载只测不会改变文件状态的操作)
+    WORKLOADS = {
+        "small_files": ("大量小文件", ("status", "backup", "upload", "download", "sync")),
+        "large_files": ("少量大文件", ("status", "backup", "upload", "download", "sync")),
+        "deep_history": ("深提交历史", ("status", "backup", "upload", "download", "sync")),
+        "untracked": ("大量未跟踪文件", ("status", "backup")),
+    }
+    
+    # scale = 1 时的负载规模
+    SMALL_FILES = 5000
+    LARGE_FILES = 3
+    LARGE_FILE_BYTES = 64 * 1024 * 1024
+    HISTORY_COMMITS = 3000
+    UNTRACKED_FILES = 10000
+    MUTATED_FILES = 50
+    
+    IDENTITY = {'username': "Bench", 'email': "bench@example.invalid", 'journal_enabled': False}
+    
+    def __init__(self, scale=1.0, repeat=3, seed=42, log=print):
+        self.scale = scale
+        self.repeat = max(1, repeat)
+        self.seed = seed
+        self.log = log
+        self.results = []
+    
+    def _count(self, value):
+        return max(1, int(value * self.scale))
+    
+    @staticmethod
+    def _git(cwd, *args, input=None):
+        """准备负载用的 git 调用, 失败时抛出 GitCommandError"""
+        result = subprocess.run(
+            ["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.invalid", *args],
+            cwd=cwd, input=input, capture_output=True
+        )
+        if result.returncode != 0:
+            raise GitCommandError(
+                f"git {' '.join(args)} 失败: {result.stderr.decode('utf-8', 'ignore').strip()}",
+                result.returncode
+            )
+        return result.stdout
+    
+    # ---------- 合成负载 ----------
+    
+    def _write_small_files(self, root, rng, count, prefix="src"):
+        for i in range(count):
+            path = root / prefix / f"d{i % 50:02d}" / f"d{i % 7}" / f"file_{i:06d}.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(rng.randbytes(rng.randint(256, 2048)).hex().encode())
+    
+    def _fast_import_history(self, work, rng, commits):
+        """用 git fast-import 一次性生成深历史 (逐次 commit 太慢)"""
+        stream = []
+        for i in range(commits):
+            content = f"revision {i}\n{rng.random()}\n".encode()
+            message = f"commit {i}".encode()
+            stream.append(b"commit refs/heads/main\n")
+            stream.append(f"mark :{i + 1}\ncommitter Bench <bench@example.invalid> {1_600_000_000 + i * 60} +0000\n".encode())
+            stream.append(f"data {len(message)}\n".encode() + message + b"\n")
+            if i:
+                stream.append(f"from :{i}\n".encode())
+            stream.append(f"M 644 inline src/module_{i % 200:03d}.py\ndata {len(content)}\n".encode() + content + b"\n")
+        self._git(work, "fast-import", "--quiet", input=b"".join(stream))
+        self._git(work, "reset", "--hard", "main")
+    
+    def prepare(self, workload, root):
+        """生成负载, 返回 (工作仓库, 第二个克隆, 远程URL)"""
+        import random
+        rng = random.Random(self.seed)
+        remote = root / "remote.git"
+        work = root / "work"
+        mirror = root / "mirror"
+        self._git(root, "init", "--bare", "-q", "-b", "main", str(remote))
+        self._git(root, "init", "-q", "-b", "main", str(work))
+        
+        if workload == "small_files":
+            self._write_small_files(work, rng, self._count(self.SMALL_FILES))
+        elif workload == "large_files":
+            self._write_small_files(work, rng, 20)
+            for i in range(self.LARGE_FILES):
+                (work / f"blob_{i}.bin").write_bytes(rng.randbytes(self._count(self.LARGE_FILE_BYTES)))
+        elif workload == "deep_history":
+            self._fast_import_history(work, rng, self._count(self.HISTORY_COMMITS))
+        elif workload == "untracked":
+            self._write_small_files(work, rng, self._count(self.UNTRACKED_FILES) // 10)
+        else:
+            raise ValueError(f"未知负载: {workload}")
+        
+        if workload != "deep_history":
+            self._git(work, "add", "-A")
+            self._git(work, "commit", "-q", "-m", "initial")
+        self._git(work, "remote", "add", "origin", str(remote))
+        self._git(work, "push", "-q", "origin", "main")
+        self._git(root, "clone", "-q", str(remote), str(mirror))
+        
+        if workload == "untracked":
+            self._write_small_files(work, rng, self._count(self.UNTRACKED_FILES), prefix="scratch")
+        return work, mirror, str(remote)
+    
+    def _mutate(self, repo, round_no):
+        """修改若干已跟踪文件, 为上传/同步准备变化"""
+        files = self._git(repo, "ls-files", "-z").split(b"\0")
+        files = [f for f in files if f and not f.endswith(b".bin")][:self.MUTATED_FILES] or [b"bench.txt"]
+        for name in files:
+            path = repo / os.fsdecode(name)
+            with open(path, 'ab') as f:
+                f.write(f"\n# bench round {round_no} {repo.name}\n".encode())
+    
+    # ---------- 测量 ----------
+    
+    @staticmethod
+    def _measure(operation, local_path, remote_url, config):
+        """执行一次操作并统计指标 (在子进程中调用时各项为该操作独占)"""
+        try:
+            import resource
+        except ImportError:
+            resource = None
+        
+        def written():
+            try:
+                with open("/proc/self/io") as f:
+                    # wchar 含已回收子进程的写入量
+                    return int(next(line for line in f if line.startswith("wchar:")).split()[1])
+            except (OSError, StopIteration, ValueError):
+                return None
+        
+        written_before = written()
+        started = time.perf_counter()
+        traces = []
+        success, message = run_operation(operation, local_path, remote_url, config, on_trace=traces.append)
+        wall = time.perf_counter() - started
+        written_after = written()
+        
+        trace = traces[0] if traces else None
+        commands = [e for e in trace.events if e['cat'] == "git"] if trace else []
+        result = {
+            'success': success,
+            'message': message,
+            'wall_s': wall,
+            'subprocesses': len(commands),
+            'git_cpu_s': sum(e['args']['cpu_user_ms'] + e['args']['cpu_system_ms'] for e in commands) / 1000,
+            'steps': [[name, seconds] for name, seconds, _, _ in trace.breakdown()] if trace else [],
+            'bytes_written': None if written_before is None or written_after is None
+            else written_after - written_before,
+            'peak_rss_kb': None,
+            'peak_rss_git_kb': None
+        }
+        if resource:
+            # Linux 下 ru_maxrss 单位为 KB
+            result['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            result['peak_rss_git_kb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        return result
+    
+    @staticmethod
+    def _measure_in_child(conn, operation, local_path, remote_url, config):
+        try:
+            conn.send(BenchmarkSuite._measure(operation, local_path, remote_url, config))
+        except Exception as e:
+            conn.send({'success': False, 'message': f"基准测试子进程异常: {e}"})
+        finally:
+            conn.close()
+    
+    def measure(self, operation, local_path, remote_url):
+        """隔离执行一次测量"""
+        import multiprocessing
+        config = dict(self.IDENTITY)
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return self._measure(operation, str(local_path), remote_url, config)
+        
+        context = multiprocessing.get_context("fork")
+        parent_conn, child_conn = context.Pipe(duplex=False)
+        process = context.Process(
+            target=self._measure_in_child,
+            args=(child_conn, operation, str(local_path), remote_url, config)
+        )
+        process.start()
+        child_conn.close()
+        try:
+            result = parent_conn.recv()
+        except EOFError:
+            result = {'success': False, 'message': "基准测试子进程意外退出"}
+        process.join()
+        return result
+    
+    def run_workload(self, workload, operations=None):
+        """生成负载并按轮次测量各操作"""
+        import tempfile
+        description, default_ops = self.WORKLOADS[workload]
+        operations = operations or default_ops
+        
+        with tempfile.TemporaryDirectory(prefix=f"ghm_bench_{workload}_") as tmp:
+            root = Path(tmp)
+            started = time.perf_counter()
+            work, mirror, remote = self.prepare(workload, root)
+            self.log(f"📦 {workload} ({description}) 负载已生成, 用时 {time.perf_counter() - started:.1f}s")
+            
+            for round_no in range(self.repeat):
+                for operation in operations:
+                    # 上传前修改工作仓库, 同步前修改第二个克隆, 下载在第二个克隆中拉取
+                    target = mirror if operation in ("download", "sync") else work
+                    if operation == "upload":
+                        self._mutate(work, round_no)
+                    elif operation == "sync":
+                        self._mutate(mirror, round_no)
+                    
+                    result = self.measure(operation, target, remote)
+                    result.update(workload=workload, operation=operation, round=round_no)
+                    self.results.append(result)
+                    self.log(
+                        f"  {'✓' if result.get('success') else '✗'} {operation:<9} "
+                        f"第 {round_no + 1} 轮 {result.get('wall_s', 0):.3f}s"
+                        + ("" if result.get('success') else f"  {result.get('message', '')}")
+                    )
+                
+                # 让工作仓库跟上第二个克隆推送的提交 (不计时)
+                if "sync" in operations:
+                    self._git(work, "pull", "-q", "--rebase", "origin", "main")
+    
+    # ---------- 结果 ----------
+    
+    def summary(self):
+        """按 (负载, 操作) 汇总: 中位数与最小耗时及其他指标的中位数"""
+        groups = {}
+        for result in self.results:
+            groups.setdefault(f"{result['workload']}/{result['operation']}", []).append(result)
+        
+        def median(values):
+            values = sorted(v for v in values if v is not None)
+            return values[len(values) // 2] if values else None
+        
+        summary = {}
+        for key, results in groups.items():
+            walls = [r['wall_s'] for r in results if r.get('wall_s') is not None]
+            summary[key] = {
+                'runs': len(results),
+                'failures': sum(1 for r in results if not r.get('success')),
+                # 所有轮次都没有测得耗时 (子进程异常或意外退出) 时记录第一条失败原因
+                'error': None if walls else next((r.get('message') for r in results if r.get('message')), "未知错误"),
+                'wall_median_s': median(walls),
+                'wall_min_s': min(walls) if walls else None,
+                'subprocesses': median(r.get('subprocesses') for r in results),
+                'git_cpu_s': median(r.get('git_cpu_s') for r in results),
+                'peak_rss_kb': median(r.get('peak_rss_kb') for r in results),
+                'peak_rss_git_kb': median(r.get('peak_rss_git_kb') for r in results),
+                'bytes_written': median(r.get('bytes_written') for r in results)
+            }
+        return summary
+    
+    def save(self, path=None):
+        """保存结果 (含运行环境信息), 返回文件路径"""
+        if path is None:
+            self.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+            path = self.RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+        data = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'scale': self.scale,
+            'repeat': self.repeat,
+            'seed': self.seed,
+            'python': sys.version.split()[0],
+            'git': DependencyManager.git_version(),
+            'platform': sys.platform,
+            'summary': self.summary(),
+            'results': self.results
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return Path(path)
+    
+    def report(self, baseline=None):
+        """格式化汇总表, 提供基线时附带中位耗时变化"""
+        base = baseline.get('summary', {}) if baseline else {}
+        lines = [
+            f"{'负载/操作':<26}{'中位耗时':>10}{'最小耗时':>10}{'子进程':>8}{'git CPU':>9}"
+            f"{'峰值RSS':>10}{'git RSS':>10}{'写入':>10}" + ("    对比基线" if baseline else "")
+        ]
+        
+        def size(kb):
+            return "--" if kb is None else f"{kb / 1024:.0f}MB"
+        
+        for key, row in self.summary().items():
+            if row['wall_median_s'] is None:
+                lines.append(f"{key:<26}failed: {row['error']}")
+                continue
+            written = row['bytes_written']
+            line = (
+                f"{key:<26}{row['wall_median_s']:>9.3f}s{row['wall_min_s']:>9.3f}s"
+                f"{row['subprocesses'] if row['subprocesses'] is not None else '--':>8}"
+                f"{row['git_cpu_s'] if row['git_cpu_s'] is not None else 0:>8.2f}s"
+                f"{size(row['peak_rss_kb']):>10}{size(row['peak_rss_git_kb']):>10}"
+                f"{'--' if written is None else f'{written / 1024 / 1024:.1f}MB':>10}"
+            )
+            if row['failures']:
+                line += f"  ✗{row['failures']}"
+            old = base.get(key, {}).get('wall_median_s')
+            if baseline:
+                line += f"    {(row['wall_median_s'] - old) / old:+.1%}" if old else "    (新增)"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# ================================
+# 命令行模式 (不加载 Qt)
+# ================================
+CONFIG_FILE = Path.home() / ".github_manager_config.json"
+
+# 传递给操作的配置项 (备份相关项只能在配置文件中修改)
+WORKER_CONFIG_KEYS = (
+    'backup_format', 'backup_keep_last', 'backup_keep_daily',
+    'backup_keep_weekly', 'backup_max_gb',
+    'journal_enabled', 'journal_file', 'journal_keep_days',
+    'operation_timeout', 'operation_timeouts', 'stall_timeout',
+    'clone_filter', 'clone_depth', 'sparse_paths', 'upload_batch_mb', 'tune_measure_fetch'
+)
+
+CLI_OPERATIONS = ("upload", "download", "sync", "overwrite", "init", "status", "backup", "tune", "deepen")
+
+
+def read_config_file(config_file=CONFIG_FILE):
+    """读取配置文件, 不存在或损坏时返回空配置"""
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_worker_config(stored, username, email):
+    """由配置文件内容与用户信息构造操作配置"""
+    config = {key: stored[key] for key in WORKER_CONFIG_KEYS if key in stored}
+    config['username'] = username
+    config['email'] = email
+    return config
+
+
+def run_operation(operation, local_path, remote_url, config, on_progress=None, on_transfer=None, on_trace=None):
+    """在当前线程同步执行一次操作, 返回 (成功, 消息)"""
+    ops = GitOperations(operation, local_path, remote_url, config)
+    results = []
+    # 部分操作可能多次发出完成信号, 以第一次为准
+    ops.finished.connect(lambda success, message: results.append((success, message)))
+    if on_progress:
+        ops.progress.connect(on_progress)
+    if on_transfer:
+        ops.transfer_progress.connect(on_transfer)
+    if on_trace:
+        ops.trace_ready.connect(on_trace)
+    ops.run()
+    return results[0] if results else (False, "操作未返回结果")
+
+
+def print_history(config, args):
+    """命令行输出操作记录, 加 -q 时不显示每条命令"""
+    try:
+        journal = OperationJournal(config.get('journal_file'))
+        operations = journal.search(
+            repo=args.path,
+            since=time.time() - args.days * 86400 if args.days else None,
+            failed_only=args.failed,
+            limit=args.limit
+        )
+        for op in operations:
+            state = {1: "✓", 0: "✗"}.get(op['success'], "?")
+            duration = f"{op['duration']:.1f}s" if op['duration'] is not None else "--"
+            print(f"{datetime.fromtimestamp(op['started']):%Y-%m-%d %H:%M:%S} {state} "
+                  f"{op['operation']:<9} {duration:>7}  {op['repo']}")
+            if op['message']:
+                print("    " + op['message'].replace("\n", "\n    "))
+            if not args.quiet:
+                for cmd in journal.commands(op['id']):
+                    print(f"    $ git {' '.join(cmd['args'])}  → {cmd['returncode']} ({cmd['duration']:.2f}s)")
+        journal.close()
+    except sqlite3.Error as e:
+        print(f"✗ 读取操作记录失败: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_benchmark(args):
+    """命令行运行基准测试, 有失败的测量时返回 1"""
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = [w for w in workloads if w not in BenchmarkSuite.WORKLOADS]
+    if unknown:
+        print(f"✗ 未知负载: {', '.join(unknown)} (可选: {', '.join(BenchmarkSuite.WORKLOADS)})", file=sys.stderr)
+        return 2
+    operations = tuple(op.strip() for op in args.ops.split(",")) if args.ops else None
+    if operations and not set(operations) <= {"status", "backup", "upload", "download", "sync"}:
+        print("✗ 基准测试只支持 status / backup / upload / download / sync", file=sys.stderr)
+        return 2
+    
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"✗ 读取基线失败: {e}", file=sys.stderr)
+            return 2
+    
+    # 隔离用户与系统 git 配置, 保证结果可复现
+    os.environ['GIT_CONFIG_GLOBAL'] = os.devnull
+    os.environ['GIT_CONFIG_NOSYSTEM'] = "1"
+    
+    suite = BenchmarkSuite(scale=args.scale, repeat=args.repeat,
+                           log=(lambda msg: None) if args.quiet else print)
+    try:
+        for workload in workloads:
+            suite.run_workload(workload, operations)
+    except (GitCommandError, OSError) as e:
+        print(f"✗ 生成负载失败: {e}", file=sys.stderr)
+        return 1
+    
+    print()
+    print(suite.report(baseline))
+    path = suite.save(args.output)
+    print(f"\n📄 结果已保存: {path}")
+    return 0 if all(r.get('success') for r in suite.results) else 1
+
+
+def cli_main(argv):
+    """命令行入口, 返回进程退出码"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="github-manager --cli",
+        description="GitHub 仓库管理器 - 命令行模式 (适用于 cron / CI, 不加载 Qt)"
+    )
+    parser.add_argument("operation", choices=CLI_OPERATIONS + ("history", "bench"),
+                        help="要执行的操作, history 查询操作记录, bench 运行离线基准测试")
+    parser.add_argument("--path", help="本地仓库路径 (默认取配置文件)")
+    parser.add_argument("--remote", help="远程仓库URL (默认取配置文件)")
+    parser.add_argument("--username", help="Git用户名")
+    parser.add_argument("--email", help="Git邮箱")
+    parser.add_argument("--config", default=str(CONFIG_FILE), help="配置文件路径")
+    parser.add_argument("--all", action="store_true", help="对配置文件中的批量仓库列表执行")
+    parser.add_argument("--jobs", type=int, help="批量模式并发数 (默认取配置文件)")
+    parser.add_argument("--yes", action="store_true", help="确认 overwrite 等破坏性操作")
+    parser.add_argument("--force", action="store_true", help="tune: 仓库规模未达阈值时也执行调优")
+    parser.add_argument("--filter", help="download: 首次克隆使用部分克隆过滤器, 如 blob:none (默认完整克隆)")
+    parser.add_argument("--depth", type=int,
+                        help="download: 首次克隆只取最近 N 个提交; deepen: 加深 N 个提交 (0 表示获取完整历史)")
+    parser.add_argument("--sparse", action="append", metavar="DIR", help="download: 首次克隆只检出该目录 (可重复)")
+    parser.add_argument("--batch-mb", type=float,
+                        help="upload: 变化超过该大小 (MB) 时分批提交并逐批推送 (默认 0, 不分批)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="只输出最终结果")
+    parser.add_argument("--timeout", type=float, help="单个操作的时限 (秒, 0 表示不限, 默认取配置文件)")
+    parser.add_argument("--stall-timeout", type=float, help="传输命令无输出多少秒视为卡住 (0 表示不检测)")
+    parser.add_argument("--trace", metavar="FILE", help="把各步骤与命令耗时导出为 Chrome trace JSON")
+    parser.add_argument("--days", type=float, help="history: 只显示最近 N 天")
+    parser.add_argument("--failed", action="store_true", help="history: 只显示失败的操作")
+    parser.add_argument("--limit", type=int, default=50, help="history: 最多显示条数")
+    parser.add_argument("--workloads", default=",".join(BenchmarkSuite.WORKLOADS),
+                        help="bench: 逗号分隔的负载列表")
+    parser.add_argument("--ops", help="bench: 逗号分隔的操作列表 (默认按负载选择)")
+    parser.add_argument("--scale", type=float, default=1.0, help="bench: 负载规模倍数")
+    parser.add_argument("--repeat", type=int, default=3, help="bench: 每个操作测量轮数")
+    parser.add_argument("--output", help="bench: 结果文件 (默认 ~/.github_manager_bench/)")
+    parser.add_argument("--compare", metavar="BASELINE", help="bench: 与基线结果文件比较")
+    args = parser.parse_args(argv)
+    
+    stored = read_config_file(args.config)
+    config = build_worker_config(
+        stored,
+        args.username if args.username is not None else stored.get('username', ''),
+        args.email if args.email is not None else stored.get('email', '')
+    )
+    if args.timeout is not None:
+        config['operation_timeout'] = args.timeout
+        config.pop('operation_timeouts', None)
+    if args.stall_timeout is not None:
+        config['stall_timeout'] = args.stall_timeout
+    if args.force:
+        config['tune_force'] = True
+    if args.filter is not None:
+        config['clone_filter'] = args.filter
+    if args.depth is not None:
+        config['deepen' if args.operation == "deepen" else 'clone_depth'] = args.depth
+    if args.sparse:
+        config['sparse_paths'] = args.sparse
+    if args.batch_mb is not None:
+        config['upload_batch_mb'] = args.batch_mb
+    
+    if args.operation == "history":
+        return print_history(config, args)
+    
+    if args.operation == "bench":
+        return run_benchmark(args)
+    
+    if args.operation == "overwrite" and not args.yes:
+        print("✗ overwrite 会用本地版本强制覆盖远程仓库, 请添加 --yes 确认", file=sys.stderr)
+        return 2
+    
+    if not DependencyManager.check_git():
+        print("✗ 未检测到Git, 请先安装: https://git-scm.com/downloads", file=sys.stderr)
+        return 1
+    
+    # 目标仓库列表
+    if args.all:
+        repos = stored.get('fleet_repos', [])
+        if not repos:
+            print("✗ 配置文件中没有批量仓库列表 (fleet_repos)", file=sys.stderr)
+            return 2
+    else:
+        local_path = args.path or stored.get('local_path')
+        if not local_path:
+            print("✗ 请通过 --path 或配置文件指定本地路径", file=sys.stderr)
+            return 2
+        repos = [{'local_path': local_path, 'remote_url': args.remote or stored.get('remote_url', '')}]
+    
+    if args.operation not in ("status", "backup", "tune", "deepen"):
+        missing = [repo['local_path'] for repo in repos if not repo.get('remote_url')]
+        if missing:
+            print(f"✗ 未配置远程仓库: {', '.join(missing)}", file=sys.stderr)
+            return 2
+    
+    print_lock = threading.Lock()
+    show_transfer = len(repos) == 1 and not args.quiet and sys.stderr.isatty()
+    
+    def emit(prefix, message):
+        with print_lock:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {prefix}{message}", flush=True)
+    
+    traces = [None] * len(repos)
+    
+    def run_one(index):
+        repo = repos[index]
+        prefix = f"{Path(repo['local_path']).name}: " if len(repos) > 1 else ""
+        started = time.monotonic()
+        success, message = run_operation(
+            args.operation, repo['local_path'], repo.get('remote_url', ''), config,
+            on_progress=None if args.quiet else (lambda msg, _type: emit(prefix, msg)),
+            on_transfer=(lambda _pct, text: print(f"\r  {text}\033[K", end="", file=sys.stderr, flush=True))
+            if show_transfer else None,
+            on_trace=lambda trace: traces.__setitem__(index, trace)
+        )
+        if show_transfer:
+            print(file=sys.stderr)
+        emit(prefix, f"{message} ({time.monotonic() - started:.1f}s)")
+        if not args.quiet and traces[index]:
+            emit(prefix, f"⏱ {traces[index].summary()}")
+        return success
+    
+    started = time.monotonic()
+    if len(repos) == 1:
+        results = [run_one(0)]
+    else:
+        jobs = args.jobs or stored.get('fleet_max_workers') or min(8, os.cpu_count() or 4)
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            results = list(pool.map(run_one, range(len(repos))))
+        elapsed = time.monotonic() - started
+        emit("", f"批量执行完成: 成功 {results.count(True)}, 失败 {results.count(False)}, "
+                 f"耗时 {elapsed:.1f}s, 吞吐 {len(repos) * 60 / max(elapsed, 0.001):.1f} 仓库/分钟")
+    
+    if args.trace:
+        try:
+            OperationTrace.export_chrome([trace for trace in traces if trace], args.trace)
+            emit("", f"⏱ 耗时追踪已导出: {args.trace}")
+        except OSError as e:
+            print(f"✗ 导出耗时追踪失败: {e}", file=sys.stderr)
+    
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(cli_main(sys.argv[1:]))
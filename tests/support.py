@@ -0,0 +1,56 @@
+"""测试公共设施 - 导入核心模块, 在临时目录中创建真实的 git 仓库"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import github_manager_core as core  # noqa: E402
+
+GUI_SCRIPT = ROOT / "GitHub 仓库管理_Claude_V2.py"
+
+# 隔离用户与系统的 git 配置
+GIT_ENV = {
+    'GIT_CONFIG_GLOBAL': os.devnull,
+    'GIT_CONFIG_NOSYSTEM': "1",
+    'GIT_AUTHOR_NAME': "Test", 'GIT_AUTHOR_EMAIL': "test@example.invalid",
+    'GIT_COMMITTER_NAME': "Test", 'GIT_COMMITTER_EMAIL': "test@example.invalid",
+}
+
+
+@unittest.skipUnless(shutil.which("git"), "需要 git")
+class GitRepoTestCase(unittest.TestCase):
+    """每个用例一个临时仓库"""
+    
+    def setUp(self):
+        self._env = {key: os.environ.get(key) for key in GIT_ENV}
+        os.environ.update(GIT_ENV)
+        self.repo = tempfile.mkdtemp(prefix="gm_test_")
+        self.git("init", "-q", "-b", "main")
+    
+    def tearDown(self):
+        shutil.rmtree(self.repo, ignore_errors=True)
+        for key, value in self._env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    
+    def git(self, *args, cwd=None):
+        result = subprocess.run(["git", *args], cwd=cwd or self.repo, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+    
+    def write(self, rel_path, content="x\n"):
+        path = Path(self.repo, rel_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        return path
+    
+    def read_index(self):
+        return core.GitIndex.read(os.path.join(self.repo, ".git", "index"))
@@ -0,0 +1,35 @@
+"""自动同步调度测试 - 失败后的指数退避与抖动"""
+import os
+import random
+import unittest
+
+from support import core
+
+
+class AutoSyncPolicyTest(unittest.TestCase):
+    """失败后的指数退避与抖动"""
+    
+    def setUp(self):
+        self.policy = core.AutoSyncPolicy(rng=random.Random(7))
+        self.policy.configure([{'local_path': "/repo", 'interval': 600}], now=0.0)
+    
+    def test_backoff_grows_with_jitter_and_caps(self):
+        now = 0.0
+        for failures in range(1, 12):
+            self.policy.due(now + 10_000, 1)
+            delay = self.policy.finished("/repo", False, now)
+            full = min(core.AutoSyncPolicy.BACKOFF_MAX, core.AutoSyncPolicy.BACKOFF_BASE * 2 ** (failures - 1))
+            self.assertGreaterEqual(delay, full / 2)
+            self.assertLessEqual(delay, full)
+        self.assertLessEqual(delay, core.AutoSyncPolicy.BACKOFF_MAX)
+    
+    def test_success_resets(self):
+        self.policy.due(10_000, 1)
+        self.policy.finished("/repo", False, 0.0)
+        self.policy.due(10_000, 1)
+        self.assertEqual(self.policy.finished("/repo", True, 0.0), 0)
+        self.assertEqual(self.policy.repos[os.path.abspath("/repo")]['failures'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""备份库测试 - 增量快照的记录与恢复、压缩归档与回收"""
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from support import core
+
+
+class BackupTestCase(unittest.TestCase):
+    """临时的工作区与备份库"""
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="gm_backup_"))
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.source = self.tmp / "repo"
+        self.store = core.BackupStore(self.tmp / "backups")
+    
+    def write(self, rel_path, content="x\n"):
+        path = self.source / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        return path
+    
+    def partial_files(self):
+        return [path.name for path in self.store.snapshots_dir.rglob("*.tmp")]
+
+
+@unittest.skipIf(os.name == "nt", "需要符号链接权限")
+class SnapshotRestoreTest(BackupTestCase):
+    """符号链接 (包括指向目录的) 与空目录也要进入清单并能恢复"""
+    
+    def setUp(self):
+        super().setUp()
+        self.write("src/main.py")
+        self.write("docs/readme.txt")
+        os.symlink("main.py", self.source / "src" / "alias.py")
+        os.symlink("src", self.source / "src_link")
+        (self.source / "build" / "cache").mkdir(parents=True)
+        (self.source / "empty").mkdir()
+    
+    def test_manifest_entries(self):
+        manifest_path, stats = self.store.snapshot(self.source)
+        files = self.store.load_manifest(manifest_path)['files']
+        self.assertEqual(files["src/alias.py"]['link'], "main.py")
+        self.assertEqual(files["src_link"]['link'], "src")
+        self.assertTrue(files["build/cache"]['dir'])
+        self.assertTrue(files["empty"]['dir'])
+        self.assertNotIn("build", files)
+        self.assertEqual(stats['files'], 2)
+    
+    def test_restore_into_empty_target(self):
+        manifest_path, _ = self.store.snapshot(self.source)
+        target = self.tmp / "restored"
+        self.store.restore(manifest_path, target)
+        self.assertEqual(os.readlink(target / "src_link"), "src")
+        self.assertTrue((target / "src_link" / "main.py").is_file())
+        self.assertTrue((target / "build" / "cache").is_dir())
+        self.assertTrue((target / "empty").is_dir())
+        diff = self.store.diff_worktree(manifest_path, target)
+        self.assertEqual(diff, {'added': [], 'removed': [], 'modified': []})
+    
+    def test_restore_removed_entries(self):
+        manifest_path, _ = self.store.snapshot(self.source)
+        os.unlink(self.source / "src_link")
+        (self.source / "empty").rmdir()
+        (self.source / "extra").mkdir()
+        diff = self.store.diff_worktree(manifest_path, self.source)
+        self.assertEqual(diff['removed'], ["empty", "src_link"])
+        self.assertEqual(diff['added'], ["extra"])
+        
+        stats = self.store.restore(manifest_path, self.source, delete_extra=True)
+        self.assertEqual((stats['restored'], stats['deleted']), (2, 1))
+        self.assertTrue((self.source / "src_link").is_symlink())
+        self.assertTrue((self.source / "empty").is_dir())
+        self.assertFalse((self.source / "extra").exists())
+
+
+class SnapshotIndexTest(BackupTestCase):
+    """同一仓库的并发备份都能登记到快照索引中"""
+    
+    def test_concurrent_registration(self):
+        repo_dir = self.store.snapshots_dir / "repo-0123456789ab"
+        repo_dir.mkdir(parents=True)
+        
+        def register(worker):
+            for i in range(40):
+                self.store._index_add(repo_dir / f"backup_20240101_0000{worker:02}_{i}.json", {'kind': 'incremental'})
+        
+        threads = [threading.Thread(target=register, args=(worker,)) for worker in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 直接读索引文件 (list_snapshots 会按目录补全缺失项, 掩盖丢失的登记)
+        self.assertEqual(len(self.store._load_index(repo_dir.name)), 240)
+
+
+class ArchiveTest(BackupTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        for i in range(20):
+            self.write(f"data/{i:02}.txt", os.urandom(4096).hex())
+        self.write("data/zz_bad.txt")
+    
+    def test_round_trip(self):
+        path, stats = self.store.archive(self.source)
+        with tarfile.open(path, 'r:gz') as tar:
+            names = tar.getnames()
+        self.assertIn("repo/data/zz_bad.txt", names)
+        self.assertGreater(stats['bytes_in'], 0)
+        self.assertEqual([s['kind'] for s in self.store.list_snapshots(self.source)], ["archive"])
+    
+    def test_failure_cleans_up(self):
+        original = tarfile.TarFile.add
+        
+        def add(tar, name, *args, **kwargs):
+            if name.endswith("zz_bad.txt"):
+                raise OSError("磁盘已满")
+            return original(tar, name, *args, **kwargs)
+        
+        with mock.patch.object(core.ParallelGzipWriter, 'BLOCK_SIZE', 8192), \
+                mock.patch.object(tarfile.TarFile, 'add', add):
+            with self.assertRaises(OSError):
+                self.store.archive(self.source)
+        
+        self.assertEqual(self.partial_files(), [])
+        self.assertEqual(self.store.list_snapshots(self.source), [])
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("gzip")])
+    
+    def test_gc_removes_leftovers(self):
+        self.store.archive(self.source)
+        repo_dir = self.store.snapshots_dir / self.store.repo_key(self.source)
+        (repo_dir / "backup_20240101_000000.tar.gz.tmp").write_bytes(b"partial")
+        self.store.gc()
+        self.assertEqual(self.partial_files(), [])
+        self.assertEqual(len(self.store.list_snapshots(self.source)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
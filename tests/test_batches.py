@@ -0,0 +1,55 @@
+"""分批上传测试 - 按大小把改动装箱"""
+import os
+import unittest
+from pathlib import Path
+
+from support import core, GitRepoTestCase
+
+
+class BatchPlannerTest(GitRepoTestCase):
+    """分批上传按大小装箱"""
+    
+    KB = 1024
+    
+    def setUp(self):
+        super().setUp()
+        self.write("kept.txt")
+        self.write("gone.txt")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "init")
+        self.ops = core.GitOperations("upload", self.repo, "", {})
+    
+    def write_bytes(self, rel_path, size):
+        path = Path(self.repo, rel_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\0" * size)
+    
+    def test_batches_respect_cap(self):
+        for i in range(6):
+            self.write_bytes(f"data/f{i}.bin", 40 * self.KB)
+        batches = self.ops._plan_batches(100 * self.KB)
+        self.assertEqual([len(paths) for paths, _ in batches], [2, 2, 2])
+        self.assertTrue(all(size <= 100 * self.KB for _, size in batches))
+        self.assertEqual(sorted(p for paths, _ in batches for p in paths), [f"data/f{i}.bin" for i in range(6)])
+    
+    def test_oversized_file_gets_own_batch(self):
+        self.write_bytes("a.bin", 10 * self.KB)
+        self.write_bytes("b.bin", 500 * self.KB)
+        self.write_bytes("c.bin", 10 * self.KB)
+        batches = self.ops._plan_batches(100 * self.KB)
+        self.assertEqual([paths for paths, _ in batches], [["a.bin"], ["b.bin"], ["c.bin"]])
+    
+    def test_includes_staged_modified_and_deleted(self):
+        os.remove(os.path.join(self.repo, "gone.txt"))
+        self.write("kept.txt", "changed\n")
+        self.write("staged.txt")
+        self.git("add", "staged.txt")
+        self.write("ignored.log")
+        self.write(".gitignore", "*.log\n")
+        batches = self.ops._plan_batches(1024 * self.KB)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(batches[0][0]), [".gitignore", "gone.txt", "kept.txt", "staged.txt"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""命令行模式测试 - 核心模块与 --cli 入口都不加载 PyQt6"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from support import ROOT, GUI_SCRIPT, GitRepoTestCase
+
+# 让 PyQt6 的任何导入都失败, 相当于没有安装
+BLOCK_QT = "import sys; sys.modules['PyQt6'] = None; "
+
+
+class HeadlessTest(GitRepoTestCase):
+    
+    def python(self, code, *args):
+        # 操作记录等写入临时 HOME, 不落在被检查的仓库里
+        with tempfile.TemporaryDirectory() as home:
+            return subprocess.run(
+                [sys.executable, "-c", BLOCK_QT + code, *args],
+                cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, HOME=home)
+            )
+    
+    def test_import_core_without_qt(self):
+        result = self.python(
+            "import github_manager_core as core; "
+            "print(core.GitRunner(sys.argv[1]).status().branch)",
+            self.repo
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "main")
+    
+    def test_cli_entry_without_qt(self):
+        self.write("a.txt")
+        config = os.path.join(self.repo, "missing.json")
+        for argv in ([str(GUI_SCRIPT), "--cli"], ["github_manager_core.py"]):
+            with self.subTest(entry=argv[0]):
+                result = self.python(
+                    "import runpy; sys.argv = sys.argv[1:]; "
+                    "runpy.run_path(sys.argv[0], run_name='__main__')",
+                    *argv, "status", "--path", self.repo, "--config", config
+                )
+                self.assertEqual(result.returncode, 0, result.stderr)
+                self.assertIn("未跟踪 1", result.stdout)
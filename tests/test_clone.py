@@ -0,0 +1,49 @@
+"""首次下载测试 - 从本地裸仓库克隆, 检查默认完整克隆与可选的部分克隆"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import core, GitRepoTestCase
+
+
+class BootstrapCloneTest(GitRepoTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.write("a.txt")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "init")
+        self.remote = tempfile.mkdtemp(prefix="gm_remote_")
+        self.addCleanup(shutil.rmtree, self.remote, True)
+        self.git("clone", "-q", "--bare", self.repo, self.remote)
+        self.git("config", "uploadpack.allowFilter", "true", cwd=self.remote)
+        self.target = tempfile.mkdtemp(prefix="gm_clone_")
+        self.addCleanup(shutil.rmtree, self.target, True)
+    
+    def download(self, **config):
+        success, message = core.run_operation("download", self.target, self.remote, config)
+        self.assertTrue(success, message)
+        self.assertTrue(os.path.exists(os.path.join(self.target, "a.txt")))
+        return message
+    
+    def promisor(self):
+        result = core.GitRunner(self.target).run("config", "--get", "remote.origin.promisor")
+        return result.stdout.strip()
+    
+    def test_full_clone_by_default(self):
+        self.assertIn("完整克隆", self.download())
+        self.assertEqual(self.promisor(), "")
+    
+    def test_blobless_is_opt_in(self):
+        self.assertIn("部分克隆 blob:none", self.download(clone_filter=core.GitOperations.BLOBLESS_FILTER))
+        self.assertEqual(self.promisor(), "true")
+    
+    def test_remote_without_main(self):
+        self.git("branch", "-m", "main", "master", cwd=self.remote)
+        self.download()
+        self.assertEqual(core.GitRunner(self.target).output("branch", "--show-current"), "master")
+
+
+if __name__ == '__main__':
+    unittest.main()
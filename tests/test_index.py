@@ -0,0 +1,76 @@
+"""Git 索引读取测试 - 与 git ls-files 对照 v2/v3/v4 与 UNTR 扩展"""
+import os
+import unittest
+
+from support import core, GitRepoTestCase
+
+
+class GitIndexTest(GitRepoTestCase):
+    """GitIndex 与 git ls-files 的结果一致"""
+    
+    def setUp(self):
+        super().setUp()
+        for rel_path in ("a.txt", "dir/b.txt", "dir/sub/c.txt", "dir/sub/long_name_" + "x" * 40 + ".txt"):
+            self.write(rel_path, rel_path + "\n")
+        script = self.write("run.sh", "#!/bin/sh\n")
+        script.chmod(0o755)
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "init")
+    
+    def ls_files(self):
+        """{路径: (模式, 暂存编号)}"""
+        entries = {}
+        for line in self.git("ls-files", "-s", "-z").split("\0"):
+            if line:
+                info, path = line.split("\t", 1)
+                mode, _, stage = info.split()
+                entries[path] = (int(mode, 8), int(stage))
+        return entries
+    
+    def assert_matches_git(self, index):
+        self.assertEqual(
+            {entry.path: (entry.mode, entry.stage) for entry in index.entries},
+            self.ls_files()
+        )
+        for entry in index.entries:
+            self.assertEqual(entry.size, os.lstat(os.path.join(self.repo, entry.path)).st_size)
+    
+    def test_versions(self):
+        # 没有扩展标志时 git 会把 v3 写成 v2, v3 见 test_skip_worktree_flag
+        for version in (2, 4):
+            with self.subTest(version=version):
+                self.git("update-index", "--index-version", str(version))
+                index = self.read_index()
+                self.assertEqual(index.version, version)
+                self.assert_matches_git(index)
+    
+    def test_header(self):
+        version, count = core.GitIndex.read_header(os.path.join(self.repo, ".git", "index"))
+        self.assertEqual((version, count), (2, len(self.ls_files())))
+    
+    def test_skip_worktree_flag(self):
+        self.git("update-index", "--skip-worktree", "dir/b.txt")
+        index = self.read_index()
+        self.assertEqual(index.version, 3)
+        flags = {entry.path: entry.skip_worktree for entry in index.entries}
+        self.assertTrue(flags["dir/b.txt"])
+        self.assertFalse(flags["a.txt"])
+    
+    def test_untracked_cache(self):
+        self.git("config", "core.untrackedCache", "true")
+        self.write("dir/new.txt")
+        self.write("fresh/one.txt")
+        self.git("update-index", "--untracked-cache")
+        self.git("status", "--porcelain")
+        index = self.read_index()
+        self.assertIn("UNTR", index.extensions)
+        self.assertIn("", index.untracked_dirs)
+        self.assertIn("dir", index.untracked_dirs)
+    
+    def test_rejects_garbage(self):
+        with self.assertRaises(core.IndexFormatError):
+            core.GitIndex.parse(b"not an index file at all")
+
+
+if __name__ == '__main__':
+    unittest.main()
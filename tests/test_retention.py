@@ -0,0 +1,39 @@
+"""备份保留策略测试 - 按层级选出要保留的快照"""
+import unittest
+from datetime import datetime, timedelta
+
+from support import core
+
+
+class RetentionPolicyTest(unittest.TestCase):
+    """按层级选出保留的快照"""
+    
+    def snapshots(self, hours):
+        start = datetime(2024, 1, 31, 23, 0)
+        return [(start - timedelta(hours=h), f"s{h}") for h in hours]
+    
+    def test_keep_last(self):
+        policy = core.RetentionPolicy(keep_last=3, keep_daily=0, keep_weekly=0)
+        self.assertEqual(policy.select(self.snapshots(range(10))), {"s0", "s1", "s2"})
+    
+    def test_daily_and_weekly(self):
+        # 每 12 小时一份, 共 30 天
+        snapshots = self.snapshots(range(0, 30 * 24, 12))
+        policy = core.RetentionPolicy(keep_last=1, keep_daily=3, keep_weekly=2)
+        kept = policy.select(snapshots)
+        # 最新一份, 另外两天各自最新的一份, 上一周 (周日 1 月 28 日) 最新的一份
+        self.assertEqual(kept, {"s0", "s24", "s48", "s72"})
+    
+    def test_at_least_one(self):
+        policy = core.RetentionPolicy(keep_last=0, keep_daily=0, keep_weekly=0)
+        self.assertEqual(policy.select(self.snapshots([5, 1, 3])), {"s1"})
+    
+    def test_from_config(self):
+        policy = core.RetentionPolicy.from_config({'backup_keep_last': 2, 'backup_max_gb': 0.5})
+        self.assertEqual((policy.keep_last, policy.keep_daily, policy.keep_weekly), (2, 7, 4))
+        self.assertEqual(policy.max_total_bytes, 512 * 1024 ** 2)
+        self.assertIsNone(core.RetentionPolicy.from_config({}).max_total_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Git 命令执行层测试 - 流式命令出错或被取消时的收尾"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from support import core, GitRepoTestCase
+
+
+class StreamCleanupTest(GitRepoTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        # 足够多的对象, 克隆时会输出进度
+        for i in range(200):
+            self.write(f"files/{i}.txt", f"{i}\n" * 50)
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "init")
+        self.target = tempfile.mkdtemp(prefix="gm_clone_")
+        self.addCleanup(shutil.rmtree, self.target, True)
+        
+        self.runner = core.GitRunner(self.target)
+        self.runner.stall_timeout = 60
+        self.spawned = []
+        spawn = self.runner._spawn
+        
+        def record_spawn(*args, **kwargs):
+            process = spawn(*args, **kwargs)
+            self.spawned.append(process)
+            return process
+        self.runner._spawn = record_spawn
+    
+    def test_progress_callback_error(self):
+        def on_progress(tracker):
+            raise RuntimeError("界面已关闭")
+        
+        with self.assertRaises(RuntimeError):
+            self.runner.stream("clone", Path(self.repo).as_uri(), ".", on_progress=on_progress)
+        self.assertEqual(len(self.spawned), 1)
+        self.assertIsNotNone(self.spawned[0].poll())
+        self.assertEqual(self.runner._processes, set())
+    
+    def test_records_generator_closed_early(self):
+        runner = core.GitRunner(self.repo)
+        runner.deadline = time.monotonic() + 60
+        records = runner.iter_records("ls-files", "-z")
+        self.assertEqual(next(records), "files/0.txt")
+        records.close()
+        self.assertEqual(runner._processes, set())
+
+
+
+class StatusInterruptTest(GitRepoTestCase):
+    """状态检查被取消或超时时报告中断, 而不是普通的检查失败"""
+    
+    def setUp(self):
+        super().setUp()
+        core.WorkTreeStatCache._shared.pop(os.path.abspath(self.repo), None)
+    
+    def check_status(self, config, cancel=False):
+        ops = core.GitOperations("status", self.repo, "", config)
+        if cancel:
+            ops.cancel()
+        results = []
+        ops.finished.connect(lambda success, message: results.append((success, message)))
+        ops.run()
+        self.assertEqual(len(results), 1)
+        return results[0]
+    
+    def test_cancelled(self):
+        self.assertEqual(self.check_status({'journal_enabled': False}, cancel=True), (False, "⏹ 操作已取消"))
+    
+    def test_timeout(self):
+        success, message = self.check_status({'journal_enabled': False, 'operation_timeout': 1e-9})
+        self.assertFalse(success)
+        self.assertTrue(message.startswith("⏱ "), message)
+
+
+if __name__ == '__main__':
+    unittest.main()
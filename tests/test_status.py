@@ -0,0 +1,85 @@
+"""仓库状态测试 - porcelain v2 -z 输出的解析与计数"""
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from support import core, GitRepoTestCase
+
+
+class RepoStatusTest(GitRepoTestCase):
+    """porcelain v2 -z 的解析结果"""
+    
+    def setUp(self):
+        super().setUp()
+        self.write("tracked.txt")
+        self.write("staged.txt")
+        self.write("old name.txt", "rename me\n" * 20)
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "init")
+    
+    def test_counts(self):
+        self.write("tracked.txt", "changed\n")                        # 工作区改动
+        self.write("staged.txt", "staged\n")
+        self.git("add", "staged.txt")                                 # 暂存区改动
+        self.git("mv", "old name.txt", "new name.txt")                # 重命名 (路径含空格)
+        self.write("untracked dir/a.txt")                             # 整体未跟踪的目录计为一条
+        self.write("untracked dir/b.txt")
+        self.write("loose.txt")
+        
+        status = core.GitRunner(self.repo).status(sample=10)
+        self.assertEqual(status.branch, "main")
+        self.assertIsNotNone(status.oid)
+        self.assertFalse(status.has_upstream)
+        self.assertEqual(status.staged, 2)
+        self.assertEqual(status.unstaged, 1)
+        self.assertEqual(status.untracked, 2)
+        self.assertEqual(status.conflicted, 0)
+        self.assertEqual(status.changed, 5)
+        paths = {path for _, _, path in status.sample}
+        self.assertIn("new name.txt", paths)
+        self.assertIn("untracked dir/", paths)
+        self.assertFalse(status.is_clean)
+    
+    def test_upstream_and_conflict(self):
+        remote = tempfile.mkdtemp(prefix="gm_remote_")
+        self.addCleanup(shutil.rmtree, remote, True)
+        self.git("init", "-q", "--bare", remote)
+        self.git("remote", "add", "origin", remote)
+        self.git("push", "-q", "-u", "origin", "main")
+        
+        self.git("checkout", "-q", "-b", "other")
+        self.write("tracked.txt", "other\n")
+        self.git("commit", "-q", "-am", "other")
+        self.git("checkout", "-q", "main")
+        self.write("tracked.txt", "main\n")
+        self.git("commit", "-q", "-am", "main")
+        subprocess.run(["git", "merge", "-q", "other"], cwd=self.repo, capture_output=True)
+        
+        status = core.GitRunner(self.repo).status()
+        self.assertEqual(status.upstream, "origin/main")
+        self.assertEqual((status.ahead, status.behind), (1, 0))
+        self.assertEqual(status.conflicted, 1)
+    
+    def test_parse_matches_string_input(self):
+        self.write("tracked.txt", "changed\n")
+        output = self.git("status", "--porcelain=v2", "--branch", "-z")
+        streamed = core.GitRunner(self.repo).status()
+        parsed = core.RepoStatus.parse(output)
+        self.assertEqual(
+            (parsed.branch, parsed.staged, parsed.unstaged, parsed.untracked, parsed.changed),
+            (streamed.branch, streamed.staged, streamed.unstaged, streamed.untracked, streamed.changed)
+        )
+    
+    def test_clean_initial_repo(self):
+        empty = tempfile.mkdtemp(prefix="gm_empty_")
+        self.addCleanup(shutil.rmtree, empty, True)
+        self.git("init", "-q", "-b", "main", cwd=empty)
+        status = core.GitRunner(empty).status()
+        self.assertEqual(status.branch, "main")
+        self.assertIsNone(status.oid)
+        self.assertTrue(status.is_clean)
+
+
+if __name__ == '__main__':
+    unittest.main()
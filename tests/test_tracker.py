@@ -0,0 +1,68 @@
+"""增量状态跟踪测试 - 按路径增量刷新后的计数与 git status 一致"""
+import os
+import shutil
+import unittest
+
+from support import core, GitRepoTestCase
+
+
+class StatusTrackerTest(GitRepoTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.write("top.txt")
+        self.write("src/main.py")
+        self.write("src/pkg/mod.py")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "init")
+        core.WorkTreeStatCache._shared.pop(os.path.abspath(self.repo), None)
+        self.tracker = core.StatusTracker(core.GitRunner(self.repo))
+        self.tracker.full_refresh()
+    
+    def assert_matches_git(self, status):
+        expected = core.GitRunner(self.repo).status(sample=1000)
+        self.assertEqual(sorted(self.tracker.entries), sorted(path for _, _, path in expected.sample))
+        self.assertEqual(
+            (status.staged, status.unstaged, status.untracked, status.changed),
+            (expected.staged, expected.unstaged, expected.untracked, expected.changed)
+        )
+    
+    def test_new_untracked_tree_by_file_paths(self):
+        # 文件监视器报告的是其中的文件路径
+        self.write("new/deep/a.txt")
+        self.write("new/b.txt")
+        self.write("src/extra/c.txt")
+        self.write("src/loose.txt")
+        status = self.tracker.refresh_paths(["new/deep/a.txt", "new/b.txt", "src/extra/c.txt", "src/loose.txt"])
+        self.assertEqual(status.untracked, 3)
+        self.assert_matches_git(status)
+        
+        self.write("new/deep/more.txt")
+        self.assert_matches_git(self.tracker.refresh_paths(["new/deep/more.txt"]))
+        
+        shutil.rmtree(os.path.join(self.repo, "new"))
+        self.assert_matches_git(self.tracker.refresh_paths(["new/deep/a.txt"]))
+    
+    def test_new_untracked_tree_by_directory(self):
+        # stat 缓存报告的是 mtime 变化的目录
+        self.write("new/deep/a.txt")
+        self.assert_matches_git(self.tracker.refresh_paths(["new"]))
+        self.write("new/deep/b.txt")
+        self.assert_matches_git(self.tracker.refresh_paths(["new/deep"]))
+        self.assert_matches_git(self.tracker.full_refresh())
+    
+    def test_staging_changes_collapsing(self):
+        self.write("new/a.txt")
+        self.write("new/b.txt")
+        self.assert_matches_git(self.tracker.refresh_paths(["new/a.txt", "new/b.txt"]))
+        # 暂存其中一个文件后目录不再整体未跟踪, 另一个文件单独列出
+        self.git("add", "new/a.txt")
+        self.assert_matches_git(self.tracker.full_refresh())
+        self.write("new/c.txt")
+        status = self.tracker.refresh_paths(["new/c.txt"])
+        self.assertEqual((status.staged, status.untracked), (1, 2))
+        self.assert_matches_git(status)
+
+
+if __name__ == '__main__':
+    unittest.main()